@@ -1,2 +1,6 @@
 # Focus App - API Package
 
+# Load .env once, before any module reads its settings with os.getenv
+from dotenv import load_dotenv
+
+load_dotenv()
@@ -0,0 +1 @@
+# Focus App - command line tools
@@ -0,0 +1,67 @@
+"""
+Bulk import todos, goals or activities for a user from an NDJSON or CSV file
+
+Usage:
+    python -m app.cli.import_data goals goals.ndjson --email user@example.com
+    python -m app.cli.import_data todos todos.csv --email user@example.com
+    python -m app.cli.import_data todos todos.csv --email user@example.com --job-id 12  # resume
+"""
+import argparse
+import sys
+
+from app.db.database import SessionLocal, create_schema
+from app.models.user import User
+from app.services.import_service import (
+    ImportService,
+    IMPORT_KINDS,
+    SOURCE_FORMATS,
+    DEFAULT_CHUNK_SIZE,
+    detect_source_format,
+)
+
+def print_progress(job):
+    print(
+        f"job {job.id}: {job.rows_processed} rows processed, "
+        f"{job.rows_imported} imported, {job.rows_failed} failed",
+        flush=True
+    )
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import todos, goals or activities")
+    parser.add_argument("kind", choices=list(IMPORT_KINDS))
+    parser.add_argument("path", help="NDJSON or CSV file")
+    parser.add_argument("--email", required=True, help="Email of the user to import for")
+    parser.add_argument("--format", choices=SOURCE_FORMATS, dest="source_format")
+    parser.add_argument("--job-id", type=int, help="Resume an existing import job")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    create_schema()
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == args.email).first()
+        if not user:
+            print(f"User not found: {args.email}", file=sys.stderr)
+            return 1
+
+        service = ImportService(db, user, chunk_size=args.chunk_size, on_progress=print_progress)
+        if args.job_id is not None:
+            job = service.get_job(args.job_id)
+            if not job or job.kind != args.kind:
+                print(f"No {args.kind} import job {args.job_id} for {args.email}", file=sys.stderr)
+                return 1
+        else:
+            job = service.start_job(args.kind, args.source_format or detect_source_format(args.path))
+
+        with open(args.path, "rb") as source:
+            job = service.run(job, source)
+
+        print_progress(job)
+        for error in job.errors or []:
+            print(f"row {error['row']}: {error['error']}", file=sys.stderr)
+        return 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+"""
+Create missing tables and columns and seed reference data
+
+Run once per deploy (before starting the server with AUTO_CREATE_SCHEMA=false):
+    python -m app.cli.migrate
+"""
+import sys
+
+from app.db.database import SessionLocal, create_schema
+from app.services.music_catalog import seed_default_catalog
+
+def main() -> int:
+    create_schema()
+    db = SessionLocal()
+    try:
+        seeded = seed_default_catalog(db)
+    finally:
+        db.close()
+    print("Schema up to date" + ("; seeded the default music catalog" if seeded else ""))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""
+Finish purging accounts queued for deletion
+
+DELETE /api/users/me?background=true purges in the background of the
+worker that took the request; this picks up any purge a restart cut short.
+Safe to run while the app is serving, e.g. from cron:
+    python -m app.cli.purge_accounts [--batch-size 1000]
+"""
+import argparse
+import sys
+
+from app.db.database import SessionLocal
+from app.services.account_deletion import PURGE_BATCH_SIZE, purge_account, queued_account_ids
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Finish purging accounts queued for deletion")
+    parser.add_argument("--batch-size", type=int, default=PURGE_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        user_ids = queued_account_ids(db)
+        for user_id in user_ids:
+            rows = purge_account(db, user_id, args.batch_size)
+            print(f"user {user_id}: {rows} rows deleted", flush=True)
+        print(f"Purged {len(user_ids)} account(s)")
+        return 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
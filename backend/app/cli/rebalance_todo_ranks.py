@@ -0,0 +1,48 @@
+"""
+Rewrite long todo rank keys as short, evenly spaced ones
+
+Repeatedly dropping todos into the same spot lengthens their rank keys.
+Moves that cross TODO_RANK_MAX_LENGTH already rebalance their user in the
+background; schedule this to catch the rest. The order is unchanged, so it
+is safe to run while the app is serving:
+    python -m app.cli.rebalance_todo_ranks
+    python -m app.cli.rebalance_todo_ranks --max-length 8
+    python -m app.cli.rebalance_todo_ranks --email user@example.com
+"""
+import argparse
+import sys
+
+from app.db.database import SessionLocal
+from app.models.user import User
+from app.services.todo_ranks import RANK_MAX_LENGTH, rebalance_ranks, users_with_long_ranks
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rewrite long todo rank keys as short, evenly spaced ones")
+    parser.add_argument("--max-length", type=int, default=RANK_MAX_LENGTH,
+                        help="Rebalance users with a key longer than this")
+    parser.add_argument("--email", help="Rebalance this user's todos regardless of key length")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if args.email:
+            user = db.query(User).filter(User.email == args.email).first()
+            if not user:
+                print(f"User not found: {args.email}", file=sys.stderr)
+                return 1
+            user_ids = [user.id]
+        else:
+            user_ids = users_with_long_ranks(db, args.max_length)
+
+        # One transaction per user keeps each rewrite short
+        rewritten = 0
+        for user_id in user_ids:
+            rewritten += rebalance_ranks(db, user_id)
+            db.commit()
+        print(f"Rebalanced {len(user_ids)} user(s), rewrote {rewritten} rank key(s)")
+        return 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
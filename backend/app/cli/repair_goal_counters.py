@@ -0,0 +1,44 @@
+"""
+Recompute the per-goal todo and focus counters from the source rows
+
+Corrects any drift (e.g. from writes made outside the API) and prints how
+many goals were out of date. Safe to run while the app is serving; schedule
+it periodically or after manual data fixes:
+    python -m app.cli.repair_goal_counters
+    python -m app.cli.repair_goal_counters --email user@example.com
+"""
+import argparse
+import sys
+
+from app.db.database import SessionLocal
+from app.models.user import User
+from app.services.goal_counters import repair_goal_counters
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Recompute the per-goal todo and focus counters")
+    parser.add_argument("--email", help="Only repair this user's goals")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if args.email:
+            user = db.query(User).filter(User.email == args.email).first()
+            if not user:
+                print(f"User not found: {args.email}", file=sys.stderr)
+                return 1
+            user_ids = [user.id]
+        else:
+            # One transaction per user keeps each repair short
+            user_ids = [user_id for (user_id,) in db.query(User.id).order_by(User.id)]
+
+        repaired = 0
+        for user_id in user_ids:
+            repaired += repair_goal_counters(db, user_id)
+            db.commit()
+        print(f"Repaired the counters of {repaired} goal(s)")
+        return 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
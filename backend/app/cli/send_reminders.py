@@ -0,0 +1,43 @@
+"""
+Run the due-date reminder scheduler in its own process
+
+For deployments that set REMINDERS_ENABLED=false on the web workers, so one
+process loads and dispatches reminders instead of every worker. Runs until
+interrupted:
+    python -m app.cli.send_reminders [--once]
+"""
+import argparse
+import asyncio
+import sys
+
+from app.db.database import SessionLocal
+from app.services.reminders import reminder_scheduler
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the due-date reminder scheduler in its own process")
+    parser.add_argument("--once", action="store_true", help="Send the reminders due now and exit (e.g. from cron)")
+    args = parser.parse_args(argv)
+
+    if not args.once:
+        try:
+            asyncio.run(reminder_scheduler.run())
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    db = SessionLocal()
+    try:
+        reminder_scheduler.load(db)
+        sent = 0
+        while True:
+            popped = reminder_scheduler.dispatch_due(db)
+            sent += popped
+            if popped < reminder_scheduler.batch_size:
+                break
+        print(f"Processed {sent} due reminder(s); retried {reminder_scheduler.redeliver(db)} undelivered")
+        return 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Production server: gunicorn supervising N uvicorn worker processes
+
+Usage:
+    python -m app.cli.serve                          # WEB_CONCURRENCY or one worker per CPU
+    python -m app.cli.serve --workers 4 --bind 0.0.0.0:8000
+    python -m app.cli.serve --no-preload             # import the app in each worker instead
+
+With preloading the app is imported (and the music catalog loaded) once in
+the master, then workers are forked and share those pages copy-on-write.
+Each worker is recycled after MAX_REQUESTS (+ up to MAX_REQUESTS_JITTER)
+requests and gets GRACEFUL_TIMEOUT seconds to finish in-flight requests on
+recycle, reload (SIGHUP) or shutdown (SIGTERM). Set CACHE_URL so the
+workers share one cache instead of one each.
+
+The bcrypt cost is calibrated once in the master, before any worker is
+forked, so every worker (including recycled ones) hashes with the same cost
+and they never rehash each other's passwords.
+
+Likewise the master runs create_schema (migrations and backfills) once,
+unless AUTO_CREATE_SCHEMA=false, and turns AUTO_CREATE_SCHEMA off for the
+workers, so starting or recycling a worker never migrates again.
+"""
+import argparse
+import gc
+import os
+
+from gunicorn.app.base import BaseApplication
+
+def default_workers() -> int:
+    return int(os.getenv("WEB_CONCURRENCY", "0")) or os.cpu_count() or 1
+
+def post_fork(server, worker):
+    from app.db.database import get_engine
+
+    # Never reuse a pooled connection inherited from the master
+    get_engine().dispose(close=False)
+
+class FocusApplication(BaseApplication):
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+        from app.db.database import get_engine
+        from app.services.music_catalog import warm_music_catalog
+        from app.utils.passwords import get_pwd_context
+
+        if self.cfg.preload_app:
+            warm_music_catalog()
+            get_pwd_context()
+            # Workers open their own connections after fork
+            get_engine().dispose()
+            # Keep the garbage collector from touching (and so copying) preloaded objects
+            gc.freeze()
+        return app
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the API with gunicorn and uvicorn workers")
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--bind", default=f"0.0.0.0:{os.getenv('PORT', '8000')}")
+    parser.add_argument("--no-preload", action="store_true", help="Import the app in every worker")
+    parser.add_argument("--max-requests", type=int, default=int(os.getenv("MAX_REQUESTS", "10000")),
+                        help="Recycle a worker after this many requests (0 disables)")
+    parser.add_argument("--max-requests-jitter", type=int, default=int(os.getenv("MAX_REQUESTS_JITTER", "1000")))
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_TIMEOUT", "30")))
+    parser.add_argument("--timeout", type=int, default=int(os.getenv("WORKER_TIMEOUT", "60")))
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    args = parser.parse_args(argv)
+
+    from app.db import database
+    from app.utils.passwords import bcrypt_rounds
+    bcrypt_rounds()
+
+    if database.AUTO_CREATE_SCHEMA:
+        database.create_schema()
+        # Workers open their own connections after fork
+        database.get_engine().dispose()
+    # Read by app.main when it is imported, in the master (preload) or in each worker
+    database.AUTO_CREATE_SCHEMA = False
+    os.environ["AUTO_CREATE_SCHEMA"] = "false"
+
+    FocusApplication({
+        "bind": args.bind,
+        "workers": max(1, args.workers),
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": not args.no_preload,
+        "post_fork": post_fork,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests_jitter,
+        "graceful_timeout": args.graceful_timeout,
+        "timeout": args.timeout,
+        "keepalive": 5,
+        "loglevel": args.log_level,
+    }).run()
+
+if __name__ == "__main__":
+    main()
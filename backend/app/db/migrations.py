@@ -0,0 +1,204 @@
+"""
+Upgrades for databases created by an earlier version of the models
+
+create_all() only creates missing tables, so columns added to an existing
+model are added here with ALTER TABLE ... ADD COLUMN, new indexes on
+existing tables are created, foreign keys whose ON DELETE action changed
+are replaced and JSON columns become JSONB on PostgreSQL. Added columns
+must be nullable, generated or have a server_default, which fills in the
+existing rows. Everything here is idempotent and is run
+by create_schema().
+"""
+from typing import List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.schema import CreateColumn, CreateIndex, CreateTable
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.types import String
+
+def _default_sql(column) -> str:
+    default = column.server_default.arg
+    if isinstance(default, TextClause):
+        return default.text
+    return "'" + str(default).replace("'", "''") + "'"
+
+def _column_sql(column, dialect) -> str:
+    if column.computed is not None:
+        # Generated columns fill themselves in (SQLite can only add virtual ones)
+        return str(CreateColumn(column).compile(dialect=dialect))
+    sql = f"{column.name} {column.type.compile(dialect=dialect)}"
+    if column.server_default is not None:
+        sql += f" DEFAULT {_default_sql(column)}"
+        if not column.nullable:
+            sql += " NOT NULL"
+    elif not column.nullable:
+        raise ValueError(f"Column {column} needs a server_default to be added to an existing table")
+    for foreign_key in column.foreign_keys:
+        target = foreign_key.column
+        sql += f" REFERENCES {target.table.name} ({target.name})"
+        if foreign_key.ondelete:
+            sql += f" ON DELETE {foreign_key.ondelete}"
+    return sql
+
+def add_missing_columns(engine, metadata) -> List[str]:
+    """Add the model columns missing from existing tables; returns them as "table.column" """
+    added = []
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        existing_tables = set(inspector.get_table_names())
+        for table in metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            missing = [column for column in table.columns if column.name not in existing]
+            for column in missing:
+                connection.execute(text(
+                    f"ALTER TABLE {table.name} ADD COLUMN {_column_sql(column, connection.dialect)}"
+                ))
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+def _ondelete(action) -> str:
+    return (action or "NO ACTION").upper()
+
+def _stale_foreign_keys(inspector, table):
+    """(model constraint, reflected foreign key) pairs whose ON DELETE action differs"""
+    reflected = inspector.get_foreign_keys(table.name)
+    stale = []
+    for constraint in table.foreign_key_constraints:
+        columns = [column.name for column in constraint.columns]
+        current = next((
+            foreign_key for foreign_key in reflected
+            if foreign_key["constrained_columns"] == columns
+            and foreign_key["referred_table"] == constraint.referred_table.name
+        ), None)
+        if current is not None and _ondelete(current["options"].get("ondelete")) != _ondelete(constraint.ondelete):
+            stale.append((constraint, current))
+    return stale
+
+def _replace_postgresql_foreign_keys(connection, table, stale):
+    for constraint, current in stale:
+        columns = ", ".join(column.name for column in constraint.columns)
+        referred = ", ".join(element.column.name for element in constraint.elements)
+        connection.execute(text(f"ALTER TABLE {table.name} DROP CONSTRAINT {current['name']}"))
+        # NOT VALID then VALIDATE: existing rows are checked without blocking writes
+        connection.execute(text(
+            f"ALTER TABLE {table.name} ADD CONSTRAINT {current['name']} FOREIGN KEY ({columns}) "
+            f"REFERENCES {constraint.referred_table.name} ({referred}) "
+            f"ON DELETE {_ondelete(constraint.ondelete)} NOT VALID"
+        ))
+        connection.execute(text(f"ALTER TABLE {table.name} VALIDATE CONSTRAINT {current['name']}"))
+
+def _rebuild_sqlite_table(connection, table, existing_columns):
+    """
+    Recreate a table from its model, keeping its rows (SQLite cannot alter
+    constraints); the caller recreates its indexes and triggers
+    """
+    # First apply the ON DELETE actions to rows orphaned while foreign keys
+    # were not enforced (while the table's triggers still exist)
+    for constraint in table.foreign_key_constraints:
+        for element in constraint.elements:
+            column, referred = element.parent.name, element.column
+            orphaned = (
+                f"{column} IS NOT NULL AND {column} NOT IN "
+                f"(SELECT {referred.name} FROM {referred.table.name})"
+            )
+            if _ondelete(constraint.ondelete) == "CASCADE":
+                connection.execute(text(f"DELETE FROM {table.name} WHERE {orphaned}"))
+            elif _ondelete(constraint.ondelete) == "SET NULL":
+                connection.execute(text(f"UPDATE {table.name} SET {column} = NULL WHERE {orphaned}"))
+
+    new_name = f"_new_{table.name}"
+    create = str(CreateTable(table).compile(dialect=connection.dialect))
+    connection.execute(text(create.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {new_name} ", 1)))
+    columns = ", ".join(
+        column.name for column in table.columns
+        if column.name in existing_columns and column.computed is None
+    )
+    connection.execute(text(f"INSERT INTO {new_name} ({columns}) SELECT {columns} FROM {table.name}"))
+    connection.execute(text(f"DROP TABLE {table.name}"))
+    connection.execute(text(f"ALTER TABLE {new_name} RENAME TO {table.name}"))
+
+def upgrade_foreign_keys(engine, metadata) -> List[str]:
+    """Replace foreign keys whose ON DELETE action differs from the model; returns the tables changed"""
+    upgraded = []
+    with engine.connect() as connection:
+        dialect = connection.dialect.name
+        if dialect == "sqlite":
+            # Dropping a referenced table must not trigger its children's actions
+            connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        try:
+            inspector = inspect(connection)
+            existing_tables = set(inspector.get_table_names())
+            for table in metadata.sorted_tables:
+                if table.name not in existing_tables:
+                    continue
+                stale = _stale_foreign_keys(inspector, table)
+                if not stale:
+                    continue
+                if dialect == "postgresql":
+                    _replace_postgresql_foreign_keys(connection, table, stale)
+                elif dialect == "sqlite":
+                    existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+                    _rebuild_sqlite_table(connection, table, existing_columns)
+                else:
+                    continue
+                upgraded.append(table.name)
+            connection.commit()
+        finally:
+            if dialect == "sqlite":
+                connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+    return upgraded
+
+def add_missing_indexes(engine, metadata):
+    """Create the model indexes missing from existing tables"""
+    with engine.begin() as connection:
+        for table in metadata.sorted_tables:
+            for index in table.indexes:
+                # Not checkfirst: reflection skips expression indexes.
+                # _invoke_with() honours ddl_if() (dialect-specific indexes)
+                CreateIndex(index, if_not_exists=True)._invoke_with(connection)
+
+def convert_json_columns(engine, metadata):
+    """Turn json columns the models declare as JSONB on PostgreSQL into jsonb"""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        existing_tables = set(inspector.get_table_names())
+        for table in metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            current = {column["name"]: column["type"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                declared = column.type.dialect_impl(connection.dialect)
+                if isinstance(declared, JSONB) and column.name in current and not isinstance(current[column.name], JSONB):
+                    connection.execute(text(
+                        f"ALTER TABLE {table.name} ALTER COLUMN {column.name} TYPE JSONB USING {column.name}::jsonb"
+                    ))
+
+def convert_todo_priorities(engine):
+    """Turn todos.priority from "low"/"medium"/"high" strings into TodoPriority ordinals"""
+    from app.models.todo import TodoPriority
+
+    with engine.begin() as connection:
+        columns = {column["name"]: column for column in inspect(connection).get_columns("todos")}
+        if not isinstance(columns["priority"]["type"], String):
+            return
+        ordinal = " ".join(
+            f"WHEN '{priority.name.lower()}' THEN {priority.value}" for priority in TodoPriority
+        )
+        ordinal = f"CASE lower(priority) {ordinal} ELSE {TodoPriority.MEDIUM.value} END"
+        if connection.dialect.name == "postgresql":
+            connection.execute(text("ALTER TABLE todos ALTER COLUMN priority DROP DEFAULT"))
+            connection.execute(text(f"ALTER TABLE todos ALTER COLUMN priority TYPE SMALLINT USING {ordinal}"))
+            connection.execute(text(f"ALTER TABLE todos ALTER COLUMN priority SET DEFAULT {TodoPriority.MEDIUM.value}"))
+            connection.execute(text("ALTER TABLE todos ALTER COLUMN priority SET NOT NULL"))
+        else:
+            # SQLite cannot change a column's type in place; the values are
+            # what matters (the text affinity keeps them ordered for 1-3)
+            connection.execute(text(
+                f"UPDATE todos SET priority = {ordinal} "
+                f"WHERE priority IS NULL OR priority NOT IN ({', '.join(str(p.value) for p in TodoPriority)})"
+            ))
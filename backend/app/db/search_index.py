@@ -0,0 +1,82 @@
+"""
+Full-text index over the title and description of todos, goals and activities
+
+PostgreSQL: a stored generated tsvector column per table (title weighted A,
+description B) with a GIN index. SQLite: one FTS5 table kept in sync by
+triggers. Either way the database maintains the index on every write, from
+the routers, imports or anywhere else. create_search_index() is idempotent
+and is run by create_schema().
+"""
+from sqlalchemy import text
+
+# Searchable tables and the code identifying each in the SQLite index rowid:
+#   rowid = user_id * SEARCH_USER_STRIDE + id * SEARCH_KIND_COUNT + code
+# so each user's entries are one contiguous rowid range, which FTS5 reads
+# without touching other users' entries
+SEARCH_TABLES = {"todo": ("todos", 1), "goal": ("goals", 2), "activity": ("activities", 3)}
+SEARCH_KIND_COUNT = 4
+SEARCH_USER_STRIDE = 2 ** 36
+# Prefix lengths with their own FTS5 index; longer prefixes would have to
+# merge the entries of every matching word
+SEARCH_PREFIX_LENGTHS = (2, 3, 4, 5, 6)
+
+TEXT_SEARCH_CONFIG = "english"
+
+def _postgresql_statements():
+    for table, _ in SEARCH_TABLES.values():
+        yield (
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+            ") STORED"
+        )
+        yield f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING GIN (search_vector)"
+
+def _sqlite_rowid(prefix: str, code: int) -> str:
+    return f"{prefix}.user_id * {SEARCH_USER_STRIDE} + {prefix}.id * {SEARCH_KIND_COUNT} + {code}"
+
+def _sqlite_statements(backfill: bool):
+    prefixes = " ".join(str(length) for length in SEARCH_PREFIX_LENGTHS)
+    yield (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        f"title, description, prefix='{prefixes}', tokenize='porter unicode61')"
+    )
+    for table, code in SEARCH_TABLES.values():
+        insert = (
+            f"INSERT INTO search_index (rowid, title, description) "
+            f"VALUES ({_sqlite_rowid('new', code)}, new.title, coalesce(new.description, ''));"
+        )
+        delete = f"DELETE FROM search_index WHERE rowid = {_sqlite_rowid('old', code)};"
+        yield f"CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN {insert} END"
+        yield f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN {delete} END"
+        yield (
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_update "
+            f"AFTER UPDATE OF title, description, user_id ON {table} BEGIN {delete} {insert} END"
+        )
+        if backfill:
+            yield (
+                f"INSERT INTO search_index (rowid, title, description) "
+                f"SELECT {_sqlite_rowid(table, code)}, title, coalesce(description, '') FROM {table}"
+            )
+
+def optimize_search_index(engine):
+    """Merge the SQLite index into one segment, e.g. after a bulk import (a no-op on PostgreSQL)"""
+    with engine.begin() as connection:
+        if connection.dialect.name == "sqlite":
+            connection.execute(text("INSERT INTO search_index (search_index) VALUES ('optimize')"))
+
+def create_search_index(engine):
+    """Create the full-text index, its triggers and (on SQLite) backfill existing rows"""
+    with engine.begin() as connection:
+        dialect = connection.dialect.name
+        if dialect == "postgresql":
+            statements = _postgresql_statements()
+        elif dialect == "sqlite":
+            exists = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = 'search_index'")
+            ).first() is not None
+            statements = _sqlite_statements(backfill=not exists)
+        else:
+            return
+        for statement in statements:
+            connection.execute(text(statement))
@@ -1,17 +1,76 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.database import engine, Base
-from app.routers import users, todos, goals, activities, boost, music
+from app.middleware import (
+    CompressionMiddleware,
+    ConcurrencyLimitMiddleware,
+    MetricsMiddleware,
+    RateLimitMiddleware,
+)
+from app.db.database import AUTO_CREATE_SCHEMA, create_schema, on_engine_created
+from app.routers import users, todos, goals, activities, boost, music, imports, dashboard, health, search, leaderboards, reminders
+from app.services.leaderboards import (
+    LEADERBOARD_SNAPSHOT_PATH,
+    save_leaderboard_snapshot,
+    snapshot_leaderboards,
+    warm_leaderboards,
+)
+from app.services.music_catalog import warm_music_catalog
+from app.services.reminders import REMINDERS_ENABLED, reminder_scheduler
+from app.utils.health import event_loop_monitor
+from app.utils.metrics import instrument_engine, render_metrics
+from app.utils.passwords import get_pwd_context
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Attribute SQL statement timing to requests for /metrics and the slow-request log
+# (the engine itself is only created when first needed)
+on_engine_created(instrument_engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if AUTO_CREATE_SCHEMA:
+        await run_in_threadpool(create_schema)
+    # Index the music catalog off the startup path; music requests arriving
+    # before it finishes load it themselves
+    loop = asyncio.get_running_loop()
+    warmup = loop.run_in_executor(None, warm_music_catalog)
+    # Likewise calibrate the bcrypt cost (and import passlib) before the first login
+    calibration = loop.run_in_executor(None, get_pwd_context)
+    # And rank focus time for the leaderboards (from the snapshot, if any)
+    leaderboard_warmup = loop.run_in_executor(None, warm_leaderboards)
+    snapshots = loop.create_task(snapshot_leaderboards()) if LEADERBOARD_SNAPSHOT_PATH else None
+    event_loop_monitor.start()
+    # Send due-date reminders from this worker (see app.services.reminders)
+    if REMINDERS_ENABLED:
+        reminder_scheduler.start()
+    yield
+    await reminder_scheduler.stop()
+    await event_loop_monitor.stop()
+    await warmup
+    await calibration
+    await leaderboard_warmup
+    if snapshots is not None:
+        snapshots.cancel()
+        await loop.run_in_executor(None, save_leaderboard_snapshot)
 
 app = FastAPI(
     title="Focus App API",
     description="API for a focus and productivity tracking app with AI-powered video recommendations",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Adaptive concurrency limit: sheds excess requests with 503 + Retry-After
+# (innermost, so the rejections still get CORS headers)
+app.add_middleware(ConcurrencyLimitMiddleware)
+
+# Per-user sliding-window rate limits (429 + RateLimit-* headers), checked
+# before a request takes a concurrency slot
+app.add_middleware(RateLimitMiddleware)
+
 # CORS middleware configuration
 app.add_middleware(
     CORSMiddleware,
@@ -21,6 +80,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Negotiated brotli/gzip compression for responses over COMPRESSION_MINIMUM_SIZE bytes
+app.add_middleware(CompressionMiddleware)
+
+# Per-route latency and SQL statistics (outermost, so it times the whole stack)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(users.router)
 app.include_router(todos.router)
@@ -28,6 +93,12 @@ app.include_router(goals.router)
 app.include_router(activities.router)
 app.include_router(boost.router)
 app.include_router(music.router)
+app.include_router(imports.router)
+app.include_router(dashboard.router)
+app.include_router(health.router)
+app.include_router(search.router)
+app.include_router(leaderboards.router)
+app.include_router(reminders.router)
 
 @app.get("/")
 async def root():
@@ -41,3 +112,8 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "message": "Focus App API is running"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus-format performance metrics"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,6 @@
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.concurrency import ConcurrencyLimitMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+
+__all__ = ["CompressionMiddleware", "ConcurrencyLimitMiddleware", "MetricsMiddleware", "RateLimitMiddleware"]
@@ -0,0 +1,136 @@
+import math
+import os
+import time
+from typing import Optional
+
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.utils.metrics import HTTP_REQUESTS_IN_FLIGHT, HTTP_REQUESTS_SHED, CONCURRENCY_LIMIT
+
+CONCURRENCY_LIMIT_ENABLED = os.getenv("CONCURRENCY_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+CONCURRENCY_TARGET_P90_MS = float(os.getenv("CONCURRENCY_TARGET_P90_MS", "500"))
+CONCURRENCY_INITIAL_LIMIT = int(os.getenv("CONCURRENCY_INITIAL_LIMIT", "100"))
+CONCURRENCY_MIN_LIMIT = int(os.getenv("CONCURRENCY_MIN_LIMIT", "16"))
+CONCURRENCY_MAX_LIMIT = int(os.getenv("CONCURRENCY_MAX_LIMIT", "500"))
+
+# Probes and metrics must keep answering while the app sheds load
+EXEMPT_PATHS = ("/health", "/metrics")
+# Slow by nature (bulk uploads, YouTube calls): they hold a slot like any
+# request, but are left out of the latency samples so they don't shrink the
+# limit for everything else
+UNSAMPLED_PATHS = ("/api/import", "/api/boost")
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD limit on concurrent requests driven by observed latency
+
+    Every window the p90 latency of completed requests is compared with the
+    target: above it the limit shrinks by 10%, below it (and while the limit
+    was actually reached) it grows by about sqrt(limit). Requests arriving
+    while `limit` are already in flight are rejected instead of queued, so
+    admitted requests keep their latency under overload.
+    """
+
+    def __init__(
+        self,
+        target_p90_ms: float = CONCURRENCY_TARGET_P90_MS,
+        initial_limit: int = CONCURRENCY_INITIAL_LIMIT,
+        min_limit: int = CONCURRENCY_MIN_LIMIT,
+        max_limit: int = CONCURRENCY_MAX_LIMIT,
+        window_seconds: float = 1.0,
+        min_samples: int = 20
+    ):
+        self.target = target_p90_ms / 1000
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self.in_flight = 0
+        self.shed_total = 0
+        self._samples = []
+        self._window_start = time.monotonic()
+        self._peak_in_flight = 0
+        CONCURRENCY_LIMIT.set(int(self.limit))
+
+    def try_acquire(self, shed: bool = True) -> bool:
+        # Only called from the event loop thread, so no locking is needed
+        if shed and self.in_flight >= int(self.limit):
+            self.shed_total += 1
+            HTTP_REQUESTS_SHED.inc()
+            return False
+        self.in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self.in_flight)
+        HTTP_REQUESTS_IN_FLIGHT.set(self.in_flight)
+        return True
+
+    def release(self, latency: Optional[float]):
+        """Free a slot; latency is None for requests kept out of the samples"""
+        self.in_flight -= 1
+        HTTP_REQUESTS_IN_FLIGHT.set(self.in_flight)
+        if latency is None:
+            return
+        self._samples.append(latency)
+        if len(self._samples) >= self.min_samples and time.monotonic() - self._window_start >= self.window_seconds:
+            self._adjust()
+
+    def _adjust(self):
+        samples = sorted(self._samples)
+        p90 = samples[min(len(samples) - 1, int(len(samples) * 0.9))]
+        if p90 > self.target:
+            self.limit = max(self.min_limit, self.limit * 0.9)
+        elif self._peak_in_flight >= int(self.limit):
+            self.limit = min(self.max_limit, self.limit + math.sqrt(self.limit))
+        CONCURRENCY_LIMIT.set(int(self.limit))
+        self._samples = []
+        self._peak_in_flight = self.in_flight
+        self._window_start = time.monotonic()
+
+    def snapshot(self):
+        return {
+            "in_flight": self.in_flight,
+            "limit": int(self.limit),
+            "target_p90_ms": self.target * 1000,
+            "shed_total": self.shed_total,
+        }
+
+concurrency_limiter = AdaptiveConcurrencyLimiter()
+
+OVERLOADED_BODY = orjson.dumps({"detail": "Server is overloaded, please retry shortly"})
+
+class ConcurrencyLimitMiddleware:
+    """Reject requests beyond the adaptive concurrency limit with 503 and Retry-After"""
+
+    def __init__(self, app: ASGIApp, limiter: AdaptiveConcurrencyLimiter = concurrency_limiter,
+                 enabled: bool = CONCURRENCY_LIMIT_ENABLED, retry_after: int = 1):
+        self.app = app
+        self.limiter = limiter
+        self.enabled = enabled
+        self.retry_after = str(retry_after)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        # With the limiter disabled requests are still counted, never rejected
+        if not self.limiter.try_acquire(shed=self.enabled):
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(OVERLOADED_BODY)).encode()),
+                    (b"retry-after", self.retry_after.encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": OVERLOADED_BODY})
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            sampled = not scope["path"].startswith(UNSAMPLED_PATHS)
+            self.limiter.release(time.perf_counter() - start if sampled else None)
@@ -0,0 +1,71 @@
+import logging
+import os
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metrics import (
+    HTTP_REQUESTS,
+    HTTP_REQUEST_DURATION,
+    DB_QUERIES_PER_REQUEST,
+    DB_TIME_PER_REQUEST,
+    start_request_stats,
+    end_request_stats,
+)
+
+# Requests slower than this are logged with the SQL they issued
+SLOW_REQUEST_THRESHOLD_MS = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "500"))
+
+slow_request_logger = logging.getLogger("app.slow_requests")
+
+def route_label(scope: Scope) -> str:
+    """Route template (e.g. /api/todos/{todo_id}) to keep label cardinality bounded"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class MetricsMiddleware:
+    """Record per-route latency and SQL statistics for every HTTP request"""
+
+    def __init__(self, app: ASGIApp, slow_request_threshold_ms: float = SLOW_REQUEST_THRESHOLD_MS):
+        self.app = app
+        self.slow_request_threshold = slow_request_threshold_ms / 1000
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats, token = start_request_stats()
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            end_request_stats(token)
+
+            method, route = scope["method"], route_label(scope)
+            HTTP_REQUESTS.inc(method, route, str(status_code))
+            HTTP_REQUEST_DURATION.observe(duration, method, route)
+            DB_QUERIES_PER_REQUEST.observe(stats.query_count, method, route)
+            DB_TIME_PER_REQUEST.observe(stats.query_time, method, route)
+
+            if duration >= self.slow_request_threshold:
+                self._log_slow_request(scope, status_code, duration, stats)
+
+    def _log_slow_request(self, scope, status_code, duration, stats):
+        statements = "\n".join(
+            f"  [{query_time * 1000:.1f} ms] {statement}" for query_time, statement in stats.statements
+        )
+        slow_request_logger.warning(
+            "Slow request %s %s -> %s in %.1f ms (%d queries, %.1f ms in SQL)\n%s",
+            scope["method"], scope["path"], status_code, duration * 1000,
+            stats.query_count, stats.query_time * 1000, statements
+        )
@@ -0,0 +1,97 @@
+import logging
+from typing import List
+
+import orjson
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.rate_limit import RATE_LIMIT_ENABLED, BucketResult, RateLimiter, rate_limiter
+from app.utils.auth import decode_access_token
+from app.utils.metrics import RATE_LIMITED_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+EXEMPT_PATHS = ("/health", "/metrics", "/docs", "/redoc", "/openapi.json")
+
+def request_identity(scope: Scope) -> str:
+    """The authenticated user's email, or the client address for anonymous requests"""
+    authorization = Headers(scope=scope).get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        email = decode_access_token(token)
+        if email:
+            return f"user:{email}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+def rate_limit_headers(results: List[BucketResult]) -> List[tuple]:
+    """RateLimit-* headers for the bucket closest to its limit"""
+    result = min(results, key=lambda result: (result.allowed, result.remaining / result.bucket.limit))
+    headers = [
+        (b"ratelimit-limit", str(result.bucket.limit).encode()),
+        (b"ratelimit-remaining", str(result.remaining).encode()),
+        (b"ratelimit-reset", str(result.reset_seconds).encode()),
+        (b"ratelimit-policy", f"{result.bucket.limit};w={result.bucket.window_seconds}".encode()),
+    ]
+    if not result.allowed:
+        headers.append((b"retry-after", str(result.retry_after).encode()))
+    return headers
+
+class RateLimitMiddleware:
+    """Per-user, per-bucket sliding-window rate limits with RateLimit-* headers and 429s"""
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter = rate_limiter, enabled: bool = RATE_LIMIT_ENABLED):
+        self.app = app
+        self.limiter = limiter
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            not self.enabled
+            or scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or scope["path"].startswith(EXEMPT_PATHS)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        identity = request_identity(scope)
+        try:
+            if self.limiter.store.shared:
+                # Shared stores do blocking I/O
+                results = await run_in_threadpool(self.limiter.check, identity, scope["method"], scope["path"])
+            else:
+                results = self.limiter.check(identity, scope["method"], scope["path"])
+        except Exception:
+            # An unavailable shared store fails open rather than taking the API down
+            logger.warning("Rate limit check failed; allowing request", exc_info=True)
+            await self.app(scope, receive, send)
+            return
+
+        if not results:
+            await self.app(scope, receive, send)
+            return
+
+        headers = rate_limit_headers(results)
+        if not results[-1].allowed:
+            RATE_LIMITED_REQUESTS.inc(results[-1].bucket.name)
+            body = orjson.dumps({"detail": f"Rate limit exceeded ({results[-1].bucket.name}), retry later"})
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    *headers,
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
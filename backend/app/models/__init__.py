@@ -1,8 +1,14 @@
 from app.models.user import User
-from app.models.todo import Todo
+from app.models.todo import Todo, TodoPriority
 from app.models.goal import Goal
 from app.models.activity import Activity
 from app.models.video import Video
+from app.models.import_job import ImportJob
+from app.models.music import MusicPlaylist, MusicTrack
+from app.models.focus_profile import FocusProfile
+from app.models.refresh_token import RefreshToken, RevokedSession
+from app.models.leaderboard import FocusDay, Friendship
+from app.models.reminder import Reminder
 
-__all__ = ["User", "Todo", "Goal", "Activity", "Video"]
+__all__ = ["User", "Todo", "TodoPriority", "Goal", "Activity", "Video", "ImportJob", "MusicPlaylist", "MusicTrack", "FocusProfile", "RefreshToken", "RevokedSession", "FocusDay", "Friendship", "Reminder"]
 
@@ -1,20 +1,67 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Computed, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql.functions import FunctionElement
 from datetime import datetime
 from app.db.database import Base
 
+class json_integer(FunctionElement):
+    """
+    json_integer(document, key): the integer under a top-level key of a JSON
+    document, NULL when absent or of any other JSON type (so generated
+    columns never fail on odd client data)
+    """
+    type = Integer()
+    inherit_cache = True
+    name = "json_integer"
+
+@compiles(json_integer, "postgresql")
+def _json_integer_postgresql(element, compiler, **kw):
+    document, key = element.clauses
+    document = compiler.process(document, **kw)
+    key = "'" + key.value.replace("'", "''") + "'"
+    return (
+        f"CASE WHEN jsonb_typeof({document} -> {key}) = 'number' "
+        f"AND ({document} ->> {key}) ~ '^-?[0-9]{{1,9}}$' THEN ({document} ->> {key})::integer END"
+    )
+
+@compiles(json_integer)
+def _json_integer_default(element, compiler, **kw):
+    document, key = element.clauses
+    document = compiler.process(document, **kw)
+    path = "'$." + key.value.replace("'", "''") + "'"
+    # SQLite's JSON functions
+    return f"CASE WHEN json_type({document}, {path}) = 'integer' THEN json_extract({document}, {path}) END"
+
 class Activity(Base):
     __tablename__ = "activities"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     activity_type = Column(String, nullable=False)  # e.g., "focus_session", "todo_completed", "goal_updated"
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     duration_minutes = Column(Integer, nullable=True)  # For focus sessions
-    extra_data = Column(JSON, nullable=True)  # Store additional data like tags, mood, etc. (renamed from metadata)
+    # Store additional data like tags, mood, etc. (renamed from metadata); JSONB on PostgreSQL
+    extra_data = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # The hottest extra_data keys, promoted to generated columns the database
+    # keeps in sync (stored on PostgreSQL, virtual on SQLite) so they can be
+    # indexed like any other column
+    todo_id = Column(Integer, Computed(json_integer(extra_data, "todo_id")))
+    goal_id = Column(Integer, Computed(json_integer(extra_data, "goal_id")))
     
     # Relationships
     user = relationship("User", back_populates="activities")
 
+    __table_args__ = (
+        # Per-todo and per-goal focus history, newest first
+        Index("ix_activities_user_todo_created", user_id, todo_id, created_at),
+        Index("ix_activities_user_goal_created", user_id, goal_id, created_at),
+        # Containment (@>) filters on any other key, e.g. tags
+        Index(
+            "ix_activities_extra_data", extra_data,
+            postgresql_using="gin", postgresql_ops={"extra_data": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, JSON
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.db.database import Base
+
+class FocusProfile(Base):
+    """Running per-user aggregates of focus sessions, maintained as sessions are logged"""
+    __tablename__ = "focus_profiles"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_sessions = Column(Integer, default=0)
+    completed_sessions = Column(Integer, default=0)
+    total_minutes = Column(Integer, default=0)
+    sessions_by_hour = Column(JSON, nullable=True)  # 24 session counts by UTC hour started
+    playlist_stats = Column(JSON, nullable=True)  # Playlist slug -> {"sessions", "completed", "minutes"}
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    user = relationship("User", back_populates="focus_profile")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.database import Base
@@ -7,18 +7,31 @@ class Goal(Base):
     __tablename__ = "goals"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     category = Column(String, nullable=True)  # e.g., "career", "health", "learning", "personal"
     target_date = Column(DateTime, nullable=True)
     is_achieved = Column(Boolean, default=False)
     progress_percentage = Column(Integer, default=0)
+    progress_mode = Column(String, nullable=False, default="manual", server_default="manual")  # "manual" or "auto" (from todo completion)
+    # Denormalized counters, maintained by app.services.goal_counters
+    total_todos = Column(Integer, nullable=False, default=0, server_default="0")
+    completed_todos = Column(Integer, nullable=False, default=0, server_default="0")
+    focus_minutes = Column(Integer, nullable=False, default=0, server_default="0")
+    focus_sessions = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     achieved_at = Column(DateTime, nullable=True)
     
     # Relationships
     user = relationship("User", back_populates="goals")
-    todos = relationship("Todo", back_populates="goal")
+    todos = relationship("Todo", back_populates="goal", passive_deletes=True)  # todos.goal_id is SET NULL by the database
 
+    __table_args__ = (
+        # Upcoming target dates of every user, for the reminder scheduler's range scans
+        Index(
+            "ix_goals_open_target_date", target_date,
+            postgresql_where=is_achieved == False, sqlite_where=is_achieved == False  # noqa: E712
+        ),
+    )
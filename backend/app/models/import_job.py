@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.db.database import Base
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    kind = Column(String, nullable=False)  # todos, goals, activities
+    source_format = Column(String, nullable=False)  # ndjson, csv
+    status = Column(String, default="running")  # running, completed, failed
+    rows_processed = Column(Integer, default=0)  # Checkpoint: source rows consumed so far
+    rows_imported = Column(Integer, default=0)
+    rows_failed = Column(Integer, default=0)
+    goal_refs = Column(JSON, nullable=True)  # Source goal reference -> imported goal id
+    errors = Column(JSON, nullable=True)  # First validation errors, by source row number
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    user = relationship("User", back_populates="import_jobs")
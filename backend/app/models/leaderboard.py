@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.db.database import Base
+
+class FocusDay(Base):
+    """A user's focus-session minutes on one UTC day, maintained as sessions are logged"""
+    __tablename__ = "focus_days"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)
+    minutes = Column(Integer, nullable=False, default=0, server_default="0")
+    # Every change bumps it; leaderboards sync on it
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    
+    # Relationships
+    user = relationship("User", back_populates="focus_days")
+
+    __table_args__ = (
+        # Upsert target, and a user's days in order
+        Index("ix_focus_days_user_day", user_id, day, unique=True),
+    )
+
+class Friendship(Base):
+    """user_id follows friend_id on the friends leaderboard"""
+    __tablename__ = "friendships"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    friend_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    user = relationship("User", back_populates="friendships", foreign_keys=[user_id])
+    friend = relationship("User", foreign_keys=[friend_id])
+
+    __table_args__ = (
+        Index("ix_friendships_user_friend", user_id, friend_id, unique=True),
+    )
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.db.database import Base
+
+class MusicPlaylist(Base):
+    __tablename__ = "music_playlists"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    slug = Column(String, unique=True, index=True, nullable=False)  # Public id, e.g. "lofi"
+    name = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    times_of_day = Column(JSON, nullable=True)  # e.g. ["morning", "afternoon"] for time-of-day recommendations
+    position = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    tracks = relationship("MusicTrack", back_populates="playlist", cascade="all, delete-orphan",
+                          order_by="MusicTrack.position")
+
+class MusicTrack(Base):
+    __tablename__ = "music_tracks"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    slug = Column(String, unique=True, index=True, nullable=False)  # Public id, e.g. "lofi_1"
+    playlist_id = Column(Integer, ForeignKey("music_playlists.id"), nullable=False, index=True)
+    title = Column(String, nullable=False)
+    artist = Column(String, nullable=True)
+    duration = Column(Integer, nullable=True)  # Seconds
+    url = Column(String, nullable=True)
+    embed_id = Column(String, nullable=True)  # YouTube video id
+    position = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    playlist = relationship("MusicPlaylist", back_populates="tracks")
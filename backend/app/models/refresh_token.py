@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.db.database import Base
+
+class RefreshToken(Base):
+    """One issued refresh token, stored as a SHA-256 digest; each rotation adds a row to the session"""
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    session_id = Column(String(32), index=True, nullable=False)  # Shared by every rotation of one login
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)  # Set when rotated, or when the session is revoked
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    user = relationship("User", back_populates="refresh_tokens")
+
+class RevokedSession(Base):
+    """A revoked login session, kept until the last access token it issued has expired"""
+    __tablename__ = "revoked_sessions"
+    
+    session_id = Column(String(32), primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
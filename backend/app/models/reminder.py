@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.db.database import Base
+
+class Reminder(Base):
+    """
+    A due-date reminder that fired: the outbox clients read, and the record
+    that it was sent (once per todo or goal and deadline)
+    """
+    __tablename__ = "reminders"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String(16), nullable=False)  # "todo" or "goal"
+    target_id = Column(Integer, nullable=False)  # The todo's or goal's id
+    title = Column(String, nullable=False)
+    due_at = Column(DateTime, nullable=False)  # The todo's due_date or the goal's target_date
+    remind_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    delivered_at = Column(DateTime, nullable=True)  # Handed to the reminder sink
+    dismissed_at = Column(DateTime, nullable=True)  # Kept, so the reminder is not claimed again
+    
+    # Relationships
+    user = relationship("User", back_populates="reminders")
+
+    __table_args__ = (
+        # Claiming a reminder is an insert that loses to any earlier one
+        Index("ix_reminders_target_due", kind, target_id, due_at, unique=True),
+        Index("ix_reminders_user_id", user_id, id),
+        # Batches the sink failed to take, retried on each refresh
+        Index(
+            "ix_reminders_undelivered", id,
+            postgresql_where=delivered_at.is_(None), sqlite_where=delivered_at.is_(None)
+        ),
+    )
@@ -1,17 +1,45 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
+import enum
+
+from sqlalchemy import Column, Integer, SmallInteger, String, DateTime, Boolean, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime
 from app.db.database import Base
 
+class TodoPriority(enum.IntEnum):
+    """Todo priorities, stored as their ordinal so ORDER BY priority is by urgency"""
+    LOW = 1
+    MEDIUM = 2
+    HIGH = 3
+
+class PriorityType(TypeDecorator):
+    """SMALLINT column read and written as the priority name ("low", "medium", "high")"""
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, int):
+            return value
+        return TodoPriority[value.upper()].value
+
+    def process_result_value(self, value, dialect):
+        # int(): SQLite databases upgraded in place keep the old column's text affinity
+        return TodoPriority(int(value)).name.lower() if value is not None else None
+
+# Compared byte by byte (the C collation on PostgreSQL), so prefix ranges
+# and fractional-index order are the same in every database
+OrderedString = String().with_variant(String(collation="C"), "postgresql")
+
 class Todo(Base):
     __tablename__ = "todos"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     is_completed = Column(Boolean, default=False)
-    priority = Column(String, default="medium")  # low, medium, high
+    priority = Column(PriorityType, nullable=False, default="medium", server_default=str(TodoPriority.MEDIUM.value))
     due_date = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -19,6 +47,33 @@ class Todo(Base):
     
     # Relationships
     user = relationship("User", back_populates="todos")
-    goal_id = Column(Integer, ForeignKey("goals.id"), nullable=True)
+    goal_id = Column(Integer, ForeignKey("goals.id", ondelete="SET NULL"), nullable=True)
     goal = relationship("Goal", back_populates="todos")
+    # Subtasks: parent_id links a todo to its parent, path lists the ids of
+    # all its ancestors ("/" for top-level todos, "/3/7/" for a child of 7
+    # under 3), so a whole subtree is one prefix range on ix_todos_user_path
+    parent_id = Column(Integer, ForeignKey("todos.id", ondelete="CASCADE"), nullable=True, index=True)
+    path = Column(OrderedString, nullable=False, default="/", server_default="/")
+    # Manual (drag-and-drop) order: a fractional-index key, see app.services.todo_ranks
+    rank = Column(OrderedString, nullable=False, default="a0", server_default="a0")
+
+    __table_args__ = (
+        # "What next" listings (sort=priority,due_date and sort=due_date) read
+        # open todos in index order: by urgency, then soonest due with undated
+        # ones last (due_date IS NULL is false first)
+        Index(
+            "ix_todos_user_open_priority_due",
+            user_id, is_completed, priority.desc(), due_date.is_(None), due_date
+        ),
+        Index("ix_todos_user_open_due", user_id, is_completed, due_date.is_(None), due_date),
+        # Upcoming deadlines of every user, for the reminder scheduler's range scans
+        Index(
+            "ix_todos_open_due_date", due_date,
+            postgresql_where=is_completed == False, sqlite_where=is_completed == False  # noqa: E712
+        ),
+        Index("ix_todos_user_path", user_id, path),
+        # sort=rank listings, per user and per goal
+        Index("ix_todos_user_rank", user_id, rank, id),
+        Index("ix_todos_goal_rank", goal_id, rank, id),
+    )
 
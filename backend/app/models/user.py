@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.database import Base
@@ -14,9 +14,25 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    deleted_at = Column(DateTime, nullable=True)  # Deactivated and queued for purging
+    leaderboard_opt_in = Column(Boolean, nullable=False, default=False, server_default=text("false"))
+    # When leaderboard_opt_in last changed; other workers' leaderboards sync on it
+    leaderboard_changed_at = Column(DateTime, nullable=True, index=True)
     
-    # Relationships
-    todos = relationship("Todo", back_populates="user", cascade="all, delete-orphan")
-    goals = relationship("Goal", back_populates="user", cascade="all, delete-orphan")
-    activities = relationship("Activity", back_populates="user", cascade="all, delete-orphan")
+    # Relationships. Child rows are removed by ON DELETE CASCADE in the
+    # database; passive_deletes keeps the ORM from loading them first
+    todos = relationship("Todo", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    goals = relationship("Goal", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    activities = relationship("Activity", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    import_jobs = relationship("ImportJob", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    focus_profile = relationship(
+        "FocusProfile", back_populates="user", uselist=False, cascade="all, delete-orphan", passive_deletes=True
+    )
+    refresh_tokens = relationship("RefreshToken", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    reminders = relationship("Reminder", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    focus_days = relationship("FocusDay", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    friendships = relationship(
+        "Friendship", back_populates="user", foreign_keys="Friendship.user_id",
+        cascade="all, delete-orphan", passive_deletes=True
+    )
 
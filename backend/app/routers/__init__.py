@@ -1,4 +1,3 @@
-from app.routers import users, todos, goals, activities, boost, music
-
-__all__ = ["users", "todos", "goals", "activities", "boost", "music"]
+from app.routers import users, todos, goals, activities, boost, music, imports, dashboard, health, search, leaderboards, reminders
 
+__all__ = ["users", "todos", "goals", "activities", "boost", "music", "imports", "dashboard", "health", "search", "leaderboards", "reminders"]
@@ -1,16 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime, timedelta
 
 from app.db.database import get_db
 from app.models.user import User
 from app.models.activity import Activity
 from app.schemas.activity import ActivityCreate, ActivityResponse
+from app.services.activity_filters import extra_data_clauses, parse_extra_filters
+from app.services.dashboard import invalidate_dashboard, activity_summary
+from app.services.focus_profile import record_focus_session
+from app.services.goal_counters import record_goal_focus
+from app.services.leaderboards import record_focus_day, record_focus_time
 from app.utils.auth import get_current_active_user
+from app.utils.serialization import response_columns, rows_response, sparse_columns
 
 router = APIRouter(prefix="/api/activities", tags=["activities"])
 
+ACTIVITY_FIELDS, ACTIVITY_COLUMNS = response_columns(Activity, ActivityResponse)
+
 @router.post("/", response_model=ActivityResponse, status_code=status.HTTP_201_CREATED)
 async def create_activity(
     activity: ActivityCreate,
@@ -20,8 +28,13 @@ async def create_activity(
     """Create a new activity (track focus session, completed todo, etc.)"""
     db_activity = Activity(**activity.model_dump(), user_id=current_user.id)
     db.add(db_activity)
+    record_focus_session(db, current_user.id, db_activity)
+    record_goal_focus(db, current_user.id, db_activity)
+    record_focus_day(db, current_user.id, db_activity)
     db.commit()
+    invalidate_dashboard(current_user.id)
     db.refresh(db_activity)
+    record_focus_time(current_user.id, db_activity)
     return db_activity
 
 @router.get("/", response_model=List[ActivityResponse])
@@ -30,21 +43,43 @@ async def get_activities(
     limit: int = 100,
     activity_type: str = None,
     days: int = None,  # Get activities from last N days
+    todo_id: Optional[int] = None,  # extra_data.todo_id, e.g. a todo's focus history
+    goal_id: Optional[int] = None,  # extra_data.goal_id
+    tag: List[str] = Query([]),  # In extra_data.tags; repeat to require several
+    extra: List[str] = Query([]),  # Other extra_data keys as key:value, e.g. extra=mood:great
+    fields: Optional[str] = None,  # Comma-separated sparse fieldset, e.g. "title,duration_minutes"
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get all activities for the current user"""
-    query = db.query(Activity).filter(Activity.user_id == current_user.id)
+    """Get all activities for the current user, optionally filtered on their extra_data"""
+    selected, columns = sparse_columns(fields, ACTIVITY_FIELDS, ACTIVITY_COLUMNS)
+    try:
+        extra_filters = parse_extra_filters(extra)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    query = db.query(*columns).filter(Activity.user_id == current_user.id)
     
     if activity_type:
         query = query.filter(Activity.activity_type == activity_type)
     
+    # Promoted, indexed columns
+    if todo_id is not None:
+        query = query.filter(Activity.todo_id == todo_id)
+    
+    if goal_id is not None:
+        query = query.filter(Activity.goal_id == goal_id)
+    
+    query = query.filter(*extra_data_clauses(db.get_bind().dialect.name, tag, extra_filters))
+    
     if days:
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         query = query.filter(Activity.created_at >= cutoff_date)
     
     activities = query.order_by(Activity.created_at.desc()).offset(skip).limit(limit).all()
-    return activities
+    return rows_response(selected, activities)
 
 @router.get("/{activity_id}", response_model=ActivityResponse)
 async def get_activity(
@@ -83,8 +118,13 @@ async def delete_activity(
             detail="Activity not found"
         )
     
+    record_focus_session(db, current_user.id, activity, sign=-1)
+    record_goal_focus(db, current_user.id, activity, sign=-1)
+    record_focus_day(db, current_user.id, activity, sign=-1)
     db.delete(activity)
     db.commit()
+    invalidate_dashboard(current_user.id)
+    record_focus_time(current_user.id, activity, sign=-1)
     return None
 
 @router.get("/stats/summary", response_model=dict)
@@ -94,25 +134,5 @@ async def get_activity_stats(
     db: Session = Depends(get_db)
 ):
     """Get activity statistics for the current user"""
-    cutoff_date = datetime.utcnow() - timedelta(days=days)
-    
-    activities = db.query(Activity).filter(
-        Activity.user_id == current_user.id,
-        Activity.created_at >= cutoff_date
-    ).all()
-    
-    total_activities = len(activities)
-    total_focus_time = sum(a.duration_minutes or 0 for a in activities if a.activity_type == "focus_session")
-    
-    activity_breakdown = {}
-    for activity in activities:
-        activity_type = activity.activity_type
-        activity_breakdown[activity_type] = activity_breakdown.get(activity_type, 0) + 1
-    
-    return {
-        "total_activities": total_activities,
-        "total_focus_time_minutes": total_focus_time,
-        "activity_breakdown": activity_breakdown,
-        "period_days": days
-    }
+    return activity_summary(db, current_user.id, days)
 
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 
 from app.db.database import get_db
@@ -8,7 +8,8 @@ from app.models.user import User
 from app.models.goal import Goal
 from app.models.activity import Activity
 from app.utils.auth import get_current_active_user
-from app.services.youtube_service import YouTubeService
+from app.services.youtube_service import YouTubeService, VIDEO_FIELDS
+from app.utils.serialization import parse_fields, trim_fields
 
 router = APIRouter(prefix="/api/boost", tags=["boost"])
 
@@ -22,9 +23,14 @@ def get_youtube_service():
             detail=f"YouTube API not configured: {str(e)}"
         )
 
+def get_video_fields(fields: Optional[str] = None) -> List[str]:
+    """Dependency parsing the fields= sparse fieldset for video payloads, e.g. "title,url,thumbnail_url" """
+    return parse_fields(fields, VIDEO_FIELDS, always=("video_id",))
+
 @router.get("/recommendations")
 async def get_video_recommendations(
     max_results: int = 5,
+    video_fields: List[str] = Depends(get_video_fields),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
     youtube_service: YouTubeService = Depends(get_youtube_service)
@@ -48,7 +54,7 @@ async def get_video_recommendations(
         # Return trending motivational videos if user has no goals yet
         videos = youtube_service.get_trending_motivational_videos(max_results=max_results)
         return {
-            "videos": videos,
+            "videos": trim_fields(videos, video_fields),
             "reason": "Welcome! Here are some trending motivational videos to get you started. Create your first goal to get personalized recommendations!",
             "user_goals": [],
             "recommendation_count": len(videos)
@@ -92,7 +98,7 @@ async def get_video_recommendations(
     reason += ", here are YouTube videos to help you achieve your goals!"
     
     return {
-        "videos": unique_videos,
+        "videos": trim_fields(unique_videos, video_fields),
         "reason": reason,
         "user_goals": goal_info,
         "recommendation_count": len(unique_videos)
@@ -102,6 +108,7 @@ async def get_video_recommendations(
 async def search_videos(
     query: str,
     max_results: int = 10,
+    video_fields: List[str] = Depends(get_video_fields),
     current_user: User = Depends(get_current_active_user),
     youtube_service: YouTubeService = Depends(get_youtube_service)
 ) -> Dict[str, Any]:
@@ -116,7 +123,7 @@ async def search_videos(
     videos = youtube_service.search_videos(query, max_results=max_results)
     
     return {
-        "videos": videos,
+        "videos": trim_fields(videos, video_fields),
         "query": query,
         "result_count": len(videos)
     }
@@ -125,6 +132,7 @@ async def search_videos(
 async def get_videos_for_goal(
     goal_id: int,
     max_results: int = 5,
+    video_fields: List[str] = Depends(get_video_fields),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
     youtube_service: YouTubeService = Depends(get_youtube_service)
@@ -151,7 +159,7 @@ async def get_videos_for_goal(
     )
     
     return {
-        "videos": videos,
+        "videos": trim_fields(videos, video_fields),
         "goal": {
             "id": goal.id,
             "title": goal.title,
@@ -164,6 +172,7 @@ async def get_videos_for_goal(
 @router.get("/trending")
 async def get_trending_videos(
     max_results: int = 10,
+    video_fields: List[str] = Depends(get_video_fields),
     current_user: User = Depends(get_current_active_user),
     youtube_service: YouTubeService = Depends(get_youtube_service)
 ) -> Dict[str, Any]:
@@ -172,7 +181,7 @@ async def get_trending_videos(
     videos = youtube_service.get_trending_motivational_videos(max_results=max_results)
     
     return {
-        "videos": videos,
+        "videos": trim_fields(videos, video_fields),
         "result_count": len(videos),
         "category": "Trending Motivational Content"
     }
@@ -180,6 +189,7 @@ async def get_trending_videos(
 @router.get("/video/{video_id}/details")
 async def get_video_details(
     video_id: str,
+    video_fields: List[str] = Depends(get_video_fields),
     current_user: User = Depends(get_current_active_user),
     youtube_service: YouTubeService = Depends(get_youtube_service)
 ) -> Dict[str, Any]:
@@ -193,5 +203,5 @@ async def get_video_details(
             detail="Video not found or YouTube API error"
         )
     
-    return videos[0]
+    return trim_fields(videos, video_fields)[0]
 
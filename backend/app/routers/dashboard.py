@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db
+from app.models.user import User
+from app.schemas.dashboard import DashboardResponse
+from app.services.dashboard import get_dashboard_json
+from app.utils.auth import get_current_active_user
+
+router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
+
+@router.get("", response_model=DashboardResponse)
+async def get_dashboard(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get goals with progress stats, today's todos and the weekly summary in one request"""
+    return Response(content=get_dashboard_json(db, current_user.id), media_type="application/json")
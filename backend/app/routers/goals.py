@@ -1,16 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 from app.db.database import get_db
 from app.models.user import User
 from app.models.goal import Goal
-from app.schemas.goal import GoalCreate, GoalUpdate, GoalResponse
+from app.schemas.goal import GoalCreate, GoalUpdate, GoalResponse, GoalDetailResponse, GoalForecast
+from app.services.goal_counters import COUNTER_FIELDS, auto_progress
+from app.services.goal_forecast import get_forecasts
+from app.services.goal_stats import counter_stats, goal_stats, todos_by_goal
+from app.services.dashboard import invalidate_dashboard
+from app.services.reminders import reminder_scheduler, schedule_goal
 from app.utils.auth import get_current_active_user
+from app.utils.serialization import response_columns, rows_response, sparse_columns, parse_fields
 
 router = APIRouter(prefix="/api/goals", tags=["goals"])
 
+GOAL_FIELDS, GOAL_COLUMNS = response_columns(Goal, GoalResponse)
+GOAL_INCLUDES = ("todos", "stats", "forecast")
+
 @router.post("/", response_model=GoalResponse, status_code=status.HTTP_201_CREATED)
 async def create_goal(
     goal: GoalCreate,
@@ -19,22 +29,30 @@ async def create_goal(
 ):
     """Create a new goal"""
     db_goal = Goal(**goal.model_dump(), user_id=current_user.id)
+    if db_goal.progress_mode == "auto":
+        db_goal.progress_percentage = 0
     db.add(db_goal)
     db.commit()
+    invalidate_dashboard(current_user.id)
     db.refresh(db_goal)
+    schedule_goal(db_goal)
     return db_goal
 
-@router.get("/", response_model=List[GoalResponse])
+@router.get("/", response_model=List[GoalDetailResponse])
 async def get_goals(
     skip: int = 0,
     limit: int = 100,
     achieved: bool = None,
     category: str = None,
+    fields: Optional[str] = None,  # Comma-separated sparse fieldset, e.g. "title,progress_percentage"
+    include: Optional[str] = None,  # "todos", "stats" and/or "forecast", e.g. "todos,stats"
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get all goals for the current user"""
-    query = db.query(Goal).filter(Goal.user_id == current_user.id)
+    """Get all goals for the current user, optionally with their todos, progress stats and forecasts"""
+    includes = parse_fields(include, GOAL_INCLUDES, always=(), param="include") if include else []
+    selected, columns = sparse_columns(fields, GOAL_FIELDS, GOAL_COLUMNS)
+    query = db.query(*columns).filter(Goal.user_id == current_user.id)
     
     if achieved is not None:
         query = query.filter(Goal.is_achieved == achieved)
@@ -42,8 +60,32 @@ async def get_goals(
     if category:
         query = query.filter(Goal.category == category)
     
-    goals = query.offset(skip).limit(limit).all()
-    return goals
+    rows = query.offset(skip).limit(limit).all()
+    if not includes:
+        return rows_response(selected, rows)
+    
+    # Related data for the whole page in a fixed number of queries (one IN
+    # query for todos; stats come from the goals' counters), never one per goal
+    goals = [dict(zip(selected, row)) for row in rows]
+    goal_ids = [goal["id"] for goal in goals]
+    if "todos" in includes:
+        todos = todos_by_goal(db, current_user.id, goal_ids)
+        for goal in goals:
+            goal["todos"] = todos.get(goal["id"], [])
+    if "stats" in includes:
+        if all(field in selected for field in COUNTER_FIELDS):
+            for goal in goals:
+                goal["stats"] = counter_stats(*(goal[field] for field in COUNTER_FIELDS))
+        else:
+            # A sparse fieldset left the counters out of the goal query
+            stats = goal_stats(db, current_user.id, goal_ids)
+            for goal in goals:
+                goal["stats"] = stats[goal["id"]]
+    if "forecast" in includes:
+        forecasts = get_forecasts(db, current_user.id)
+        for goal in goals:
+            goal["forecast"] = forecasts.get(goal["id"])
+    return ORJSONResponse(content=goals)
 
 @router.get("/{goal_id}", response_model=GoalResponse)
 async def get_goal(
@@ -64,6 +106,23 @@ async def get_goal(
         )
     return goal
 
+@router.get("/{goal_id}/forecast", response_model=GoalForecast)
+async def get_goal_forecast(
+    goal_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """When the goal's open todos will be done at the current pace, against its target date"""
+    # Computed for all of the user's goals at once and cached until their next write
+    forecast = get_forecasts(db, current_user.id).get(goal_id)
+    
+    if not forecast:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Goal not found"
+        )
+    return forecast
+
 @router.put("/{goal_id}", response_model=GoalResponse)
 async def update_goal(
     goal_id: int,
@@ -91,9 +150,14 @@ async def update_goal(
     
     for field, value in update_data.items():
         setattr(goal, field, value)
+    if goal.progress_mode == "auto":
+        goal.progress_percentage = auto_progress(goal.completed_todos, goal.total_todos)
     
     db.commit()
+    invalidate_dashboard(current_user.id)
     db.refresh(goal)
+    if update_data.keys() & {"target_date", "is_achieved"}:
+        schedule_goal(goal)
     return goal
 
 @router.delete("/{goal_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -116,5 +180,7 @@ async def delete_goal(
     
     db.delete(goal)
     db.commit()
+    invalidate_dashboard(current_user.id)
+    reminder_scheduler.unschedule("goal", goal_id)
     return None
 
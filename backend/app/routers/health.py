@@ -0,0 +1,71 @@
+import asyncio
+import os
+
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+
+from app.db.database import get_engine
+from app.middleware.concurrency import concurrency_limiter
+from app.services.youtube_service import youtube_breaker
+from app.utils.health import event_loop_monitor, pool_status, ping_database
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+# Readiness fails when any of these is exceeded
+READINESS_MAX_LOOP_LAG_MS = float(os.getenv("READINESS_MAX_LOOP_LAG_MS", "500"))
+READINESS_MAX_POOL_SATURATION = float(os.getenv("READINESS_MAX_POOL_SATURATION", "0.9"))
+READINESS_DB_TIMEOUT_SECONDS = float(os.getenv("READINESS_DB_TIMEOUT_SECONDS", "2"))
+# Liveness only fails when the event loop has been stalled this long
+LIVENESS_MAX_LOOP_LAG_MS = float(os.getenv("LIVENESS_MAX_LOOP_LAG_MS", "10000"))
+
+@router.get("/live")
+async def liveness():
+    """Liveness probe: the process is responsive (restart it if this fails)"""
+    max_lag_ms = event_loop_monitor.max_lag * 1000
+    alive = max_lag_ms < LIVENESS_MAX_LOOP_LAG_MS
+    return ORJSONResponse(
+        {"status": "alive" if alive else "stalled", "event_loop_max_lag_ms": round(max_lag_ms, 1)},
+        status_code=200 if alive else 503
+    )
+
+@router.get("/ready")
+async def readiness():
+    """Readiness probe: this worker can take traffic (route elsewhere if this fails)"""
+    engine = get_engine()
+    pool = pool_status(engine)
+    database = {"pool": pool}
+    if pool.get("saturation", 0) >= READINESS_MAX_POOL_SATURATION:
+        # A ping would only queue behind the requests holding the pool
+        database.update(ok=False, error="connection pool saturated")
+    else:
+        try:
+            latency = await asyncio.wait_for(
+                run_in_threadpool(ping_database, engine), READINESS_DB_TIMEOUT_SECONDS
+            )
+            database.update(ok=True, latency_ms=round(latency * 1000, 1))
+        except Exception as e:
+            database.update(ok=False, error=str(e) or type(e).__name__)
+
+    lag_ms = event_loop_monitor.max_lag * 1000
+    event_loop = {"ok": lag_ms < READINESS_MAX_LOOP_LAG_MS, "max_lag_ms": round(lag_ms, 1)}
+
+    concurrency = concurrency_limiter.snapshot()
+    concurrency["ok"] = concurrency["in_flight"] < concurrency["limit"]
+
+    # An open YouTube breaker degrades Boost but does not make the worker unready
+    youtube = youtube_breaker.snapshot()
+
+    ready = database["ok"] and event_loop["ok"] and concurrency["ok"]
+    return ORJSONResponse(
+        {
+            "status": "ready" if ready else "not_ready",
+            "checks": {
+                "database": database,
+                "event_loop": event_loop,
+                "concurrency": concurrency,
+                "youtube": youtube,
+            },
+        },
+        status_code=200 if ready else 503
+    )
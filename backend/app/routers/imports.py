@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.db.database import get_db
+from app.models.user import User
+from app.schemas.imports import ImportJobResponse
+from app.services.dashboard import invalidate_dashboard
+from app.services.import_service import ImportService, IMPORT_KINDS, SOURCE_FORMATS, detect_source_format
+from app.utils.auth import get_current_active_user
+
+router = APIRouter(prefix="/api/import", tags=["import"])
+
+# Sync handlers: FastAPI runs these in its threadpool so a long import
+# does not block the event loop for other requests.
+@router.post("/{kind}", response_model=ImportJobResponse, status_code=status.HTTP_201_CREATED)
+def import_records(
+    kind: str,
+    file: UploadFile = File(...),
+    source_format: Optional[str] = None,  # ndjson or csv, detected from the upload if omitted
+    job_id: Optional[int] = None,  # Resume an interrupted job from its checkpoint
+    chunk_size: int = 1000,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Bulk import todos, goals or activities from an NDJSON or CSV upload"""
+    if kind not in IMPORT_KINDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported import kind. Use one of: {', '.join(IMPORT_KINDS)}"
+        )
+    
+    source_format = source_format or detect_source_format(file.filename, file.content_type)
+    if source_format not in SOURCE_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported source format. Use one of: {', '.join(SOURCE_FORMATS)}"
+        )
+    
+    service = ImportService(db, current_user, chunk_size=min(chunk_size, 5000))
+    
+    if job_id is not None:
+        job = service.get_job(job_id)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Import job not found"
+            )
+        if job.kind != kind:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Import job {job_id} imports {job.kind}, not {kind}"
+            )
+    else:
+        job = service.start_job(kind, source_format)
+    
+    try:
+        return service.run(job, file.file)
+    finally:
+        invalidate_dashboard(current_user.id)
+
+@router.get("/jobs/{job_id}", response_model=ImportJobResponse)
+async def get_import_job(
+    job_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get the progress of an import job"""
+    job = ImportService(db, current_user).get_job(job_id)
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
+    return job
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db
+from app.models.leaderboard import Friendship
+from app.models.user import User
+from app.schemas.leaderboard import LeaderboardPeriod, LeaderboardResponse
+from app.services.leaderboards import focus_leaderboards, usernames
+from app.utils.auth import get_current_active_user
+
+router = APIRouter(prefix="/api/leaderboards", tags=["leaderboards"])
+
+def _entries(ranked, names):
+    return [
+        {"rank": rank, "user_id": user_id, "username": names[user_id], "minutes": minutes}
+        for rank, user_id, minutes in ranked if user_id in names
+    ]
+
+@router.get("/{period}", response_model=LeaderboardResponse)
+async def get_leaderboard(
+    period: LeaderboardPeriod,
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Users who opted in, by focus minutes in the period, and the current user's rank"""
+    leaderboards = focus_leaderboards.current(db)
+    total, top = leaderboards.top(period, limit, offset)
+    standing = leaderboards.standing(period, current_user.id)
+    return {
+        "period": period,
+        "total": total,
+        "entries": _entries(top, usernames(db, [user_id for _, user_id, _ in top])),
+        "me": {"rank": standing[0], "minutes": standing[1]} if standing else None,
+    }
+
+@router.get("/{period}/friends", response_model=LeaderboardResponse)
+async def get_friends_leaderboard(
+    period: LeaderboardPeriod,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """The current user and the friends they added, ranked against each other (opted-in users only)"""
+    names = dict(db.query(User.id, User.username).join(Friendship, Friendship.friend_id == User.id).filter(
+        Friendship.user_id == current_user.id,
+        User.leaderboard_opt_in == True,  # noqa: E712
+        User.deleted_at.is_(None)
+    ).all())
+    if current_user.leaderboard_opt_in:
+        names[current_user.id] = current_user.username
+    ranked = focus_leaderboards.current(db).among(period, names)
+    me = next(({"rank": rank, "minutes": minutes} for rank, user_id, minutes in ranked if user_id == current_user.id), None)
+    return {"period": period, "total": len(ranked), "entries": _entries(ranked, names), "me": me}
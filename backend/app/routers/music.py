@@ -1,184 +1,87 @@
-from fastapi import APIRouter, Depends
-from typing import List, Dict, Any
+import os
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.orm import Session
+from app.db.database import get_db
 from app.models.user import User
+from app.services.focus_profile import get_focus_profile, listening_stats
+from app.services.music_catalog import CatalogSnapshot, music_catalog
 from app.utils.auth import get_current_active_user
+from app.utils.http_cache import PrecomputedJSON
 
 router = APIRouter(prefix="/api/music", tags=["music"])
 
-# Predefined playlists for focus music
-FOCUS_PLAYLISTS = {
-    "lofi": {
-        "name": "Lofi Hip Hop",
-        "description": "Chill beats to focus and relax",
-        "tracks": [
-            {
-                "id": "lofi_1",
-                "title": "Lofi Study Beats",
-                "artist": "Chillhop Music",
-                "duration": 180,
-                "url": "https://www.youtube.com/watch?v=jfKfPfyJRdk",  # Lofi Girl - beats to relax/study to
-                "embed_id": "jfKfPfyJRdk"
-            },
-            {
-                "id": "lofi_2",
-                "title": "Cozy Lofi",
-                "artist": "Lofi Girl",
-                "duration": 240,
-                "url": "https://www.youtube.com/watch?v=rUxyKA_-grg",
-                "embed_id": "rUxyKA_-grg"
-            }
-        ]
-    },
-    "rain": {
-        "name": "Rain Sounds",
-        "description": "Natural rain sounds for deep focus",
-        "tracks": [
-            {
-                "id": "rain_1",
-                "title": "Gentle Rain",
-                "artist": "Nature Sounds",
-                "duration": 600,
-                "url": "https://www.youtube.com/watch?v=q76bMs-NwRk",
-                "embed_id": "q76bMs-NwRk"
-            },
-            {
-                "id": "rain_2",
-                "title": "Thunderstorm",
-                "artist": "Ambient Sounds",
-                "duration": 480,
-                "url": "https://www.youtube.com/watch?v=nDq6TstdEi8",
-                "embed_id": "nDq6TstdEi8"
-            }
-        ]
-    },
-    "ambient": {
-        "name": "Ambient Music",
-        "description": "Calm instrumental music for concentration",
-        "tracks": [
-            {
-                "id": "ambient_1",
-                "title": "Deep Focus",
-                "artist": "Spotify",
-                "duration": 300,
-                "url": "https://www.youtube.com/watch?v=lTRiuFIWV54",
-                "embed_id": "lTRiuFIWV54"
-            },
-            {
-                "id": "ambient_2",
-                "title": "Peaceful Piano",
-                "artist": "Spotify",
-                "duration": 280,
-                "url": "https://www.youtube.com/watch?v=4oStw0r33so",
-                "embed_id": "4oStw0r33so"
-            }
-        ]
-    },
-    "nature": {
-        "name": "Nature Sounds",
-        "description": "Forest, ocean, and nature ambience",
-        "tracks": [
-            {
-                "id": "nature_1",
-                "title": "Forest Ambience",
-                "artist": "Nature Sounds",
-                "duration": 420,
-                "url": "https://www.youtube.com/watch?v=xNN7iTA57jM",
-                "embed_id": "xNN7iTA57jM"
-            },
-            {
-                "id": "nature_2",
-                "title": "Ocean Waves",
-                "artist": "Relaxing Sounds",
-                "duration": 360,
-                "url": "https://www.youtube.com/watch?v=V1bFr2SWP1I",
-                "embed_id": "V1bFr2SWP1I"
-            }
-        ]
-    },
-    "classical": {
-        "name": "Classical Focus",
-        "description": "Classical music for enhanced concentration",
-        "tracks": [
-            {
-                "id": "classical_1",
-                "title": "Classical Study Music",
-                "artist": "Various Artists",
-                "duration": 320,
-                "url": "https://www.youtube.com/watch?v=jgpJVI3tDbY",
-                "embed_id": "jgpJVI3tDbY"
-            }
-        ]
-    }
-}
+# Playlists and tracks live in the music_playlists / music_tracks tables
+# (seeded on first start) and are served from an in-memory snapshot.
+# The catalog is identical for every user. With MUSIC_CATALOG_PUBLIC=true it
+# is served without the JWT + user lookup and marked cacheable by shared
+# caches (CDNs); otherwise only by the browser.
+MUSIC_CATALOG_PUBLIC = os.getenv("MUSIC_CATALOG_PUBLIC", "false").lower() in ("1", "true", "yes")
+MUSIC_CATALOG_MAX_AGE = int(os.getenv("MUSIC_CATALOG_MAX_AGE", "3600"))
 
-@router.get("/playlists")
-async def get_playlists(
-    current_user: User = Depends(get_current_active_user)
-) -> Dict[str, Any]:
+catalog_access = [] if MUSIC_CATALOG_PUBLIC else [Depends(get_current_active_user)]
+catalog_cache_scope = "public" if MUSIC_CATALOG_PUBLIC else "private"
+catalog_vary = None if MUSIC_CATALOG_PUBLIC else "Authorization"
+
+# Personalized responses: revalidate every time, 304 when unchanged
+PERSONALIZED_CACHE_CONTROL = "private, no-cache"
+
+PLAYLIST_NOT_FOUND = PrecomputedJSON({"error": "Playlist not found"})
+
+def get_catalog(db: Session = Depends(get_db)) -> CatalogSnapshot:
+    """Current catalog snapshot (reloaded when the catalog tables change)"""
+    return music_catalog.snapshot(db)
+
+def _catalog_cache_control(max_age: int = MUSIC_CATALOG_MAX_AGE) -> str:
+    return f"{catalog_cache_scope}, max-age={max_age}"
+
+@router.get("/playlists", dependencies=catalog_access)
+async def get_playlists(request: Request, catalog: CatalogSnapshot = Depends(get_catalog)) -> Response:
     """Get all available focus music playlists"""
-    return {
-        "playlists": [
-            {
-                "id": key,
-                "name": value["name"],
-                "description": value["description"],
-                "track_count": len(value["tracks"])
-            }
-            for key, value in FOCUS_PLAYLISTS.items()
-        ]
-    }
+    return catalog.summary.response(request, _catalog_cache_control(), catalog_vary)
 
-@router.get("/playlists/{playlist_id}")
+@router.get("/playlists/{playlist_id}", dependencies=catalog_access)
 async def get_playlist(
     playlist_id: str,
-    current_user: User = Depends(get_current_active_user)
-) -> Dict[str, Any]:
+    request: Request,
+    catalog: CatalogSnapshot = Depends(get_catalog)
+) -> Response:
     """Get specific playlist with tracks"""
-    playlist = FOCUS_PLAYLISTS.get(playlist_id)
-    
-    if not playlist:
-        return {"error": "Playlist not found"}
-    
-    return {
-        "id": playlist_id,
-        "name": playlist["name"],
-        "description": playlist["description"],
-        "tracks": playlist["tracks"]
-    }
+    playlist = catalog.details.get(playlist_id, PLAYLIST_NOT_FOUND)
+    return playlist.response(request, _catalog_cache_control(), catalog_vary)
+
+@router.get("/tracks/search", dependencies=catalog_access)
+async def search_tracks(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    catalog: CatalogSnapshot = Depends(get_catalog)
+):
+    """Search tracks by title, artist or playlist name (word-prefix match)"""
+    tracks = catalog.search(q, limit)
+    return {"query": q, "tracks": tracks, "result_count": len(tracks)}
 
 @router.get("/recommended")
 async def get_recommended_music(
-    current_user: User = Depends(get_current_active_user)
-) -> Dict[str, Any]:
-    """Get recommended focus music based on time of day"""
-    from datetime import datetime
-    
-    hour = datetime.now().hour
-    
-    # Morning: Classical or Lofi
-    # Afternoon: Ambient or Lofi
-    # Evening: Rain or Nature
-    
-    if 6 <= hour < 12:
-        recommended = ["classical", "lofi"]
-    elif 12 <= hour < 18:
-        recommended = ["ambient", "lofi"]
-    else:
-        recommended = ["rain", "nature"]
-    
-    playlists = [
-        {
-            "id": playlist_id,
-            **FOCUS_PLAYLISTS[playlist_id]
-        }
-        for playlist_id in recommended
-    ]
-    
-    return {
-        "recommended": playlists,
-        "reason": f"Recommended for {hour}:00 - optimal focus music for this time of day"
-    }
+    request: Request,
+    hour: Optional[int] = Query(None, ge=0, le=23),  # Client's local hour; defaults to server time
+    current_user: User = Depends(get_current_active_user),
+    catalog: CatalogSnapshot = Depends(get_catalog),
+    db: Session = Depends(get_db)
+) -> Response:
+    """Get recommended focus music from the user's focus-session history and time of day"""
+    if hour is None:
+        hour = datetime.now().hour
+    recommendation = catalog.recommend(get_focus_profile(db, current_user.id), hour)
+    return PrecomputedJSON(recommendation).response(request, PERSONALIZED_CACHE_CONTROL, "Authorization")
+
+@router.get("/stats")
+async def get_listening_stats(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get the user's focus-session and per-playlist listening statistics"""
+    return listening_stats(get_focus_profile(db, current_user.id))
 
 # Future: Integrate with Spotify API, YouTube Music API, or SoundCloud
 # This is a placeholder structure ready for real API integration
-
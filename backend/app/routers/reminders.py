@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+
+from app.db.database import get_db
+from app.models.reminder import Reminder
+from app.models.user import User
+from app.schemas.reminder import ReminderResponse
+from app.utils.auth import get_current_active_user
+
+router = APIRouter(prefix="/api/reminders", tags=["reminders"])
+
+@router.get("/", response_model=List[ReminderResponse])
+async def get_reminders(
+    before_id: Optional[int] = None,  # Keyset pagination: the last id of the previous page
+    dismissed: bool = False,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Reminders sent to the current user, newest first (dismissed ones with dismissed=true)"""
+    query = db.query(Reminder).filter(Reminder.user_id == current_user.id)
+    if not dismissed:
+        query = query.filter(Reminder.dismissed_at.is_(None))
+    if before_id is not None:
+        query = query.filter(Reminder.id < before_id)
+    return query.order_by(Reminder.id.desc()).limit(limit).all()
+
+@router.post("/{reminder_id}/dismiss", response_model=ReminderResponse)
+async def dismiss_reminder(
+    reminder_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Dismiss a reminder, hiding it from the default listing"""
+    reminder = db.query(Reminder).filter(
+        Reminder.id == reminder_id,
+        Reminder.user_id == current_user.id
+    ).first()
+    
+    if not reminder:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Reminder not found"
+        )
+    if reminder.dismissed_at is None:
+        reminder.dismissed_at = datetime.utcnow()
+        db.commit()
+        db.refresh(reminder)
+    return reminder
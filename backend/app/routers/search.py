@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.db.database import get_db
+from app.db.search_index import SEARCH_TABLES
+from app.models.user import User
+from app.schemas.search import SearchResponse
+from app.services.search import search as search_items
+from app.utils.auth import get_current_active_user
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+@router.get("", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[str] = None,  # Comma-separated subset of todo,goal,activity
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Full-text search across the current user's todos, goals and activities, best matches first"""
+    kinds = None
+    if types:
+        kinds = [kind.strip() for kind in types.split(",") if kind.strip()]
+        unknown = [kind for kind in kinds if kind not in SEARCH_TABLES]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown types: {', '.join(unknown)}"
+            )
+    return {"query": q, "results": search_items(db, current_user.id, q, kinds, limit)}
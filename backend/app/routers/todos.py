@@ -1,27 +1,89 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 from app.db.database import get_db
 from app.models.user import User
 from app.models.todo import Todo
-from app.schemas.todo import TodoCreate, TodoUpdate, TodoResponse
+from app.schemas.todo import TodoCreate, TodoUpdate, TodoResponse, TodoMove, TodoTreeResponse, TodoProgress
+from app.services.dashboard import invalidate_dashboard
+from app.services.goal_counters import record_subtree, record_todo, record_todo_change
+from app.services.reminders import reminder_scheduler, schedule_todo
+from app.services.todo_ranks import next_ranks, place_todo, rebalance_ranks_in_background
+from app.services.todo_tree import (
+    attach, build_tree, descendants_clause, move_subtree, reassign_subtree_goal, subtree_counts
+)
 from app.utils.auth import get_current_active_user
+from app.utils.serialization import response_columns, rows_response, sparse_columns
 
 router = APIRouter(prefix="/api/todos", tags=["todos"])
 
+TODO_FIELDS, TODO_COLUMNS = response_columns(Todo, TodoResponse)
+# sort= keys and whether their natural direction is descending ("-key"
+# reverses): most urgent first, soonest due first, newest first, manual order
+TODO_SORTS = {
+    "priority": (Todo.priority, True),
+    "due_date": (Todo.due_date, False),
+    "created_at": (Todo.created_at, True),
+    "rank": (Todo.rank, False),
+}
+
+def todo_order_by(sort: str) -> list:
+    """
+    ORDER BY clauses for a sort= parameter such as "priority,due_date",
+    ending with id for stable pages
+
+    Undated todos sort last either way; in the natural direction the
+    clauses match the todos indexes, so no sort step is needed.
+    """
+    keys = [key.strip() for key in sort.split(",") if key.strip()]
+    unknown = [key for key in keys if key.lstrip("-") not in TODO_SORTS]
+    if unknown or not keys:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown sort key(s): {', '.join(unknown)}. Available: {', '.join(TODO_SORTS)} (prefix - to reverse)"
+        )
+    clauses = []
+    for key in keys:
+        column, descending = TODO_SORTS[key.lstrip("-")]
+        if column is Todo.due_date:
+            clauses.append(Todo.due_date.is_(None))
+        clauses.append(column.desc() if descending != key.startswith("-") else column.asc())
+    return clauses + [Todo.id]
+
 @router.post("/", response_model=TodoResponse, status_code=status.HTTP_201_CREATED)
 async def create_todo(
     todo: TodoCreate,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Create a new todo"""
-    db_todo = Todo(**todo.model_dump(), user_id=current_user.id)
+    """Create a new todo, or with parent_id a subtask of one"""
+    db_todo = Todo(**todo.model_dump(exclude={"parent_id"}), user_id=current_user.id)
+    if todo.parent_id is not None:
+        parent = db.query(Todo).filter(
+            Todo.id == todo.parent_id,
+            Todo.user_id == current_user.id
+        ).first()
+        if not parent:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Parent todo not found"
+            )
+        if "goal_id" in todo.model_fields_set and todo.goal_id != parent.goal_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Subtasks belong to their parent's goal"
+            )
+        attach(db_todo, parent)
+    db_todo.rank = next_ranks(db, current_user.id)[0]
     db.add(db_todo)
+    record_todo(db, current_user.id, db_todo)
     db.commit()
+    invalidate_dashboard(current_user.id)
     db.refresh(db_todo)
+    schedule_todo(db_todo)
     return db_todo
 
 @router.get("/", response_model=List[TodoResponse])
@@ -29,17 +91,34 @@ async def get_todos(
     skip: int = 0,
     limit: int = 100,
     completed: bool = None,
+    goal_id: Optional[int] = None,
+    due_before: Optional[datetime] = None,
+    due_after: Optional[datetime] = None,
+    sort: Optional[str] = None,  # Comma-separated sort keys, e.g. "priority,due_date"
+    fields: Optional[str] = None,  # Comma-separated sparse fieldset, e.g. "title,is_completed"
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get all todos for the current user"""
-    query = db.query(Todo).filter(Todo.user_id == current_user.id)
+    """Get all todos for the current user, optionally filtered by goal or due date and sorted"""
+    selected, columns = sparse_columns(fields, TODO_FIELDS, TODO_COLUMNS)
+    query = db.query(*columns).filter(Todo.user_id == current_user.id)
     
     if completed is not None:
         query = query.filter(Todo.is_completed == completed)
     
-    todos = query.offset(skip).limit(limit).all()
-    return todos
+    if goal_id is not None:
+        query = query.filter(Todo.goal_id == goal_id)
+    
+    if due_before:
+        query = query.filter(Todo.due_date < due_before)
+    
+    if due_after:
+        query = query.filter(Todo.due_date >= due_after)
+    
+    if sort:
+        query = query.order_by(*todo_order_by(sort))
+    
+    return rows_response(selected, query.offset(skip).limit(limit).all())
 
 @router.get("/{todo_id}", response_model=TodoResponse)
 async def get_todo(
@@ -80,6 +159,12 @@ async def update_todo(
         )
     
     update_data = todo_update.model_dump(exclude_unset=True)
+    old_goal_id, was_completed = todo.goal_id, todo.is_completed
+    if todo.parent_id is not None and update_data.get("goal_id", old_goal_id) != old_goal_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Subtasks belong to their parent's goal; move the todo to change it"
+        )
     
     # If marking as completed, set completed_at
     if "is_completed" in update_data and update_data["is_completed"] and not todo.is_completed:
@@ -87,9 +172,15 @@ async def update_todo(
     
     for field, value in update_data.items():
         setattr(todo, field, value)
+    record_todo_change(db, current_user.id, old_goal_id, was_completed, todo)
+    if todo.goal_id != old_goal_id:
+        reassign_subtree_goal(db, todo, old_goal_id)
     
     db.commit()
+    invalidate_dashboard(current_user.id)
     db.refresh(todo)
+    if update_data.keys() & {"due_date", "is_completed"}:
+        schedule_todo(todo)
     return todo
 
 @router.delete("/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -98,7 +189,7 @@ async def delete_todo(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Delete a todo"""
+    """Delete a todo and its subtasks"""
     todo = db.query(Todo).filter(
         Todo.id == todo_id,
         Todo.user_id == current_user.id
@@ -110,7 +201,131 @@ async def delete_todo(
             detail="Todo not found"
         )
     
+    # Subtasks are removed by ON DELETE CASCADE; uncount them with the todo
+    total, completed = subtree_counts(db, todo)
+    record_subtree(db, current_user.id, todo.goal_id, total, completed, sign=-1)
     db.delete(todo)
     db.commit()
+    invalidate_dashboard(current_user.id)
+    # Subtasks' reminders are dropped when they come due and the todo is gone
+    reminder_scheduler.unschedule("todo", todo_id)
     return None
 
+
+@router.get("/{todo_id}/tree", response_model=TodoTreeResponse)
+async def get_todo_tree(
+    todo_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get a todo with all of its subtasks nested under it, each with its subtree's completion counts"""
+    root = db.query(*TODO_COLUMNS, Todo.path).filter(
+        Todo.id == todo_id,
+        Todo.user_id == current_user.id
+    ).first()
+    
+    if not root:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Todo not found"
+        )
+    
+    fields = TODO_FIELDS + ["path"]
+    # One range scan over the subtree, however deep it is
+    rows = db.query(*TODO_COLUMNS, Todo.path).filter(descendants_clause(root)).order_by(Todo.rank, Todo.id)
+    tree = build_tree(dict(zip(fields, root)), [dict(zip(fields, row)) for row in rows])
+    return ORJSONResponse(content=tree)
+
+@router.get("/{todo_id}/progress", response_model=TodoProgress)
+async def get_todo_progress(
+    todo_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Completion across a todo and all of its subtasks"""
+    todo = db.query(Todo).filter(
+        Todo.id == todo_id,
+        Todo.user_id == current_user.id
+    ).first()
+    
+    if not todo:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Todo not found"
+        )
+    
+    total, completed = subtree_counts(db, todo)
+    return TodoProgress(
+        total_todos=total,
+        completed_todos=completed,
+        completion_rate=round(completed * 100 / total, 1)
+    )
+
+@router.patch("/{todo_id}/move", response_model=TodoResponse)
+async def move_todo(
+    todo_id: int,
+    move: TodoMove,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Reorder a todo (after_id and/or before_id, e.g. the todos it was dropped
+    between) and/or move it, with its subtasks, under another todo
+    (parent_id, null for the top level)
+    """
+    todo = db.query(Todo).filter(
+        Todo.id == todo_id,
+        Todo.user_id == current_user.id
+    ).first()
+    
+    if not todo:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Todo not found"
+        )
+    
+    if not move.model_fields_set & {"parent_id", "after_id", "before_id"}:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Give parent_id, after_id and/or before_id"
+        )
+    if todo.id in (move.after_id, move.before_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A todo cannot be placed next to itself"
+        )
+    
+    related_ids = {move.parent_id, move.after_id, move.before_id} - {None}
+    related = {
+        other.id: other for other in db.query(Todo).filter(
+            Todo.id.in_(related_ids),
+            Todo.user_id == current_user.id
+        )
+    } if related_ids else {}
+    missing = related_ids - related.keys()
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Todo not found: {', '.join(map(str, sorted(missing)))}"
+        )
+    
+    rebalance = False
+    try:
+        if move.after_id is not None or move.before_id is not None:
+            # Writes only this todo's rank
+            rebalance = place_todo(db, todo, related.get(move.after_id), related.get(move.before_id))
+        if "parent_id" in move.model_fields_set:
+            move_subtree(db, todo, related.get(move.parent_id))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    db.commit()
+    if rebalance:
+        background_tasks.add_task(rebalance_ranks_in_background, current_user.id)
+    invalidate_dashboard(current_user.id)
+    db.refresh(todo)
+    return todo
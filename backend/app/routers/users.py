@@ -1,17 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from datetime import timedelta
+from datetime import datetime
+from typing import List
 
 from app.db.database import get_db
+from app.models.leaderboard import Friendship
 from app.models.user import User
-from app.schemas.user import UserCreate, UserLogin, UserResponse, UserUpdate, Token
+from app.schemas.leaderboard import FriendCreate, FriendResponse
+from app.schemas.user import UserCreate, UserLogin, UserResponse, UserUpdate, Token, RefreshTokenRequest
+from app.services.account_deletion import delete_account, queue_account_deletion, purge_account_in_background
+from app.services.leaderboards import focus_leaderboards
+from app.services.sessions import start_session, rotate_refresh_token, end_session, revoke_user_sessions
 from app.utils.auth import (
     get_password_hash,
-    verify_password,
-    create_access_token,
+    verify_and_update_password,
     get_current_active_user,
-    ACCESS_TOKEN_EXPIRE_MINUTES,
 )
 
 router = APIRouter(prefix="/api/users", tags=["users"])
@@ -34,8 +39,8 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
             detail="Username already taken"
         )
     
-    # Create new user
-    hashed_password = get_password_hash(user.password)
+    # Create new user; bcrypt runs off the event loop
+    hashed_password = await run_in_threadpool(get_password_hash, user.password)
     db_user = User(
         email=user.email,
         username=user.username,
@@ -51,18 +56,39 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """Login and get access token"""
     user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = (
+        await run_in_threadpool(verify_and_update_password, form_data.password, user.hashed_password)
+        if user else (False, None)
+    )
+    if not valid or user.deleted_at is not None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # Stored with a different bcrypt cost; committed with the new session
+        user.hashed_password = new_hash
     
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
+    return start_session(db, user)
+
+@router.post("/token/refresh", response_model=Token)
+async def refresh_token(body: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new access token and refresh token (no password check)"""
+    tokens = rotate_refresh_token(db, body.refresh_token)
+    if tokens is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return tokens
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(body: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Revoke the session of a refresh token, including its access tokens"""
+    end_session(db, body.refresh_token)
+    return None
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
@@ -83,19 +109,107 @@ async def update_current_user(
     if user_update.full_name:
         current_user.full_name = user_update.full_name
     if user_update.password:
-        current_user.hashed_password = get_password_hash(user_update.password)
+        current_user.hashed_password = await run_in_threadpool(get_password_hash, user_update.password)
+    opt_in_changed = (
+        user_update.leaderboard_opt_in is not None
+        and user_update.leaderboard_opt_in != current_user.leaderboard_opt_in
+    )
+    if opt_in_changed:
+        current_user.leaderboard_opt_in = user_update.leaderboard_opt_in
+        current_user.leaderboard_changed_at = datetime.utcnow()
     
     db.commit()
+    if user_update.password:
+        # Sign out every session; clients log in again with the new password
+        revoke_user_sessions(db, current_user.id)
+    if opt_in_changed:
+        focus_leaderboards.refresh_user(db, current_user.id)
     db.refresh(current_user)
     return current_user
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_current_user(
+    background_tasks: BackgroundTasks,
+    background: bool = False,  # Deactivate now and purge the data after responding (202)
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Delete current user account"""
-    db.delete(current_user)
-    db.commit()
+    if background:
+        queue_account_deletion(db, current_user)
+        background_tasks.add_task(purge_account_in_background, current_user.id)
+        return Response(status_code=status.HTTP_202_ACCEPTED)
+    delete_account(db, current_user)
     return None
 
+
+def _friend_response(friendship: Friendship, friend: User) -> dict:
+    return {
+        "user_id": friend.id,
+        "username": friend.username,
+        "leaderboard_opt_in": friend.leaderboard_opt_in,
+        "created_at": friendship.created_at,
+    }
+
+@router.get("/me/friends", response_model=List[FriendResponse])
+async def list_friends(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Users the current user added to their friends leaderboard"""
+    rows = db.query(Friendship, User).join(User, User.id == Friendship.friend_id).filter(
+        Friendship.user_id == current_user.id,
+        User.deleted_at.is_(None)
+    ).order_by(User.username).all()
+    return [_friend_response(friendship, friend) for friendship, friend in rows]
+
+@router.post("/me/friends", response_model=FriendResponse, status_code=status.HTTP_201_CREATED)
+async def add_friend(
+    body: FriendCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Add a user, by username, to the current user's friends leaderboard"""
+    friend = db.query(User).filter(User.username == body.username, User.deleted_at.is_(None)).first()
+    if not friend:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    if friend.id == current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You cannot add yourself as a friend"
+        )
+    if db.query(Friendship.id).filter(
+        Friendship.user_id == current_user.id,
+        Friendship.friend_id == friend.id
+    ).first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Already a friend"
+        )
+    friendship = Friendship(user_id=current_user.id, friend_id=friend.id)
+    db.add(friendship)
+    db.commit()
+    db.refresh(friendship)
+    return _friend_response(friendship, friend)
+
+@router.delete("/me/friends/{friend_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_friend(
+    friend_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Remove a user from the current user's friends leaderboard"""
+    removed = db.query(Friendship).filter(
+        Friendship.user_id == current_user.id,
+        Friendship.friend_id == friend_id
+    ).delete(synchronize_session=False)
+    if not removed:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Friend not found"
+        )
+    db.commit()
+    return None
@@ -1,14 +1,24 @@
-from app.schemas.user import UserCreate, UserLogin, UserResponse, UserUpdate, Token, TokenData
-from app.schemas.todo import TodoCreate, TodoUpdate, TodoResponse
-from app.schemas.goal import GoalCreate, GoalUpdate, GoalResponse
+from app.schemas.user import UserCreate, UserLogin, UserResponse, UserUpdate, Token, TokenData, RefreshTokenRequest
+from app.schemas.todo import TodoCreate, TodoUpdate, TodoResponse, TodoMove, TodoTreeResponse, TodoProgress
+from app.schemas.goal import GoalCreate, GoalUpdate, GoalResponse, GoalStats, GoalForecast, GoalDetailResponse
 from app.schemas.activity import ActivityCreate, ActivityResponse
 from app.schemas.video import VideoCreate, VideoResponse, VideoRecommendation
+from app.schemas.dashboard import TodoCounts, ActivitySummary, DashboardResponse
+from app.schemas.search import SearchResult, SearchResponse
+from app.schemas.imports import GoalImport, TodoImport, ActivityImport, ImportJobResponse
+from app.schemas.leaderboard import LeaderboardEntry, LeaderboardStanding, LeaderboardResponse, FriendCreate, FriendResponse
+from app.schemas.reminder import ReminderResponse
 
 __all__ = [
-    "UserCreate", "UserLogin", "UserResponse", "UserUpdate", "Token", "TokenData",
-    "TodoCreate", "TodoUpdate", "TodoResponse",
-    "GoalCreate", "GoalUpdate", "GoalResponse",
+    "UserCreate", "UserLogin", "UserResponse", "UserUpdate", "Token", "TokenData", "RefreshTokenRequest",
+    "TodoCreate", "TodoUpdate", "TodoResponse", "TodoMove", "TodoTreeResponse", "TodoProgress",
+    "GoalCreate", "GoalUpdate", "GoalResponse", "GoalStats", "GoalForecast", "GoalDetailResponse",
     "ActivityCreate", "ActivityResponse",
-    "VideoCreate", "VideoResponse", "VideoRecommendation"
+    "VideoCreate", "VideoResponse", "VideoRecommendation",
+    "GoalImport", "TodoImport", "ActivityImport", "ImportJobResponse",
+    "TodoCounts", "ActivitySummary", "DashboardResponse",
+    "SearchResult", "SearchResponse",
+    "LeaderboardEntry", "LeaderboardStanding", "LeaderboardResponse", "FriendCreate", "FriendResponse",
+    "ReminderResponse"
 ]
 
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import List, Dict
+
+from app.schemas.todo import TodoResponse
+from app.schemas.goal import GoalDetailResponse
+
+class TodoCounts(BaseModel):
+    total: int
+    completed: int
+    active: int
+
+class ActivitySummary(BaseModel):
+    total_activities: int
+    total_focus_time_minutes: int
+    activity_breakdown: Dict[str, int]
+    period_days: int
+
+class DashboardResponse(BaseModel):
+    goals: List[GoalDetailResponse]  # Each with stats
+    todo_counts: TodoCounts
+    today_todos: List[TodoResponse]
+    weekly_summary: ActivitySummary
@@ -1,12 +1,15 @@
 from pydantic import BaseModel
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import Optional, List, Literal
+
+from app.schemas.todo import TodoResponse
 
 class GoalBase(BaseModel):
     title: str
     description: Optional[str] = None
     category: Optional[str] = None  # e.g., "career", "health", "learning", "personal"
     target_date: Optional[datetime] = None
+    progress_mode: Literal["manual", "auto"] = "manual"  # auto: completed todos / total todos
 
 class GoalCreate(GoalBase):
     pass
@@ -17,13 +20,18 @@ class GoalUpdate(BaseModel):
     category: Optional[str] = None
     target_date: Optional[datetime] = None
     is_achieved: Optional[bool] = None
-    progress_percentage: Optional[int] = None
+    progress_percentage: Optional[int] = None  # Ignored in auto progress mode
+    progress_mode: Optional[Literal["manual", "auto"]] = None
 
 class GoalResponse(GoalBase):
     id: int
     user_id: int
     is_achieved: bool
     progress_percentage: int
+    total_todos: int = 0
+    completed_todos: int = 0
+    focus_minutes: int = 0
+    focus_sessions: int = 0
     created_at: datetime
     updated_at: datetime
     achieved_at: Optional[datetime] = None
@@ -31,3 +39,30 @@ class GoalResponse(GoalBase):
     class Config:
         from_attributes = True
 
+
+class GoalStats(BaseModel):
+    total_todos: int = 0
+    completed_todos: int = 0
+    completion_rate: float = 0.0  # Percentage of the goal's todos completed
+    focus_minutes: int = 0  # From focus_session activities with extra_data.goal_id
+    focus_sessions: int = 0
+
+class GoalForecast(BaseModel):
+    goal_id: int
+    as_of: date  # UTC day the forecast was computed for
+    window_days: int  # Days of history it is based on (at most FORECAST_WINDOW_DAYS)
+    remaining_todos: int
+    pace_per_day: float  # Todos completed per day, 7-day moving average
+    average_pace_per_day: float  # Over the whole window
+    trend_per_day: float  # Change in daily completions per day (least-squares slope)
+    required_pace_per_day: Optional[float] = None  # To finish by target_date; None without one or once it passed
+    focus_minutes_per_day: float  # 7-day moving average
+    focus_minutes_per_todo: Optional[float] = None  # Focus minutes per completed todo in the window
+    projected_completion_date: Optional[date] = None  # None without todos, pace, or once achieved
+    target_date: Optional[date] = None
+    on_track: Optional[bool] = None  # projected_completion_date <= target_date; None without a target
+
+class GoalDetailResponse(GoalResponse):
+    todos: Optional[List[TodoResponse]] = None  # Present with ?include=todos
+    stats: Optional[GoalStats] = None  # Present with ?include=stats
+    forecast: Optional[GoalForecast] = None  # Present with ?include=forecast
@@ -0,0 +1,51 @@
+from pydantic import BaseModel, field_validator
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+
+from app.schemas.todo import TodoCreate
+from app.schemas.goal import GoalCreate
+from app.schemas.activity import ActivityCreate
+
+def _coerce_ref(value):
+    # CSV gives strings, NDJSON exports often use numeric ids
+    return str(value) if value is not None else None
+
+def _coerce_priority(value):
+    # Other tools export "High", " medium " etc.
+    return value.strip().lower() if isinstance(value, str) else value
+
+class GoalImport(GoalCreate):
+    ref: Optional[str] = None  # Source-system identifier todos can point at via goal_ref
+    is_achieved: bool = False
+    progress_percentage: int = 0
+    achieved_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    
+    _coerce_ref = field_validator("ref", mode="before")(_coerce_ref)
+
+class TodoImport(TodoCreate):
+    goal_ref: Optional[str] = None  # Resolved against goals imported earlier
+    is_completed: bool = False
+    completed_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    
+    _coerce_goal_ref = field_validator("goal_ref", mode="before")(_coerce_ref)
+    _coerce_priority = field_validator("priority", mode="before")(_coerce_priority)
+
+class ActivityImport(ActivityCreate):
+    created_at: Optional[datetime] = None  # Keep original timestamps for history
+
+class ImportJobResponse(BaseModel):
+    id: int
+    kind: str
+    source_format: str
+    status: str
+    rows_processed: int
+    rows_imported: int
+    rows_failed: int
+    errors: Optional[List[Dict[str, Any]]] = None
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Literal, Optional
+
+LeaderboardPeriod = Literal["daily", "weekly", "all_time"]  # UTC day, week from Monday, ever
+
+class LeaderboardEntry(BaseModel):
+    rank: int  # Ties share the better rank
+    user_id: int
+    username: str
+    minutes: int
+
+class LeaderboardStanding(BaseModel):
+    rank: Optional[int] = None  # None until the user has focus minutes in the period
+    minutes: int
+
+class LeaderboardResponse(BaseModel):
+    period: LeaderboardPeriod
+    total: int  # Users ranked in the period
+    entries: List[LeaderboardEntry]
+    me: Optional[LeaderboardStanding] = None  # None unless the current user opted in
+
+class FriendCreate(BaseModel):
+    username: str
+
+class FriendResponse(BaseModel):
+    user_id: int
+    username: str
+    leaderboard_opt_in: bool  # Only friends who opted in appear on the friends leaderboard
+    created_at: datetime
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Literal, Optional
+
+class ReminderResponse(BaseModel):
+    id: int
+    kind: Literal["todo", "goal"]
+    target_id: int  # The todo's or goal's id
+    title: str
+    due_at: datetime
+    remind_at: datetime
+    created_at: datetime
+    delivered_at: Optional[datetime] = None
+    dismissed_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import List
+
+class SearchResult(BaseModel):
+    type: str  # todo, goal or activity
+    id: int
+    title_highlight: str  # HTML-escaped title with matches in <mark>
+    snippet: str  # HTML-escaped excerpt of the description around the matches
+    rank: float  # Higher is more relevant
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[SearchResult]
@@ -1,21 +1,23 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, Literal
+
+TodoPriorityName = Literal["low", "medium", "high"]
 
 class TodoBase(BaseModel):
     title: str
     description: Optional[str] = None
-    priority: str = "medium"  # low, medium, high
+    priority: TodoPriorityName = "medium"
     due_date: Optional[datetime] = None
     goal_id: Optional[int] = None
 
 class TodoCreate(TodoBase):
-    pass
+    parent_id: Optional[int] = None  # Create as a subtask; it takes its parent's goal
 
 class TodoUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
-    priority: Optional[str] = None
+    priority: Optional[TodoPriorityName] = None
     due_date: Optional[datetime] = None
     is_completed: Optional[bool] = None
     goal_id: Optional[int] = None
@@ -27,7 +29,24 @@ class TodoResponse(TodoBase):
     created_at: datetime
     updated_at: datetime
     completed_at: Optional[datetime] = None
+    parent_id: Optional[int] = None
+    rank: str  # Manual order key: sort=rank, or compare as plain strings
     
     class Config:
         from_attributes = True
 
+class TodoMove(BaseModel):
+    parent_id: Optional[int] = None  # New parent; null makes the todo top-level (omit to keep it)
+    after_id: Optional[int] = None  # Place right after this todo...
+    before_id: Optional[int] = None  # ...and/or right before this one
+
+class TodoTreeResponse(TodoResponse):
+    total_todos: int  # This todo and all of its subtasks
+    completed_todos: int
+    children: List["TodoTreeResponse"] = []
+
+class TodoProgress(BaseModel):
+    total_todos: int  # This todo and all of its subtasks
+    completed_todos: int
+    completion_rate: float
+
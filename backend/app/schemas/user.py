@@ -19,10 +19,12 @@ class UserUpdate(BaseModel):
     username: Optional[str] = None
     full_name: Optional[str] = None
     password: Optional[str] = None
+    leaderboard_opt_in: Optional[bool] = None  # Appear on focus-time leaderboards
 
 class UserResponse(UserBase):
     id: int
     is_active: bool
+    leaderboard_opt_in: bool = False
     created_at: datetime
     updated_at: datetime
     
@@ -32,6 +34,11 @@ class UserResponse(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None  # Access token lifetime in seconds
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
     email: Optional[str] = None
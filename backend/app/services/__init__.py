@@ -1,4 +1,5 @@
 from app.services.youtube_service import YouTubeService
+from app.services.import_service import ImportService
 
-__all__ = ["YouTubeService"]
+__all__ = ["YouTubeService", "ImportService"]
 
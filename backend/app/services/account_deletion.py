@@ -0,0 +1,97 @@
+"""
+Account deletion, immediate or as a batched background purge
+
+Every table owned by a user has an ON DELETE CASCADE foreign key, so
+deleting the user row removes the rest inside the database, set-based and
+without the ORM loading any of it. For large accounts that is still one
+long transaction; queued deletion instead deactivates the account at once
+and purge_account() then removes its rows PURGE_BATCH_SIZE at a time, one
+short transaction per batch, deleting the user last. Purges cut short by
+a restart are finished by `python -m app.cli.purge_accounts`.
+"""
+import os
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.db.database import SessionLocal
+from app.models.activity import Activity
+from app.models.focus_profile import FocusProfile
+from app.models.goal import Goal
+from app.models.import_job import ImportJob
+from app.models.leaderboard import FocusDay, Friendship
+from app.models.refresh_token import RefreshToken
+from app.models.reminder import Reminder
+from app.models.todo import Todo
+from app.models.user import User
+from app.services.dashboard import invalidate_dashboard
+from app.services.leaderboards import focus_leaderboards
+from app.services.sessions import revoke_user_sessions
+from app.utils.metrics import ACCOUNT_PURGE_ROWS
+
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "1000"))
+
+# Purged in this order: todos before the goals they point at
+PURGE_MODELS = (RefreshToken, ImportJob, Activity, Todo, Goal, FocusProfile, FocusDay, Friendship, Reminder)
+
+def delete_account(db: Session, user: User):
+    """Delete a user and, through the foreign keys, everything they own"""
+    user_id = user.id
+    db.delete(user)
+    db.commit()
+    invalidate_dashboard(user_id)
+    focus_leaderboards.discard(user_id)
+
+def queue_account_deletion(db: Session, user: User):
+    """Deactivate a user, sign out all of their sessions and mark the account for purging"""
+    user.is_active = False
+    user.deleted_at = datetime.utcnow()
+    db.commit()
+    revoke_user_sessions(db, user.id)
+    invalidate_dashboard(user.id)
+    focus_leaderboards.discard(user.id)
+
+def purge_account(db: Session, user_id: int, batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """
+    Delete a queued account's rows in batches, then the user; returns the
+    number of rows deleted
+
+    Each batch commits on its own, so an interrupted purge can simply be run
+    again. Accounts that were not queued are left alone.
+    """
+    if db.query(User.id).filter(User.id == user_id, User.deleted_at.isnot(None)).first() is None:
+        return 0
+    deleted = 0
+    for model in PURGE_MODELS:
+        table = model.__table__
+        key = table.primary_key.columns.values()[0]
+        while True:
+            batch = select(key).where(table.c.user_id == user_id).limit(batch_size)
+            count = db.execute(delete(table).where(key.in_(batch))).rowcount
+            db.commit()
+            ACCOUNT_PURGE_ROWS.inc(table.name, amount=count)
+            deleted += count
+            if count < batch_size:
+                break
+    db.execute(delete(User.__table__).where(User.id == user_id))
+    db.commit()
+    invalidate_dashboard(user_id)
+    return deleted + 1
+
+def purge_account_in_background(user_id: int):
+    """Background-task entry point: purge_account() with its own session"""
+    db = SessionLocal()
+    try:
+        purge_account(db, user_id)
+    finally:
+        db.close()
+
+def queued_account_ids(db: Session) -> List[int]:
+    """Ids of the accounts waiting to be purged, oldest request first"""
+    return [
+        user_id for (user_id,) in db.query(User.id).filter(
+            User.deleted_at.isnot(None)
+        ).order_by(User.deleted_at)
+    ]
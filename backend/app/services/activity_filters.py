@@ -0,0 +1,69 @@
+"""
+Server-side filters on Activity.extra_data
+
+todo_id and goal_id are promoted to indexed generated columns. Tags and
+any other key are matched inside the document:
+- PostgreSQL: every condition goes into one JSONB containment test
+  (extra_data @> {...}), served by the GIN index.
+- SQLite: json_each/json_extract, evaluated over the user's rows only.
+"""
+import json
+import re
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func, literal, select, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.models.activity import Activity
+
+EXTRA_KEY_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+def parse_extra_filters(extra: List[str]) -> Dict[str, object]:
+    """
+    Parse extra=key:value parameters into {key: value}
+
+    Values that parse as JSON scalars keep their type (extra=rating:5 is a
+    number, extra=flag:true a boolean); anything else is a string. Raises
+    ValueError for malformed parameters.
+    """
+    filters = {}
+    for item in extra:
+        key, separator, raw = item.partition(":")
+        if not separator or not EXTRA_KEY_PATTERN.match(key):
+            raise ValueError(f"Invalid extra filter {item!r}: expected key:value with a key of letters, digits and _")
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw
+        if isinstance(value, (dict, list)):
+            raise ValueError(f"Invalid extra filter {item!r}: only scalar values can be matched")
+        filters[key] = value
+    return filters
+
+def _sqlite_clauses(tags: List[str], filters: Dict[str, object]) -> list:
+    clauses = []
+    for tag in tags:
+        tagged = func.json_each(Activity.extra_data, "$.tags").table_valued("key", "value")
+        # key is NULL when tags is a single value rather than an array
+        clauses.append(select(literal(1)).select_from(tagged).where(
+            tagged.c.key.isnot(None), tagged.c.value == tag
+        ).exists())
+    for key, value in filters.items():
+        path = f"$.{key}"
+        if value is None:
+            clauses.append(func.json_type(Activity.extra_data, path) == "null")
+        else:
+            # json_extract returns SQL values: booleans come back as 1/0
+            clauses.append(func.json_extract(Activity.extra_data, path) == value)
+    return clauses
+
+def extra_data_clauses(dialect: str, tags: List[str], filters: Dict[str, object]) -> Tuple:
+    """WHERE clauses matching activities tagged with every tag and having every key: value"""
+    if not tags and not filters:
+        return ()
+    if dialect == "postgresql":
+        document = dict(filters)
+        if tags:
+            document["tags"] = list(tags)
+        return (type_coerce(Activity.extra_data, JSONB).contains(document),)
+    return tuple(_sqlite_clauses(tags, filters))
@@ -0,0 +1,259 @@
+"""
+Response caches with pluggable storage
+
+TTLCache entries live in the backend selected by CACHE_URL:
+
+    (unset) or memory://          a dict per process (each worker has its own copy)
+    sqlite:////var/cache/focus.db one file shared by every worker on the host
+    redis://localhost:6379/0      Redis or a Redis-compatible server (pip install redis)
+
+With a shared backend all workers see the same entries and invalidations,
+so cached values must be bytes.
+
+A value computed while a write invalidates it must not be cached after the
+invalidation. Caches of derived data read generation(key) before computing,
+store with set_unless_invalidated() and drop entries with invalidate(),
+which changes the generation before deleting the entry.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from app.utils.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_URL = os.getenv("CACHE_URL", "memory://")
+
+class MemoryBackend:
+    """Per-process store with per-entry expiry and LRU eviction"""
+
+    shared = False
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self, prefix: str):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+class ThreadLocalSQLite:
+    """One autocommit connection per thread to a SQLite file, reopened in forked workers"""
+
+    def __init__(self, path: str, schema: str):
+        self.path = path
+        self.schema = schema
+        self._local = threading.local()
+
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(self.schema)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+class SQLiteBackend:
+    """Store in a local SQLite file (WAL mode) shared by all worker processes"""
+
+    shared = True
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str):
+        self._db = ThreadLocalSQLite(
+            path,
+            "CREATE TABLE IF NOT EXISTS cache_entries "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        return self._db.connection()
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._connection().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes, ttl: float):
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, time.time() + ttl)
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            connection.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+
+    def delete(self, key: str):
+        self._connection().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def clear(self, prefix: str):
+        self._connection().execute(
+            "DELETE FROM cache_entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+        )
+
+def redis_client(url: str):
+    """A Redis client for url; the redis package is only needed when one is configured"""
+    try:
+        import redis
+    except ImportError as e:
+        raise RuntimeError(f"{url.split(':', 1)[0]}:// storage requires the redis package (pip install redis)") from e
+    return redis.Redis.from_url(url, socket_timeout=1)
+
+class RedisBackend:
+    """Store in Redis or any server speaking its protocol"""
+
+    shared = True
+
+    def __init__(self, url: str):
+        self._client = redis_client(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self._client.set(key, value, px=max(1, int(ttl * 1000)))
+
+    def delete(self, key: str):
+        self._client.delete(key)
+
+    def clear(self, prefix: str):
+        keys = list(self._client.scan_iter(match=prefix + "*", count=1000))
+        if keys:
+            self._client.delete(*keys)
+
+def backend_from_url(url: str):
+    """Create a cache backend from a CACHE_URL value"""
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    if url in ("", "memory://"):
+        return None
+    raise ValueError(f"Unsupported CACHE_URL: {url}")
+
+_shared_backend = None
+_shared_backend_lock = threading.Lock()
+
+def shared_backend():
+    """The process-wide backend for CACHE_URL, or None for per-process memory caches"""
+    global _shared_backend
+    if _shared_backend is None:
+        with _shared_backend_lock:
+            if _shared_backend is None:
+                _shared_backend = backend_from_url(CACHE_URL) or False
+    return _shared_backend or None
+
+class TTLCache:
+    """Named cache with a fixed TTL, stored in the configured backend"""
+
+    def __init__(self, name: str, ttl_seconds: float, max_entries: int = 10000, backend=None):
+        self.name = name
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._backend = backend
+        self._prefix = f"cache:{name}:"
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @property
+    def backend(self):
+        # Resolved on first use so importing never connects to the cache server
+        if self._backend is None:
+            self._backend = shared_backend() or MemoryBackend(self.max_entries)
+        return self._backend
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        try:
+            value = self.backend.get(self._prefix + str(key))
+        except Exception:
+            # An unavailable shared cache degrades to misses, not errors
+            logger.warning("Cache %s: get failed", self.name, exc_info=True)
+            value = None
+        record_cache(self.name, value is not None)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        if not self.enabled:
+            return
+        try:
+            self.backend.set(self._prefix + str(key), value, self.ttl)
+        except Exception:
+            logger.warning("Cache %s: set failed", self.name, exc_info=True)
+
+    def delete(self, key: Hashable):
+        try:
+            self.backend.delete(self._prefix + str(key))
+        except Exception:
+            logger.warning("Cache %s: delete failed", self.name, exc_info=True)
+
+    def generation(self, key: Hashable) -> Optional[bytes]:
+        """Token that changes on every invalidate(key); read it before computing the value"""
+        if not self.enabled:
+            return None
+        try:
+            return self.backend.get(self._prefix + "generation:" + str(key))
+        except Exception:
+            logger.warning("Cache %s: generation read failed", self.name, exc_info=True)
+            return None
+
+    def invalidate(self, key: Hashable):
+        """Delete key and change its generation, so values computed before now are never stored"""
+        if self.enabled:
+            try:
+                # Outlives any entry computed before it, which is all the check needs
+                self.backend.set(self._prefix + "generation:" + str(key), os.urandom(8), self.ttl * 2)
+            except Exception:
+                logger.warning("Cache %s: generation update failed", self.name, exc_info=True)
+        self.delete(key)
+
+    def set_unless_invalidated(self, key: Hashable, value: Any, generation: Optional[bytes]):
+        """Store a value computed at `generation`, unless key was invalidated since"""
+        if not self.enabled or self.generation(key) != generation:
+            return
+        self.set(key, value)
+        # An invalidation between the check and the set: take the stale value back out
+        if self.generation(key) != generation:
+            self.delete(key)
+
+    def clear(self):
+        self.backend.clear(self._prefix)
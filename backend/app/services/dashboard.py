@@ -0,0 +1,113 @@
+import os
+from datetime import datetime, timedelta
+from typing import Dict
+
+import orjson
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import Session
+
+from app.models.goal import Goal
+from app.models.todo import Todo
+from app.models.activity import Activity
+from app.schemas.goal import GoalResponse
+from app.services.cache import TTLCache
+from app.services.goal_forecast import invalidate_forecasts
+from app.services.goal_stats import counter_stats, TODO_FIELDS, TODO_COLUMNS
+from app.utils.serialization import response_columns
+
+# Short per-user cache of the serialized dashboard; writes to todos, goals
+# and activities invalidate it, so the TTL only bounds time-window drift.
+DASHBOARD_CACHE_TTL_SECONDS = float(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "30"))
+DASHBOARD_GOAL_LIMIT = 100
+TODAY_TODO_LIMIT = 50
+
+GOAL_FIELDS, GOAL_COLUMNS = response_columns(Goal, GoalResponse)
+
+dashboard_cache = TTLCache("dashboard", DASHBOARD_CACHE_TTL_SECONDS)
+
+def invalidate_dashboard(user_id: int):
+    """Drop a user's cached dashboard (and goal forecasts) after they change todos, goals or activities"""
+    dashboard_cache.invalidate(user_id)
+    invalidate_forecasts(user_id)
+
+def activity_summary(db: Session, user_id: int, days: int = 7) -> Dict:
+    """Activity counts per type and total focus minutes over the last N days, in one grouped query"""
+    cutoff_date = datetime.utcnow() - timedelta(days=days)
+    rows = db.query(
+        Activity.activity_type,
+        func.count(Activity.id),
+        func.coalesce(func.sum(Activity.duration_minutes), 0)
+    ).filter(
+        Activity.user_id == user_id,
+        Activity.created_at >= cutoff_date
+    ).group_by(Activity.activity_type)
+
+    activity_breakdown = {}
+    total_focus_time = 0
+    for activity_type, count, minutes in rows:
+        activity_breakdown[activity_type] = count
+        if activity_type == "focus_session":
+            total_focus_time = int(minutes)
+
+    return {
+        "total_activities": sum(activity_breakdown.values()),
+        "total_focus_time_minutes": total_focus_time,
+        "activity_breakdown": activity_breakdown,
+        "period_days": days
+    }
+
+def todo_counts(db: Session, user_id: int) -> Dict:
+    total, completed = db.query(
+        func.count(Todo.id),
+        func.coalesce(func.sum(case((Todo.is_completed == True, 1), else_=0)), 0)  # noqa: E712
+    ).filter(Todo.user_id == user_id).one()
+    return {"total": total, "completed": int(completed), "active": total - int(completed)}
+
+def today_todos(db: Session, user_id: int):
+    """Open todos due today or overdue, plus todos completed today (UTC)"""
+    start_of_day = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    end_of_day = start_of_day + timedelta(days=1)
+    rows = db.query(*TODO_COLUMNS).filter(
+        Todo.user_id == user_id,
+        or_(
+            (Todo.is_completed == False) & (Todo.due_date < end_of_day),  # noqa: E712
+            Todo.completed_at >= start_of_day
+        )
+    ).order_by(Todo.due_date).limit(TODAY_TODO_LIMIT)
+    return [dict(zip(TODO_FIELDS, row)) for row in rows]
+
+def build_dashboard(db: Session, user_id: int) -> Dict:
+    """
+    Everything the dashboard renders, in a fixed number of queries
+
+    Goals with their todo and focus counters (1), todo counts (1), today's
+    todos (1) and the weekly summary (1), independent of data volume.
+    """
+    goals = [
+        dict(zip(GOAL_FIELDS, row))
+        for row in db.query(*GOAL_COLUMNS).filter(
+            Goal.user_id == user_id
+        ).order_by(Goal.id).limit(DASHBOARD_GOAL_LIMIT)
+    ]
+    for goal in goals:
+        goal["stats"] = counter_stats(
+            goal["total_todos"], goal["completed_todos"], goal["focus_minutes"], goal["focus_sessions"]
+        )
+
+    return {
+        "goals": goals,
+        "todo_counts": todo_counts(db, user_id),
+        "today_todos": today_todos(db, user_id),
+        "weekly_summary": activity_summary(db, user_id, days=7),
+    }
+
+def get_dashboard_json(db: Session, user_id: int) -> bytes:
+    """Serialized dashboard, served from the per-user cache when fresh"""
+    cached = dashboard_cache.get(user_id)
+    if cached is not None:
+        return cached
+    # Not cached if a write invalidates the dashboard while it is being built
+    generation = dashboard_cache.generation(user_id)
+    payload = orjson.dumps(build_dashboard(db, user_id))
+    dashboard_cache.set_unless_invalidated(user_id, payload, generation)
+    return payload
@@ -0,0 +1,103 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.activity import Activity
+from app.models.focus_profile import FocusProfile
+
+FOCUS_ACTIVITY_TYPE = "focus_session"
+
+def _session_facts(created_at, duration_minutes, extra_data):
+    """(UTC hour, minutes, completed, playlist slug) of one focus session"""
+    extra = extra_data if isinstance(extra_data, dict) else {}
+    playlist_id = extra.get("playlist_id")
+    return (
+        created_at.hour if created_at else None,
+        max(0, duration_minutes or 0),
+        extra.get("completed") is not False,
+        playlist_id if isinstance(playlist_id, str) else None
+    )
+
+def _apply(profile: FocusProfile, facts, sign: int):
+    """Add (sign=1) or remove (sign=-1) one session from the profile's aggregates"""
+    hour, minutes, completed, playlist_id = facts
+    profile.total_sessions = max(0, (profile.total_sessions or 0) + sign)
+    profile.completed_sessions = max(0, (profile.completed_sessions or 0) + sign * completed)
+    profile.total_minutes = max(0, (profile.total_minutes or 0) + sign * minutes)
+
+    # JSON columns are reassigned (not mutated) so the change is flushed
+    if hour is not None:
+        by_hour = list(profile.sessions_by_hour or [0] * 24)
+        by_hour[hour] = max(0, by_hour[hour] + sign)
+        profile.sessions_by_hour = by_hour
+    if playlist_id:
+        playlist_stats = dict(profile.playlist_stats or {})
+        stats = dict(playlist_stats.get(playlist_id, {"sessions": 0, "completed": 0, "minutes": 0}))
+        stats["sessions"] = max(0, stats["sessions"] + sign)
+        stats["completed"] = max(0, stats["completed"] + sign * completed)
+        stats["minutes"] = max(0, stats["minutes"] + sign * minutes)
+        playlist_stats[playlist_id] = stats
+        profile.playlist_stats = playlist_stats
+
+def get_focus_profile(db: Session, user_id: int) -> Optional[FocusProfile]:
+    return db.get(FocusProfile, user_id)
+
+def _locked_focus_profile(db: Session, user_id: int, create: bool = True) -> Optional[FocusProfile]:
+    """
+    The user's profile row, locked until the transaction ends so concurrent
+    sessions are applied one after the other; created first if missing
+    (without racing another request creating it)
+    """
+    if create:
+        dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        db.execute(dialect_insert(FocusProfile).values(
+            user_id=user_id, total_sessions=0, completed_sessions=0, total_minutes=0, updated_at=datetime.utcnow()
+        ).on_conflict_do_nothing(index_elements=[FocusProfile.user_id]))
+    return db.query(FocusProfile).filter(
+        FocusProfile.user_id == user_id
+    ).populate_existing().with_for_update().first()
+
+def record_focus_session(db: Session, user_id: int, activity: Activity, sign: int = 1):
+    """
+    Fold a logged (or, with sign=-1, deleted) focus session into the user's profile
+
+    Call before committing the activity so both land in one transaction.
+    """
+    if activity.activity_type != FOCUS_ACTIVITY_TYPE:
+        return
+    profile = _locked_focus_profile(db, user_id, create=sign > 0)
+    if profile is None:
+        return
+    # created_at is only defaulted at flush time
+    created_at = activity.created_at or datetime.utcnow()
+    _apply(profile, _session_facts(created_at, activity.duration_minutes, activity.extra_data), sign)
+
+def rebuild_focus_profile(db: Session, user_id: int) -> FocusProfile:
+    """Recompute a user's profile from all of their focus sessions (after bulk imports)"""
+    profile = _locked_focus_profile(db, user_id)
+    profile.total_sessions = profile.completed_sessions = profile.total_minutes = 0
+    profile.sessions_by_hour = None
+    profile.playlist_stats = None
+
+    sessions = db.query(Activity.created_at, Activity.duration_minutes, Activity.extra_data).filter(
+        Activity.user_id == user_id,
+        Activity.activity_type == FOCUS_ACTIVITY_TYPE
+    ).yield_per(1000)
+    for row in sessions:
+        _apply(profile, _session_facts(*row), 1)
+    return profile
+
+def listening_stats(profile: Optional[FocusProfile]) -> Dict:
+    """The user's focus-session and per-playlist listening aggregates"""
+    sessions = profile.total_sessions if profile else 0
+    minutes = profile.total_minutes if profile else 0
+    return {
+        "total_sessions": sessions,
+        "completed_sessions": profile.completed_sessions if profile else 0,
+        "total_minutes": minutes,
+        "average_session_minutes": round(minutes / sessions, 1) if sessions else 0.0,
+        "sessions_by_hour": (profile.sessions_by_hour if profile else None) or [0] * 24,
+        "playlists": (profile.playlist_stats if profile else None) or {}
+    }
@@ -0,0 +1,133 @@
+"""
+Per-goal todo and focus-time counters, stored on the goal row
+
+Todo and focus-session writes adjust their goal's counters with relative
+UPDATEs (col = col + delta) in the writer's transaction, so concurrent
+writes never lose an increment and goal lists carry progress without
+aggregating todos or activities. Goals in "auto" progress mode get their
+progress_percentage recomputed in the same statement.
+repair_goal_counters() recomputes everything from the source rows, after
+bulk inserts or to correct drift.
+"""
+from typing import Dict, Optional
+
+from sqlalchemy import case, func, update
+from sqlalchemy.orm import Session
+
+from app.models.activity import Activity
+from app.models.goal import Goal
+from app.models.todo import Todo
+from app.services.focus_profile import FOCUS_ACTIVITY_TYPE
+from app.services.goal_stats import ACTIVITY_GOAL_ID
+from app.utils.metrics import GOAL_COUNTER_REPAIRS
+
+COUNTER_FIELDS = ("total_todos", "completed_todos", "focus_minutes", "focus_sessions")
+
+def auto_progress(completed_todos: int, total_todos: int) -> int:
+    """progress_percentage of a goal in auto mode: the share of its todos completed"""
+    return completed_todos * 100 // total_todos if total_todos else 0
+
+def _adjust(db: Session, user_id: int, goal_id: Optional[int], **deltas: int):
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if goal_id is None or not deltas:
+        return
+    values = {getattr(Goal, field): getattr(Goal, field) + delta for field, delta in deltas.items()}
+    if "total_todos" in deltas or "completed_todos" in deltas:
+        # SET expressions see the row's old values, so apply the deltas here too
+        total = Goal.total_todos + deltas.get("total_todos", 0)
+        completed = Goal.completed_todos + deltas.get("completed_todos", 0)
+        values[Goal.progress_percentage] = case(
+            (Goal.progress_mode == "auto", case((total > 0, completed * 100 // total), else_=0)),
+            else_=Goal.progress_percentage
+        )
+    # Derived data: not an edit of the goal itself
+    values[Goal.updated_at] = Goal.updated_at
+    db.query(Goal).filter(
+        Goal.id == goal_id,
+        Goal.user_id == user_id
+    ).update(values, synchronize_session=False)
+
+def record_todo(db: Session, user_id: int, todo: Todo, sign: int = 1):
+    """
+    Count a created (or, with sign=-1, deleted) todo on its goal
+
+    Call before committing the todo so both land in one transaction.
+    """
+    _adjust(db, user_id, todo.goal_id, total_todos=sign, completed_todos=sign * bool(todo.is_completed))
+
+def record_todo_change(db: Session, user_id: int, old_goal_id: Optional[int], was_completed: bool, todo: Todo):
+    """Move an updated todo between goals' counters and/or flip its completion"""
+    completed = bool(todo.is_completed)
+    if old_goal_id == todo.goal_id:
+        _adjust(db, user_id, todo.goal_id, completed_todos=completed - bool(was_completed))
+        return
+    _adjust(db, user_id, old_goal_id, total_todos=-1, completed_todos=-bool(was_completed))
+    _adjust(db, user_id, todo.goal_id, total_todos=1, completed_todos=completed)
+
+def record_subtree(db: Session, user_id: int, goal_id: Optional[int], total: int, completed: int, sign: int = 1):
+    """Count (or, with sign=-1, uncount) the todos of a subtask tree on their goal at once"""
+    _adjust(db, user_id, goal_id, total_todos=sign * total, completed_todos=sign * completed)
+
+def focus_goal_id(activity: Activity) -> Optional[int]:
+    """The goal a focus session is linked to through extra_data.goal_id, if any"""
+    if activity.activity_type != FOCUS_ACTIVITY_TYPE or not isinstance(activity.extra_data, dict):
+        return None
+    goal_id = activity.extra_data.get("goal_id")
+    return goal_id if isinstance(goal_id, int) and not isinstance(goal_id, bool) else None
+
+def record_goal_focus(db: Session, user_id: int, activity: Activity, sign: int = 1):
+    """Add (or, with sign=-1, remove) a focus session's minutes on its goal"""
+    _adjust(
+        db, user_id, focus_goal_id(activity),
+        focus_minutes=sign * max(0, activity.duration_minutes or 0),
+        focus_sessions=sign
+    )
+
+def repair_goal_counters(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recompute the counters (and auto progress) of a user's goals, or of all
+    goals, from their todos and focus sessions
+
+    Only goals whose stored values differ are updated. Returns their number;
+    the caller commits.
+    """
+    todo_totals = db.query(
+        Todo.goal_id,
+        func.count(Todo.id),
+        func.sum(case((Todo.is_completed == True, 1), else_=0))  # noqa: E712
+    ).join(Goal, (Goal.id == Todo.goal_id) & (Goal.user_id == Todo.user_id))
+    focus_totals = db.query(
+        ACTIVITY_GOAL_ID,
+        func.coalesce(func.sum(case((Activity.duration_minutes > 0, Activity.duration_minutes), else_=0)), 0),
+        func.count(Activity.id)
+    ).join(Goal, (Goal.id == ACTIVITY_GOAL_ID) & (Goal.user_id == Activity.user_id)).filter(
+        Activity.activity_type == FOCUS_ACTIVITY_TYPE
+    )
+    goals = db.query(
+        Goal.id, Goal.updated_at, Goal.progress_mode, Goal.progress_percentage,
+        *(getattr(Goal, field) for field in COUNTER_FIELDS)
+    )
+    if user_id is not None:
+        todo_totals = todo_totals.filter(Goal.user_id == user_id)
+        focus_totals = focus_totals.filter(Goal.user_id == user_id)
+        goals = goals.filter(Goal.user_id == user_id)
+
+    actual: Dict[int, Dict] = {}
+    for goal_id, total, completed in todo_totals.group_by(Todo.goal_id):
+        actual.setdefault(goal_id, {}).update(total_todos=total, completed_todos=int(completed or 0))
+    for goal_id, minutes, sessions in focus_totals.group_by(ACTIVITY_GOAL_ID):
+        actual.setdefault(goal_id, {}).update(focus_minutes=int(minutes), focus_sessions=sessions)
+
+    fixes = []
+    for goal_id, updated_at, mode, progress, *stored in goals:
+        values = {field: 0 for field in COUNTER_FIELDS}
+        values.update(actual.get(goal_id, {}))
+        if mode == "auto":
+            values["progress_percentage"] = auto_progress(values["completed_todos"], values["total_todos"])
+        current = dict(zip(COUNTER_FIELDS, stored), progress_percentage=progress)
+        if any(current[field] != value for field, value in values.items()):
+            fixes.append({"id": goal_id, "updated_at": updated_at, **values})
+    if fixes:
+        db.execute(update(Goal), fixes)
+        GOAL_COUNTER_REPAIRS.inc(amount=len(fixes))
+    return len(fixes)
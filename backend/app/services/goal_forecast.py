@@ -0,0 +1,193 @@
+"""
+Goal completion forecasts: "when will I finish at my current pace?"
+
+A goal's pace is read from the last FORECAST_WINDOW_DAYS of its history:
+todos completed per day (Todo.completed_at) and focus minutes per day
+(focus sessions linked through Activity.goal_id). Both are aggregated per
+goal and UTC day in SQL, laid out as goals x days NumPy arrays, and every
+statistic is computed for all of a user's goals at once:
+- pace: the 7-day moving average of completions, ending today
+- average pace over the window, and its trend (least-squares slope of the
+  daily completions)
+- the projected completion date (open todos / pace) against target_date,
+  and the pace target_date would need
+Days before a goal was created (or its first completion or focus session,
+if earlier) are left out of its averages and fit.
+
+The result is cached per user until they next write a todo, goal or
+activity (invalidate_dashboard() drops it) and at most
+GOAL_FORECAST_CACHE_TTL_SECONDS, so only the first read after a change
+runs the three aggregate queries.
+"""
+import math
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import orjson
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.activity import Activity
+from app.models.goal import Goal
+from app.models.todo import Todo
+from app.services.cache import TTLCache
+from app.services.focus_profile import FOCUS_ACTIVITY_TYPE
+
+FORECAST_WINDOW_DAYS = int(os.getenv("FORECAST_WINDOW_DAYS", "28"))
+FORECAST_RECENT_DAYS = 7
+GOAL_FORECAST_CACHE_TTL_SECONDS = float(os.getenv("GOAL_FORECAST_CACHE_TTL_SECONDS", "300"))
+
+forecast_cache = TTLCache("goal_forecast", GOAL_FORECAST_CACHE_TTL_SECONDS)
+
+# (id, created_at, target_date, is_achieved, total_todos, completed_todos)
+GoalRow = Tuple[int, Optional[datetime], Optional[datetime], bool, int, int]
+# (goal_id, day, value) per goal and UTC day
+DailyRow = Tuple[int, date, float]
+
+def invalidate_forecasts(user_id: int):
+    forecast_cache.invalidate(user_id)
+
+def _day(value) -> date:
+    # func.date() returns a date on PostgreSQL and an ISO string on SQLite
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+def _daily_array(index: Dict[int, int], rows: Iterable[DailyRow], first_day: date, days: int) -> np.ndarray:
+    """Lay (goal_id, day, value) rows out as a goals x days array"""
+    rows = [(index[goal_id], (_day(day) - first_day).days, value) for goal_id, day, value in rows if goal_id in index]
+    array = np.zeros((len(index), days))
+    if rows:
+        goal_rows, day_columns, values = (np.array(column) for column in zip(*rows))
+        in_window = (day_columns >= 0) & (day_columns < days)
+        np.add.at(array, (goal_rows[in_window], day_columns[in_window]), values[in_window].astype(float))
+    return array
+
+def _rounded(value: float) -> float:
+    return round(float(value), 3)
+
+def compute_forecasts(
+    goals: List[GoalRow],
+    completions: Iterable[DailyRow],
+    focus_minutes: Iterable[DailyRow],
+    today: date,
+    window: int = FORECAST_WINDOW_DAYS,
+    recent: int = FORECAST_RECENT_DAYS
+) -> Dict[int, Dict]:
+    """Forecasts for a batch of goals from their daily completions and focus minutes, vectorized over goals"""
+    if not goals:
+        return {}
+    first_day = today - timedelta(days=window - 1)
+    index = {goal[0]: row for row, goal in enumerate(goals)}
+    done = _daily_array(index, completions, first_day, window)
+    focus = _daily_array(index, focus_minutes, first_day, window)
+
+    # Each goal's history starts when it was created, or on its first
+    # completion or session if earlier (todos can be linked to it later)
+    created = np.array([(today - goal[1].date()).days + 1 if goal[1] else window for goal in goals])
+    has_data = (done > 0) | (focus > 0)
+    first_data = np.where(has_data.any(axis=1), has_data.argmax(axis=1), window - 1)
+    start = np.minimum(window - np.clip(created, 1, window), first_data)
+    active_days = window - start
+    days = np.arange(window)
+    active = days >= start[:, None]
+
+    average_pace = done.sum(axis=1) / active_days
+    # Moving averages over the last `recent` days (fewer for newer goals)
+    recent_days = np.minimum(active_days, recent)
+    pace = done[:, -recent:].sum(axis=1) / recent_days
+    focus_pace = focus[:, -recent:].sum(axis=1) / recent_days
+    completed = done.sum(axis=1)
+    focus_per_todo = np.divide(focus.sum(axis=1), completed, out=np.full(len(goals), np.nan), where=completed > 0)
+
+    # Least-squares slope of daily completions over each goal's active days
+    x_mean = (days * active).sum(axis=1) / active_days
+    y_mean = average_pace
+    dx = np.where(active, days - x_mean[:, None], 0.0)
+    variance = (dx ** 2).sum(axis=1)
+    trend = np.divide((dx * (done - y_mean[:, None])).sum(axis=1), variance, out=np.zeros(len(goals)), where=variance > 0)
+
+    remaining = np.array([max(goal[4] - goal[5], 0) for goal in goals], dtype=float)
+    # The recent pace, or the window's when nothing was completed this week
+    projection_pace = np.where(pace > 0, pace, average_pace)
+    days_to_finish = np.ceil(np.divide(remaining, projection_pace, out=np.full(len(goals), np.nan), where=projection_pace > 0))
+    days_to_target = np.array([(goal[2].date() - today).days if goal[2] else np.nan for goal in goals], dtype=float)
+    required_pace = np.divide(remaining, days_to_target, out=np.full(len(goals), np.nan), where=days_to_target > 0)
+
+    forecasts = {}
+    for row, (goal_id, _, target_date, is_achieved, total_todos, _) in enumerate(goals):
+        open_todos = int(remaining[row])
+        if is_achieved or not total_todos:
+            projected = None
+        elif not open_todos:
+            projected = today
+        elif math.isnan(days_to_finish[row]):
+            projected = None
+        else:
+            projected = today + timedelta(days=int(days_to_finish[row]))
+        on_track = None
+        if target_date is not None and total_todos and not is_achieved:
+            on_track = projected is not None and projected <= target_date.date()
+        forecasts[goal_id] = {
+            "goal_id": goal_id,
+            "as_of": today,
+            "window_days": int(active_days[row]),
+            "remaining_todos": open_todos,
+            "pace_per_day": _rounded(pace[row]),
+            "average_pace_per_day": _rounded(average_pace[row]),
+            "trend_per_day": _rounded(trend[row]),
+            "required_pace_per_day": None if math.isnan(required_pace[row]) else _rounded(required_pace[row]),
+            "focus_minutes_per_day": _rounded(focus_pace[row]),
+            "focus_minutes_per_todo": None if math.isnan(focus_per_todo[row]) else _rounded(focus_per_todo[row]),
+            "projected_completion_date": projected,
+            "target_date": target_date.date() if target_date else None,
+            "on_track": on_track,
+        }
+    return forecasts
+
+def build_forecasts(db: Session, user_id: int, today: Optional[date] = None) -> Dict[int, Dict]:
+    """Forecasts for all of a user's goals, in three queries however many goals and days there are"""
+    today = today or datetime.utcnow().date()
+    since = datetime.combine(today - timedelta(days=FORECAST_WINDOW_DAYS - 1), datetime.min.time())
+    goals = db.query(
+        Goal.id, Goal.created_at, Goal.target_date, Goal.is_achieved, Goal.total_todos, Goal.completed_todos
+    ).filter(Goal.user_id == user_id).order_by(Goal.id).all()
+    if not goals:
+        return {}
+
+    completed_day = func.date(Todo.completed_at)
+    completions = db.query(Todo.goal_id, completed_day, func.count(Todo.id)).filter(
+        Todo.user_id == user_id,
+        Todo.goal_id.isnot(None),
+        Todo.is_completed == True,  # noqa: E712
+        Todo.completed_at >= since
+    ).group_by(Todo.goal_id, completed_day)
+    session_day = func.date(Activity.created_at)
+    focus = db.query(Activity.goal_id, session_day, func.sum(Activity.duration_minutes)).filter(
+        Activity.user_id == user_id,
+        Activity.goal_id.isnot(None),
+        Activity.activity_type == FOCUS_ACTIVITY_TYPE,
+        Activity.created_at >= since
+    ).group_by(Activity.goal_id, session_day)
+    return compute_forecasts(
+        goals,
+        completions.all(),
+        [(goal_id, day, minutes or 0) for goal_id, day, minutes in focus],
+        today
+    )
+
+def get_forecasts(db: Session, user_id: int) -> Dict[int, Dict]:
+    """A user's goal forecasts, from the cache while no write and no new UTC day has made them stale"""
+    today = datetime.utcnow().date()
+    cached = forecast_cache.get(user_id)
+    if cached is not None:
+        payload = orjson.loads(cached)
+        if payload["as_of"] == today.isoformat():
+            return {int(goal_id): forecast for goal_id, forecast in payload["forecasts"].items()}
+    # Not cached if a write invalidates the forecasts while they are being built
+    generation = forecast_cache.generation(user_id)
+    forecasts = build_forecasts(db, user_id, today)
+    forecast_cache.set_unless_invalidated(user_id, orjson.dumps(
+        {"as_of": today, "forecasts": forecasts}, option=orjson.OPT_NON_STR_KEYS
+    ), generation)
+    return forecasts
@@ -0,0 +1,64 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from sqlalchemy.orm import Session
+
+from app.models.goal import Goal
+from app.models.todo import Todo
+from app.models.activity import Activity
+from app.schemas.todo import TodoResponse
+from app.utils.serialization import response_columns
+
+TODO_FIELDS, TODO_COLUMNS = response_columns(Todo, TodoResponse)
+
+# Focus sessions are linked to goals through extra_data.goal_id (set by the
+# Focus page), promoted to the indexed Activity.goal_id column
+ACTIVITY_GOAL_ID = Activity.goal_id
+
+def counter_stats(total_todos: int, completed_todos: int, focus_minutes: int, focus_sessions: int) -> Dict:
+    """A goal's stats from its denormalized counters (see app.services.goal_counters)"""
+    return {
+        "total_todos": total_todos,
+        "completed_todos": completed_todos,
+        "completion_rate": round(completed_todos * 100 / total_todos, 1) if total_todos else 0.0,
+        "focus_minutes": focus_minutes,
+        "focus_sessions": focus_sessions,
+    }
+
+def goal_stats(db: Session, user_id: int, goal_ids: Iterable[int]) -> Dict[int, Dict]:
+    """
+    Todo completion and focus time for a set of goals
+
+    Read from the counters kept on each goal row, in one query regardless of
+    how many goals are passed.
+    """
+    goal_ids = list(goal_ids)
+    if not goal_ids:
+        return {}
+
+    rows = db.query(
+        Goal.id, Goal.total_todos, Goal.completed_todos, Goal.focus_minutes, Goal.focus_sessions
+    ).filter(
+        Goal.user_id == user_id,
+        Goal.id.in_(goal_ids)
+    )
+    stats = {goal_id: counter_stats(0, 0, 0, 0) for goal_id in goal_ids}
+    for goal_id, *counters in rows:
+        stats[goal_id] = counter_stats(*counters)
+    return stats
+
+def todos_by_goal(db: Session, user_id: int, goal_ids: Iterable[int]) -> Dict[int, List[Dict]]:
+    """Todos of several goals in one IN query (what selectinload would issue), grouped by goal id in manual order"""
+    goal_ids = list(goal_ids)
+    grouped = defaultdict(list)
+    if not goal_ids:
+        return grouped
+
+    rows = db.query(*TODO_COLUMNS).filter(
+        Todo.user_id == user_id,
+        Todo.goal_id.in_(goal_ids)
+    ).order_by(Todo.rank, Todo.id)
+    for row in rows:
+        todo = dict(zip(TODO_FIELDS, row))
+        grouped[todo["goal_id"]].append(todo)
+    return grouped
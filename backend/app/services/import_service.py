@@ -0,0 +1,277 @@
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.todo import Todo
+from app.models.goal import Goal
+from app.models.activity import Activity
+from app.models.import_job import ImportJob
+from app.schemas.imports import TodoImport, GoalImport, ActivityImport
+from app.services.focus_profile import rebuild_focus_profile
+from app.services.goal_counters import repair_goal_counters
+from app.services.leaderboards import rebuild_focus_days
+from app.services.todo_ranks import next_ranks
+
+logger = logging.getLogger(__name__)
+
+IMPORT_KINDS = {
+    "todos": (Todo, TodoImport),
+    "goals": (Goal, GoalImport),
+    "activities": (Activity, ActivityImport),
+}
+SOURCE_FORMATS = ("ndjson", "csv")
+DEFAULT_CHUNK_SIZE = 1000
+MAX_STORED_ERRORS = 100
+
+# CSV cells are always strings; these columns carry JSON documents
+CSV_JSON_COLUMNS = {"extra_data"}
+
+def detect_source_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    """Guess the source format from an upload's filename or content type"""
+    if (filename or "").lower().endswith(".csv") or content_type in ("text/csv", "application/csv"):
+        return "csv"
+    return "ndjson"
+
+def iter_records(stream: BinaryIO, source_format: str) -> Iterator[object]:
+    """
+    Lazily parse records from a binary NDJSON or CSV stream
+
+    Yields one dict per record; a record that cannot be parsed is yielded
+    as the exception instead so it is reported against its row number
+    without aborting the rest of the import.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if source_format == "csv":
+            for row in csv.DictReader(text):
+                yield {
+                    key: _parse_csv_cell(key, value)
+                    for key, value in row.items()
+                    if key and value not in ("", None)
+                }
+        else:
+            for line in text:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    yield e
+    finally:
+        # Leave the underlying upload open for its owner to close
+        text.detach()
+
+def _parse_csv_cell(key: str, value: str):
+    if key in CSV_JSON_COLUMNS:
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+class ImportService:
+    """Bulk-load todos, goals and activities in validated, checkpointed chunks"""
+
+    def __init__(
+        self,
+        db: Session,
+        user: User,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        on_progress: Optional[Callable[[ImportJob], None]] = None
+    ):
+        self.db = db
+        self.user = user
+        self.chunk_size = max(1, chunk_size)
+        self.on_progress = on_progress
+        self._goal_refs: Optional[Dict[str, int]] = None
+
+    def start_job(self, kind: str, source_format: str) -> ImportJob:
+        """Create a new import job (the resumable checkpoint record)"""
+        if kind not in IMPORT_KINDS:
+            raise ValueError(f"Unsupported import kind: {kind}")
+        if source_format not in SOURCE_FORMATS:
+            raise ValueError(f"Unsupported source format: {source_format}")
+
+        job = ImportJob(
+            user_id=self.user.id,
+            kind=kind,
+            source_format=source_format,
+            status="running",
+            rows_processed=0,
+            rows_imported=0,
+            rows_failed=0,
+            goal_refs={},
+            errors=[]
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def get_job(self, job_id: int) -> Optional[ImportJob]:
+        """Get one of the user's import jobs"""
+        return self.db.query(ImportJob).filter(
+            ImportJob.id == job_id,
+            ImportJob.user_id == self.user.id
+        ).first()
+
+    def run(self, job: ImportJob, stream: BinaryIO) -> ImportJob:
+        """
+        Stream records from the source into the database
+
+        Each chunk is inserted together with the job's checkpoint in a single
+        transaction, so re-running a failed or interrupted job with the same
+        source skips the rows already committed and loads each row exactly once.
+        Any error rolls back the current chunk and marks the job failed, with
+        the error appended to job.errors, before it is re-raised.
+        """
+        records = iter_records(stream, job.source_format)
+
+        # Fast-forward past rows committed by a previous run
+        row_number = 0
+        for _ in range(job.rows_processed):
+            if next(records, None) is None:
+                break
+            row_number += 1
+
+        job.status = "running"
+        chunk: List[Tuple[int, object]] = []
+        try:
+            for record in records:
+                row_number += 1
+                chunk.append((row_number, record))
+                if len(chunk) >= self.chunk_size:
+                    self._load_chunk(job, chunk)
+                    chunk = []
+            if chunk:
+                self._load_chunk(job, chunk)
+
+            # Bulk inserts bypass the per-row focus profile, focus day and goal
+            # counter updates (leaderboards pick up the new focus days on their
+            # next sync)
+            if job.kind == "activities":
+                rebuild_focus_profile(self.db, self.user.id)
+                rebuild_focus_days(self.db, self.user.id)
+            repair_goal_counters(self.db, self.user.id)
+            job.status = "completed"
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.exception("Import job %s failed near source row %s", job.id, row_number)
+            job.status = "failed"
+            job.errors = (job.errors or []) + [{"row": row_number, "error": f"Import failed: {e}"}]
+            self.db.commit()
+            raise
+
+        self.db.refresh(job)
+        return job
+
+    def _load_chunk(self, job: ImportJob, chunk: List[Tuple[int, object]]):
+        model, schema = IMPORT_KINDS[job.kind]
+        now = datetime.utcnow()
+
+        validated = []
+        errors = []
+        for row_number, record in chunk:
+            try:
+                if isinstance(record, Exception):
+                    raise ValueError(f"Malformed record: {record}")
+                validated.append((row_number, schema.model_validate(record)))
+            except ValueError as e:
+                errors.append({"row": row_number, "error": str(e)})
+
+        if job.kind == "todos":
+            validated = self._resolve_goals(validated, errors)
+
+        rows = [self._to_row(job.kind, item, now) for _, item in validated]
+        if job.kind == "todos" and rows:
+            # Appended after the user's todos, in file order
+            for row, rank in zip(rows, next_ranks(self.db, self.user.id, len(rows))):
+                row["rank"] = rank
+        if rows:
+            if job.kind == "goals":
+                # Goal ids are needed to resolve goal_ref in later todo imports
+                goal_ids = self.db.scalars(
+                    insert(Goal).returning(Goal.id, sort_by_parameter_order=True),
+                    rows
+                ).all()
+                new_refs = {
+                    item.ref: goal_id
+                    for (_, item), goal_id in zip(validated, goal_ids)
+                    if item.ref
+                }
+                if new_refs:
+                    job.goal_refs = {**(job.goal_refs or {}), **new_refs}
+                    self._known_goal_refs().update(new_refs)
+            else:
+                self.db.execute(insert(model), rows)
+
+        job.rows_processed = chunk[-1][0]
+        job.rows_imported += len(rows)
+        job.rows_failed += len(errors)
+        stored_errors = job.errors or []
+        if errors and len(stored_errors) < MAX_STORED_ERRORS:
+            job.errors = (stored_errors + errors)[:MAX_STORED_ERRORS]
+        self.db.commit()
+
+        if self.on_progress:
+            self.on_progress(job)
+
+    def _resolve_goals(self, validated, errors):
+        """Map goal_ref to imported goal ids and check goal_id ownership, one query per chunk"""
+        requested_ids = {item.goal_id for _, item in validated if item.goal_id is not None}
+        owned_ids = set()
+        if requested_ids:
+            owned_ids = {
+                goal_id for (goal_id,) in self.db.query(Goal.id).filter(
+                    Goal.user_id == self.user.id,
+                    Goal.id.in_(requested_ids)
+                )
+            }
+
+        goal_refs = self._known_goal_refs()
+        resolved = []
+        for row_number, item in validated:
+            if item.goal_ref is not None:
+                if item.goal_ref not in goal_refs:
+                    errors.append({"row": row_number, "error": f"Unknown goal_ref: {item.goal_ref}"})
+                    continue
+                item.goal_id = goal_refs[item.goal_ref]
+            elif item.goal_id is not None and item.goal_id not in owned_ids:
+                errors.append({"row": row_number, "error": f"Goal not found: {item.goal_id}"})
+                continue
+            resolved.append((row_number, item))
+        return resolved
+
+    def _known_goal_refs(self) -> Dict[str, int]:
+        if self._goal_refs is None:
+            self._goal_refs = {}
+            jobs = self.db.query(ImportJob.goal_refs).filter(
+                ImportJob.user_id == self.user.id,
+                ImportJob.kind == "goals"
+            ).order_by(ImportJob.id)
+            for (goal_refs,) in jobs:
+                self._goal_refs.update(goal_refs or {})
+        return self._goal_refs
+
+    def _to_row(self, kind: str, item, now: datetime) -> Dict:
+        """Build a homogeneous insert row so the whole chunk batches into multi-row INSERTs"""
+        # Imported todos are top-level: subtasks need their parent's path
+        row = item.model_dump(exclude={"ref", "goal_ref", "parent_id"})
+        row["user_id"] = self.user.id
+        row["created_at"] = item.created_at or now
+        if kind != "activities":
+            row["updated_at"] = row["created_at"]
+        if kind == "todos" and item.is_completed and not item.completed_at:
+            row["completed_at"] = now
+        if kind == "goals" and item.is_achieved and not item.achieved_at:
+            row["achieved_at"] = now
+        return row
@@ -0,0 +1,388 @@
+"""
+Focus-time leaderboards (daily, weekly, all-time), ranked in memory
+
+Only users who opted in (User.leaderboard_opt_in) are ranked. Focus
+sessions are summed per user and UTC day into focus_days in the writer's
+transaction, so nothing ever aggregates activities. Each worker keeps every
+period's scores in an IndexableSkipList ordered by (-minutes, user_id): the
+top N and any user's rank take O(log n).
+- The worker that logs or deletes a session adjusts its rankings at once.
+- Every LEADERBOARD_SYNC_SECONDS, one request re-reads the users whose
+  focus_days or opt-in changed since the last sync (both indexed on their
+  timestamps), picking up other workers' writes and imports.
+- With LEADERBOARD_SNAPSHOT_PATH set, the rankings are written there every
+  LEADERBOARD_SNAPSHOT_SECONDS and at shutdown. A restart loads the
+  snapshot and syncs from its time instead of summing all of focus_days.
+Days are UTC; weeks start on Monday.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import orjson
+from sqlalchemy import case, delete, func, insert, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db.database import SessionLocal
+from app.models.activity import Activity
+from app.models.leaderboard import FocusDay
+from app.models.user import User
+from app.services.focus_profile import FOCUS_ACTIVITY_TYPE
+from app.utils.skiplist import IndexableSkipList
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_SYNC_SECONDS = float(os.getenv("LEADERBOARD_SYNC_SECONDS", "5"))
+LEADERBOARD_SNAPSHOT_PATH = os.getenv("LEADERBOARD_SNAPSHOT_PATH", "")
+LEADERBOARD_SNAPSHOT_SECONDS = float(os.getenv("LEADERBOARD_SNAPSHOT_SECONDS", "300"))
+# Rows stamped shortly before a sync may commit after it, so each sync
+# re-reads this far back (re-reading is harmless: scores are recomputed)
+SYNC_OVERLAP = timedelta(seconds=60)
+SYNC_BATCH_SIZE = 500
+SNAPSHOT_VERSION = 1
+PERIODS = ("daily", "weekly", "all_time")
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+def _session_minutes(activity: Activity) -> int:
+    if activity.activity_type != FOCUS_ACTIVITY_TYPE:
+        return 0
+    return max(0, activity.duration_minutes or 0)
+
+def record_focus_day(db: Session, user_id: int, activity: Activity, sign: int = 1):
+    """
+    Add a logged (or, with sign=-1, subtract a deleted) focus session's
+    minutes to its day
+
+    Call before committing the activity so both land in one transaction.
+    """
+    minutes = _session_minutes(activity)
+    if not minutes:
+        return
+    # created_at is only defaulted at flush time
+    day = (activity.created_at or datetime.utcnow()).date()
+    now = datetime.utcnow()
+    if sign < 0:
+        remaining = FocusDay.minutes - minutes
+        db.execute(update(FocusDay).where(FocusDay.user_id == user_id, FocusDay.day == day).values(
+            minutes=case((remaining > 0, remaining), else_=0), updated_at=now
+        ))
+        return
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    statement = dialect_insert(FocusDay).values(user_id=user_id, day=day, minutes=minutes, updated_at=now)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[FocusDay.user_id, FocusDay.day],
+        set_={"minutes": FocusDay.minutes + statement.excluded.minutes, "updated_at": now}
+    ))
+
+def rebuild_focus_days(db: Session, user_id: Optional[int] = None):
+    """Recompute a user's (or everyone's) focus_days from their focus sessions (after bulk imports)"""
+    day = func.date(Activity.created_at)
+    sessions = select(
+        Activity.user_id,
+        day,
+        func.sum(Activity.duration_minutes),
+        literal(datetime.utcnow(), FocusDay.updated_at.type)
+    ).where(
+        Activity.activity_type == FOCUS_ACTIVITY_TYPE,
+        Activity.duration_minutes > 0,
+        Activity.created_at.isnot(None)
+    ).group_by(Activity.user_id, day)
+    clear = delete(FocusDay)
+    if user_id is not None:
+        sessions = sessions.where(Activity.user_id == user_id)
+        clear = clear.where(FocusDay.user_id == user_id)
+    db.execute(clear)
+    db.execute(insert(FocusDay).from_select(
+        [FocusDay.user_id, FocusDay.day, FocusDay.minutes, FocusDay.updated_at], sessions
+    ))
+
+class Ranking:
+    """Users' minutes in one period, ordered by (-minutes, user_id)"""
+
+    def __init__(self, minutes: Optional[Dict[int, int]] = None):
+        self.minutes: Dict[int, int] = {user_id: value for user_id, value in (minutes or {}).items() if value > 0}
+        # Bulk-built when loading (a restart): O(n) rather than n inserts
+        self._order = IndexableSkipList.from_sorted(sorted((-value, user_id) for user_id, value in self.minutes.items()))
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def set(self, user_id: int, minutes: int):
+        previous = self.minutes.pop(user_id, None)
+        if previous is not None:
+            self._order.remove((-previous, user_id))
+        if minutes > 0:
+            self.minutes[user_id] = minutes
+            self._order.add((-minutes, user_id))
+
+    def add(self, user_id: int, minutes: int):
+        self.set(user_id, self.minutes.get(user_id, 0) + minutes)
+
+    def _rank_of(self, minutes: int) -> int:
+        # Ties share the better rank ("1224"); (-minutes,) sorts before every
+        # (-minutes, user_id)
+        return self._order.bisect_left((-minutes,)) + 1
+
+    def rank(self, user_id: int) -> Optional[int]:
+        minutes = self.minutes.get(user_id)
+        return self._rank_of(minutes) if minutes is not None else None
+
+    def top(self, limit: int, offset: int = 0) -> List[Tuple[int, int, int]]:
+        """(rank, user_id, minutes) of the users at positions offset..offset+limit"""
+        entries = []
+        rank, previous = None, None
+        for position, (negative, user_id) in enumerate(islice(self._order.iterate(offset), limit), offset + 1):
+            if negative != previous:
+                rank = self._rank_of(-negative) if previous is None else position
+                previous = negative
+            entries.append((rank, user_id, -negative))
+        return entries
+
+class FocusLeaderboards:
+    """Every worker's copy of the rankings, kept current as described above"""
+
+    def __init__(self, sync_seconds: float = LEADERBOARD_SYNC_SECONDS, snapshot_path: str = LEADERBOARD_SNAPSHOT_PATH):
+        self.sync_seconds = sync_seconds
+        self.snapshot_path = snapshot_path
+        self.rankings: Dict[str, Ranking] = {period: Ranking() for period in PERIODS}
+        self.members: Set[int] = set()  # Opted-in users, ranked or not
+        self.day: Optional[date] = None  # None until loaded
+        self._synced_at: Optional[datetime] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    # Loading and syncing (callers hold the lock)
+
+    def _roll(self, today: date):
+        """Start new daily/weekly rankings when the day/week changed"""
+        if self.day is not None and today <= self.day:
+            return
+        if self.day is None or week_start(today) != week_start(self.day):
+            self.rankings["weekly"] = Ranking()
+        self.rankings["daily"] = Ranking()
+        self.day = today
+
+    def _scores(self, db: Session, user_ids: Optional[Iterable[int]] = None):
+        """(user_id, all-time, this week's, today's minutes) of opted-in users, in one grouped query"""
+        minutes = FocusDay.minutes
+        query = db.query(
+            User.id,
+            func.coalesce(func.sum(minutes), 0),
+            func.coalesce(func.sum(case((FocusDay.day >= week_start(self.day), minutes), else_=0)), 0),
+            func.coalesce(func.sum(case((FocusDay.day == self.day, minutes), else_=0)), 0)
+        ).outerjoin(FocusDay, FocusDay.user_id == User.id).filter(
+            User.leaderboard_opt_in == True,  # noqa: E712
+            User.deleted_at.is_(None)
+        ).group_by(User.id)
+        if user_ids is not None:
+            query = query.filter(User.id.in_(list(user_ids)))
+        return query.all()
+
+    def _apply(self, rows, user_ids: Iterable[int] = ()):
+        """Store fresh scores; users in user_ids without a row have opted out"""
+        for user_id, total, weekly, daily in rows:
+            self.members.add(user_id)
+            self.rankings["all_time"].set(user_id, int(total))
+            self.rankings["weekly"].set(user_id, int(weekly))
+            self.rankings["daily"].set(user_id, int(daily))
+        for user_id in set(user_ids) - {row[0] for row in rows}:
+            self._discard(user_id)
+
+    def _discard(self, user_id: int):
+        self.members.discard(user_id)
+        for ranking in self.rankings.values():
+            ranking.set(user_id, 0)
+
+    def _load(self, db: Session):
+        if self.snapshot_path and self._load_snapshot(self.snapshot_path):
+            self._sync(db)
+            return
+        started = datetime.utcnow()
+        self._roll(started.date())
+        rows = self._scores(db)
+        self.members = {row[0] for row in rows}
+        self.rankings = {
+            "daily": Ranking({user_id: int(daily) for user_id, _, _, daily in rows}),
+            "weekly": Ranking({user_id: int(weekly) for user_id, _, weekly, _ in rows}),
+            "all_time": Ranking({user_id: int(total) for user_id, total, _, _ in rows}),
+        }
+        self._synced_at = started
+        self._checked_at = time.monotonic()
+
+    def _sync(self, db: Session):
+        """Re-read the users whose focus days or opt-in changed since the last sync"""
+        started = datetime.utcnow()
+        since = self._synced_at - SYNC_OVERLAP
+        changed = [
+            user_id for (user_id,) in db.execute(
+                select(FocusDay.user_id).where(FocusDay.updated_at >= since).union(
+                    select(User.id).where(User.leaderboard_changed_at >= since)
+                )
+            )
+        ]
+        self._roll(started.date())
+        for start in range(0, len(changed), SYNC_BATCH_SIZE):
+            batch = changed[start:start + SYNC_BATCH_SIZE]
+            self._apply(self._scores(db, batch), batch)
+        self._synced_at = started
+        self._checked_at = time.monotonic()
+
+    def _load_snapshot(self, path: str) -> bool:
+        try:
+            with open(path, "rb") as snapshot_file:
+                snapshot = orjson.loads(snapshot_file.read())
+            if snapshot.get("version") != SNAPSHOT_VERSION:
+                return False
+            synced_at = datetime.fromisoformat(snapshot["synced_at"])
+            day = date.fromisoformat(snapshot["day"])
+            rankings = {period: Ranking(dict(snapshot["minutes"][period])) for period in PERIODS}
+            members = set(snapshot["members"])
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.warning("Ignoring unreadable leaderboard snapshot %s", path, exc_info=True)
+            return False
+        self.rankings, self.members, self.day, self._synced_at = rankings, members, day, synced_at
+        # Nobody without a focus day since the snapshot has minutes in a newer day or week
+        self._roll(datetime.utcnow().date())
+        return True
+
+    # Public API
+
+    def current(self, db: Session) -> "FocusLeaderboards":
+        """Load on first use; sync if the last sync is older than sync_seconds"""
+        if self.day is None:
+            with self._lock:
+                if self.day is None:
+                    self._load(db)
+        elif time.monotonic() - self._checked_at >= self.sync_seconds:
+            # One request pays for the sync; concurrent ones serve the current rankings
+            if self._lock.acquire(blocking=False):
+                try:
+                    self._sync(db)
+                finally:
+                    self._lock.release()
+        return self
+
+    def record(self, user_id: int, created_at: datetime, minutes: int):
+        """Apply a committed focus session (negative minutes: a deleted one) to a loaded worker's rankings"""
+        with self._lock:
+            if self.day is None or not minutes or user_id not in self.members:
+                return
+            self._roll(datetime.utcnow().date())
+            day = created_at.date()
+            self.rankings["all_time"].add(user_id, minutes)
+            if week_start(day) == week_start(self.day) and day <= self.day:
+                self.rankings["weekly"].add(user_id, minutes)
+            if day == self.day:
+                self.rankings["daily"].add(user_id, minutes)
+
+    def refresh_user(self, db: Session, user_id: int):
+        """Re-read one user's scores and opt-in, e.g. after they opted in or out"""
+        with self._lock:
+            if self.day is not None:
+                self._apply(self._scores(db, [user_id]), [user_id])
+
+    def discard(self, user_id: int):
+        """Drop a user from the rankings (opted out, deactivated or deleted)"""
+        with self._lock:
+            self._discard(user_id)
+
+    def top(self, period: str, limit: int, offset: int = 0) -> Tuple[int, List[Tuple[int, int, int]]]:
+        """Number of ranked users and the (rank, user_id, minutes) on one page"""
+        with self._lock:
+            ranking = self.rankings[period]
+            return len(ranking), ranking.top(limit, offset)
+
+    def standing(self, period: str, user_id: int) -> Optional[Tuple[Optional[int], int]]:
+        """(rank, minutes) of an opted-in user (rank None without minutes); None if not opted in"""
+        with self._lock:
+            if user_id not in self.members:
+                return None
+            ranking = self.rankings[period]
+            return ranking.rank(user_id), ranking.minutes.get(user_id, 0)
+
+    def among(self, period: str, user_ids: Iterable[int]) -> List[Tuple[int, int, int]]:
+        """(rank, user_id, minutes) of the opted-in users among user_ids, ranked against each other"""
+        with self._lock:
+            minutes = self.rankings[period].minutes
+            scores = sorted((-minutes.get(user_id, 0), user_id) for user_id in set(user_ids) & self.members)
+        entries = []
+        for position, (negative, user_id) in enumerate(scores, 1):
+            rank = entries[-1][0] if entries and -negative == entries[-1][2] else position
+            entries.append((rank, user_id, -negative))
+        return entries
+
+    def save_snapshot(self, path: Optional[str] = None) -> bool:
+        """Write the rankings to path (default snapshot_path) atomically; False if not loaded"""
+        path = path or self.snapshot_path
+        with self._lock:
+            if self.day is None or not path:
+                return False
+            snapshot = {
+                "version": SNAPSHOT_VERSION,
+                "synced_at": self._synced_at.isoformat(),
+                "day": self.day.isoformat(),
+                "members": list(self.members),
+                "minutes": {period: list(ranking.minutes.items()) for period, ranking in self.rankings.items()},
+            }
+        # Workers sharing the path each write their own temporary file
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as snapshot_file:
+            snapshot_file.write(orjson.dumps(snapshot))
+        os.replace(temporary, path)
+        return True
+
+focus_leaderboards = FocusLeaderboards()
+
+def record_focus_time(user_id: int, activity: Activity, sign: int = 1):
+    """After committing a logged (or deleted) activity, update this worker's rankings"""
+    minutes = _session_minutes(activity)
+    if minutes:
+        focus_leaderboards.record(user_id, activity.created_at or datetime.utcnow(), sign * minutes)
+
+def usernames(db: Session, user_ids: Iterable[int]) -> Dict[int, str]:
+    """Usernames of the listed users still ranked; others are dropped from the rankings"""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return {}
+    names = dict(db.query(User.id, User.username).filter(
+        User.id.in_(user_ids),
+        User.leaderboard_opt_in == True,  # noqa: E712
+        User.deleted_at.is_(None)
+    ).all())
+    # Deleted or opted out on another worker, not synced yet
+    for user_id in user_ids - names.keys():
+        focus_leaderboards.discard(user_id)
+    return names
+
+def warm_leaderboards():
+    """Load the rankings ahead of the first leaderboard request (run at startup)"""
+    db = SessionLocal()
+    try:
+        focus_leaderboards.current(db)
+    except Exception:
+        logger.warning("Leaderboard warm-up failed; they will load on first use", exc_info=True)
+    finally:
+        db.close()
+
+def save_leaderboard_snapshot():
+    try:
+        focus_leaderboards.save_snapshot()
+    except OSError:
+        logger.warning("Could not write the leaderboard snapshot", exc_info=True)
+
+async def snapshot_leaderboards(interval: float = LEADERBOARD_SNAPSHOT_SECONDS):
+    """Write the snapshot every interval seconds until cancelled (started by the app's lifespan)"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        await loop.run_in_executor(None, save_leaderboard_snapshot)
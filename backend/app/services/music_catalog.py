@@ -0,0 +1,352 @@
+"""
+Focus music catalog: DB-backed playlists and tracks served from memory
+
+The catalog tables are read once into an immutable CatalogSnapshot holding
+precomputed response bodies and a token-prefix search index. Requests read
+the current snapshot without touching the database, except for a cheap
+version check every MUSIC_CATALOG_RELOAD_SECONDS that swaps in a rebuilt
+snapshot when playlists or tracks were added, edited or removed.
+"""
+import logging
+import math
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.db.database import SessionLocal
+from app.models.music import MusicPlaylist, MusicTrack
+from app.models.focus_profile import FocusProfile
+from app.utils.http_cache import PrecomputedJSON
+
+logger = logging.getLogger(__name__)
+
+MUSIC_CATALOG_RELOAD_SECONDS = float(os.getenv("MUSIC_CATALOG_RELOAD_SECONDS", "30"))
+TRACK_FIELDS = ("id", "title", "artist", "duration", "url", "embed_id")
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Seed data for an empty catalog (the playlists that used to be hardcoded)
+DEFAULT_PLAYLISTS = {
+    "lofi": {
+        "name": "Lofi Hip Hop",
+        "description": "Chill beats to focus and relax",
+        "times_of_day": ["morning", "afternoon"],
+        "tracks": [
+            {
+                "id": "lofi_1",
+                "title": "Lofi Study Beats",
+                "artist": "Chillhop Music",
+                "duration": 180,
+                "url": "https://www.youtube.com/watch?v=jfKfPfyJRdk",  # Lofi Girl - beats to relax/study to
+                "embed_id": "jfKfPfyJRdk"
+            },
+            {
+                "id": "lofi_2",
+                "title": "Cozy Lofi",
+                "artist": "Lofi Girl",
+                "duration": 240,
+                "url": "https://www.youtube.com/watch?v=rUxyKA_-grg",
+                "embed_id": "rUxyKA_-grg"
+            }
+        ]
+    },
+    "rain": {
+        "name": "Rain Sounds",
+        "description": "Natural rain sounds for deep focus",
+        "times_of_day": ["evening"],
+        "tracks": [
+            {
+                "id": "rain_1",
+                "title": "Gentle Rain",
+                "artist": "Nature Sounds",
+                "duration": 600,
+                "url": "https://www.youtube.com/watch?v=q76bMs-NwRk",
+                "embed_id": "q76bMs-NwRk"
+            },
+            {
+                "id": "rain_2",
+                "title": "Thunderstorm",
+                "artist": "Ambient Sounds",
+                "duration": 480,
+                "url": "https://www.youtube.com/watch?v=nDq6TstdEi8",
+                "embed_id": "nDq6TstdEi8"
+            }
+        ]
+    },
+    "ambient": {
+        "name": "Ambient Music",
+        "description": "Calm instrumental music for concentration",
+        "times_of_day": ["afternoon"],
+        "tracks": [
+            {
+                "id": "ambient_1",
+                "title": "Deep Focus",
+                "artist": "Spotify",
+                "duration": 300,
+                "url": "https://www.youtube.com/watch?v=lTRiuFIWV54",
+                "embed_id": "lTRiuFIWV54"
+            },
+            {
+                "id": "ambient_2",
+                "title": "Peaceful Piano",
+                "artist": "Spotify",
+                "duration": 280,
+                "url": "https://www.youtube.com/watch?v=4oStw0r33so",
+                "embed_id": "4oStw0r33so"
+            }
+        ]
+    },
+    "nature": {
+        "name": "Nature Sounds",
+        "description": "Forest, ocean, and nature ambience",
+        "times_of_day": ["evening"],
+        "tracks": [
+            {
+                "id": "nature_1",
+                "title": "Forest Ambience",
+                "artist": "Nature Sounds",
+                "duration": 420,
+                "url": "https://www.youtube.com/watch?v=xNN7iTA57jM",
+                "embed_id": "xNN7iTA57jM"
+            },
+            {
+                "id": "nature_2",
+                "title": "Ocean Waves",
+                "artist": "Relaxing Sounds",
+                "duration": 360,
+                "url": "https://www.youtube.com/watch?v=V1bFr2SWP1I",
+                "embed_id": "V1bFr2SWP1I"
+            }
+        ]
+    },
+    "classical": {
+        "name": "Classical Focus",
+        "description": "Classical music for enhanced concentration",
+        "times_of_day": ["morning"],
+        "tracks": [
+            {
+                "id": "classical_1",
+                "title": "Classical Study Music",
+                "artist": "Various Artists",
+                "duration": 320,
+                "url": "https://www.youtube.com/watch?v=jgpJVI3tDbY",
+                "embed_id": "jgpJVI3tDbY"
+            }
+        ]
+    }
+}
+
+def seed_default_catalog(db: Session) -> bool:
+    """Insert DEFAULT_PLAYLISTS when the catalog tables are empty"""
+    if db.query(MusicPlaylist.id).first() is not None:
+        return False
+    for position, (slug, playlist) in enumerate(DEFAULT_PLAYLISTS.items()):
+        db.add(MusicPlaylist(
+            slug=slug,
+            name=playlist["name"],
+            description=playlist["description"],
+            times_of_day=playlist["times_of_day"],
+            position=position,
+            tracks=[
+                MusicTrack(slug=track["id"], position=track_position,
+                           **{field: track[field] for field in TRACK_FIELDS if field != "id"})
+                for track_position, track in enumerate(playlist["tracks"])
+            ]
+        ))
+    db.commit()
+    return True
+
+def time_of_day(hour: int) -> str:
+    if 6 <= hour < 12:
+        return "morning"
+    elif 12 <= hour < 18:
+        return "afternoon"
+    return "evening"
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+class CatalogSnapshot:
+    """An immutable, fully indexed copy of the catalog; replaced wholesale on reload"""
+
+    def __init__(self, playlists: List[MusicPlaylist], version: Tuple):
+        self.version = version
+        self.playlists: Dict[str, Dict] = {}
+        self.tracks: List[Dict] = []
+        self.times_of_day: Dict[str, Set[str]] = {}
+        self.avg_track_minutes: Dict[str, float] = {}
+        for playlist in playlists:
+            tracks = [
+                {"id": track.slug, **{field: getattr(track, field) for field in TRACK_FIELDS if field != "id"}}
+                for track in playlist.tracks
+            ]
+            self.playlists[playlist.slug] = {
+                "id": playlist.slug,
+                "name": playlist.name,
+                "description": playlist.description,
+                "tracks": tracks
+            }
+            self.times_of_day[playlist.slug] = set(playlist.times_of_day or ())
+            durations = [track["duration"] for track in tracks if track["duration"]]
+            self.avg_track_minutes[playlist.slug] = sum(durations) / len(durations) / 60 if durations else 0.0
+            for track in tracks:
+                self.tracks.append({**track, "playlist_id": playlist.slug, "playlist_name": playlist.name})
+
+        # Response bodies for the static catalog endpoints
+        self.summary = PrecomputedJSON({
+            "playlists": [
+                {
+                    "id": playlist["id"],
+                    "name": playlist["name"],
+                    "description": playlist["description"],
+                    "track_count": len(playlist["tracks"])
+                }
+                for playlist in self.playlists.values()
+            ]
+        })
+        self.details = {slug: PrecomputedJSON(playlist) for slug, playlist in self.playlists.items()}
+
+        # Every prefix of every title/artist/playlist-name token -> track positions,
+        # so a search is one dict lookup per query term plus a set intersection
+        self._title_tokens: List[Set[str]] = []
+        self._prefix_index: Dict[str, Set[int]] = {}
+        for position, track in enumerate(self.tracks):
+            title_tokens = set(tokenize(track["title"]))
+            self._title_tokens.append(title_tokens)
+            for token in title_tokens | set(tokenize(track["artist"])) | set(tokenize(track["playlist_name"])):
+                for end in range(1, len(token) + 1):
+                    self._prefix_index.setdefault(token[:end], set()).add(position)
+
+    def search(self, query: str, limit: int) -> List[Dict]:
+        """Tracks matching every query term as a word prefix; whole-word title matches rank first"""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        matches = None
+        for term in sorted(set(terms), key=lambda term: len(self._prefix_index.get(term, ()))):
+            positions = self._prefix_index.get(term)
+            if not positions:
+                return []
+            matches = set(positions) if matches is None else matches & positions
+            if not matches:
+                return []
+
+        def rank(position):
+            title_hits = sum(term in self._title_tokens[position] for term in terms)
+            return (-title_hits, position)
+
+        return [self.tracks[position] for position in sorted(matches, key=rank)[:limit]]
+
+    def recommend(self, profile: Optional[FocusProfile], hour: int, count: int = 2) -> Dict:
+        """
+        Rank playlists for a user at a local hour
+
+        Uses only the user's precomputed FocusProfile aggregates (never their
+        activity rows), so the cost is fixed by the catalog size. Without
+        history the time-of-day defaults decide.
+        """
+        bucket = time_of_day(hour)
+        sessions = profile.total_sessions if profile else 0
+        if not sessions:
+            ranked = sorted(self.playlists, key=lambda slug: bucket not in self.times_of_day[slug])
+            return {
+                "recommended": [self.playlists[slug] for slug in ranked[:count]],
+                "reason": f"Recommended for {hour}:00 - optimal focus music for this time of day",
+                "based_on": "time_of_day"
+            }
+
+        playlist_stats = profile.playlist_stats or {}
+        total_minutes = profile.total_minutes or 0
+        avg_session_minutes = total_minutes / sessions
+        # Long sessions suit long, uninterrupted tracks; short ones suit short tracks
+        target_track_minutes = min(10.0, max(3.0, avg_session_minutes / 5))
+
+        def score(slug):
+            stats = playlist_stats.get(slug, {})
+            played = stats.get("sessions", 0)
+            # Smoothed completion rate, 0 for never-played playlists
+            completion = 2 * (stats.get("completed", 0) + 1) / (played + 2) - 1
+            familiarity = stats.get("minutes", 0) / total_minutes if total_minutes else 0.0
+            track_minutes = self.avg_track_minutes[slug] or target_track_minutes
+            length_fit = 1 / (1 + abs(math.log(track_minutes / target_track_minutes)))
+            return (bucket in self.times_of_day[slug]) + completion + familiarity + 0.5 * length_fit
+
+        ranked = sorted(self.playlists, key=score, reverse=True)
+        by_hour = profile.sessions_by_hour or [0] * 24
+        peak_hour = max(range(24), key=lambda h: by_hour[h])
+        return {
+            "recommended": [self.playlists[slug] for slug in ranked[:count]],
+            "reason": (
+                f"Based on your {sessions} focus sessions "
+                f"(about {round(avg_session_minutes)} min each, most often around {peak_hour}:00 UTC)"
+            ),
+            "based_on": "history"
+        }
+
+class MusicCatalog:
+    """Holds the current CatalogSnapshot and reloads it when the catalog tables change"""
+
+    def __init__(self, reload_seconds: float = MUSIC_CATALOG_RELOAD_SECONDS):
+        self.reload_seconds = reload_seconds
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> CatalogSnapshot:
+        """Seed the catalog if empty and (re)build the in-memory snapshot"""
+        with self._lock:
+            return self._load(db)
+
+    def _load(self, db: Session) -> CatalogSnapshot:
+        seed_default_catalog(db)
+        version = self._version(db)
+        playlists = db.query(MusicPlaylist).options(
+            selectinload(MusicPlaylist.tracks)
+        ).order_by(MusicPlaylist.position, MusicPlaylist.id).all()
+        self._snapshot = CatalogSnapshot(playlists, version)
+        self._checked_at = time.monotonic()
+        return self._snapshot
+
+    def snapshot(self, db: Session) -> CatalogSnapshot:
+        """The current snapshot, loaded on first use and refreshed if the catalog changed"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                return self._snapshot or self._load(db)
+        if self.reload_seconds > 0 and time.monotonic() - self._checked_at >= self.reload_seconds:
+            # One request pays for the version check; the rest keep serving the old snapshot
+            if self._lock.acquire(blocking=False):
+                try:
+                    self._checked_at = time.monotonic()
+                    changed = self._version(db) != snapshot.version
+                finally:
+                    self._lock.release()
+                if changed:
+                    return self.load(db)
+        return snapshot
+
+    @staticmethod
+    def _version(db: Session) -> Tuple:
+        """Row counts and last-modified times of both tables, in one statement"""
+        return tuple(db.execute(select(
+            select(func.count(MusicPlaylist.id)).scalar_subquery(),
+            select(func.max(MusicPlaylist.updated_at)).scalar_subquery(),
+            select(func.count(MusicTrack.id)).scalar_subquery(),
+            select(func.max(MusicTrack.updated_at)).scalar_subquery()
+        )).one())
+
+music_catalog = MusicCatalog()
+
+def warm_music_catalog():
+    """Load the catalog ahead of the first music request (run at startup)"""
+    db = SessionLocal()
+    try:
+        music_catalog.snapshot(db)
+    except Exception:
+        logger.warning("Music catalog warm-up failed; it will load on first use", exc_info=True)
+    finally:
+        db.close()
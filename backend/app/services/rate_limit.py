@@ -0,0 +1,309 @@
+"""
+Sliding-window rate limiting per user (or client IP) and bucket
+
+Each bucket counts cost units per identity over a window using the
+sliding-window-counter approximation: the previous window's count weighted
+by how much of it still overlaps, plus the current window's count. A
+counter is three numbers per identity and bucket, whatever the request rate.
+
+Counters live in the store selected by RATE_LIMIT_STORAGE_URL (defaulting
+to CACHE_URL): per-process memory, a SQLite file shared by the workers on
+one host, or Redis.
+"""
+import math
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.services.cache import CACHE_URL, ThreadLocalSQLite, redis_client
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_STORAGE_URL = os.getenv("RATE_LIMIT_STORAGE_URL", CACHE_URL)
+RATE_LIMIT_REQUESTS_PER_MINUTE = int(os.getenv("RATE_LIMIT_REQUESTS_PER_MINUTE", "600"))
+RATE_LIMIT_YOUTUBE_UNITS_PER_HOUR = int(os.getenv("RATE_LIMIT_YOUTUBE_UNITS_PER_HOUR", "3000"))
+RATE_LIMIT_LOGINS_PER_MINUTE = int(os.getenv("RATE_LIMIT_LOGINS_PER_MINUTE", "10"))
+# Extra or overriding cost rules, e.g. "GET /api/goals/=requests:2,GET /api/boost/search=youtube:50"
+RATE_LIMIT_COSTS = os.getenv("RATE_LIMIT_COSTS", "")
+
+class Bucket(NamedTuple):
+    name: str
+    limit: int
+    window_seconds: int
+
+class CostRule(NamedTuple):
+    method: str
+    path_prefix: str
+    costs: Dict[str, int]  # Bucket name -> units charged
+
+class BucketResult(NamedTuple):
+    bucket: Bucket
+    allowed: bool
+    remaining: int
+    reset_seconds: int  # Until the current window ends
+    retry_after: int  # Until a rejected request of this cost would fit
+
+DEFAULT_BUCKETS = (
+    Bucket("requests", RATE_LIMIT_REQUESTS_PER_MINUTE, 60),
+    # YouTube Data API quota units: a search costs 100, a video lookup 1
+    Bucket("youtube", RATE_LIMIT_YOUTUBE_UNITS_PER_HOUR, 3600),
+    Bucket("login", RATE_LIMIT_LOGINS_PER_MINUTE, 60),
+)
+
+# First matching rule wins; unmatched requests cost one "requests" unit
+DEFAULT_RULES = (
+    CostRule("GET", "/api/boost/search", {"requests": 1, "youtube": 100}),
+    CostRule("GET", "/api/boost/goal/", {"requests": 1, "youtube": 100}),
+    CostRule("GET", "/api/boost/recommendations", {"requests": 1, "youtube": 300}),
+    CostRule("GET", "/api/boost/trending", {"requests": 1, "youtube": 300}),
+    CostRule("GET", "/api/boost/video/", {"requests": 1, "youtube": 1}),
+    CostRule("POST", "/api/users/login", {"requests": 5, "login": 1}),
+    CostRule("POST", "/api/import/", {"requests": 50}),
+)
+DEFAULT_COSTS = {"requests": 1}
+
+def parse_cost_rules(spec: str) -> List[CostRule]:
+    """Parse RATE_LIMIT_COSTS: comma-separated "METHOD /path-prefix=bucket:cost[;bucket:cost]" rules"""
+    rules = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        target, _, costs = item.partition("=")
+        method, _, prefix = target.strip().partition(" ")
+        rules.append(CostRule(method.upper(), prefix.strip(), {
+            bucket.strip(): int(cost)
+            for bucket, _, cost in (pair.partition(":") for pair in costs.split(";"))
+        }))
+    return rules
+
+def sliding_window(previous: float, current: float, elapsed: float, window: float,
+                   cost: float, limit: float) -> Tuple[bool, float, float]:
+    """
+    Decide one request against a sliding window counter
+
+    elapsed is the time into the current window. Returns (allowed, units
+    used including this request if allowed, seconds until it would fit).
+    """
+    used = previous * (1 - elapsed / window) + current
+    if used + cost <= limit:
+        return True, used + cost, 0.0
+    if cost > limit:
+        # Never fits: reject for a full window rather than computing a wait
+        return False, used, float(window)
+    excess = used + cost - limit
+    decaying = previous * (1 - elapsed / window)
+    if excess <= decaying:
+        # The previous window's share decays linearly over the rest of this window
+        wait = excess * window / previous
+    else:
+        # Wait for the next window, where this window's count starts decaying
+        wait = window - elapsed
+        if current + cost > limit and current > 0:
+            wait += (current + cost - limit) * window / current
+    return False, used, wait
+
+class MemoryRateLimitStore:
+    """Counters in a dict of key -> [window index, previous count, current count]"""
+
+    shared = False
+    PURGE_EVERY = 10000
+
+    def __init__(self):
+        self._counters: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._operations = 0
+
+    def acquire(self, key: str, cost: int, limit: int, window: int, now: float) -> Tuple[bool, float, float]:
+        index, elapsed = divmod(now, window)
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None or counter[0] < index - 1:
+                counter = [index, 0, 0]
+            elif counter[0] == index - 1:
+                counter = [index, counter[2], 0]
+            allowed, used, wait = sliding_window(counter[1], counter[2], elapsed, window, cost, limit)
+            if allowed:
+                counter[2] += cost
+            self._counters[key] = counter
+            self._operations += 1
+            if self._operations % self.PURGE_EVERY == 0:
+                self._purge(now)
+        return allowed, used, wait
+
+    def release(self, key: str, cost: int, window: int, now: float):
+        """Give back units acquired in the current window (a later bucket rejected the request)"""
+        index = now // window
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is not None and counter[0] == index:
+                counter[2] = max(0, counter[2] - cost)
+
+    def _purge(self, now: float):
+        # Keys embed their window length as the last ":"-separated part
+        stale = [
+            key for key, (index, _, _) in self._counters.items()
+            if index < now // int(key.rsplit(":", 1)[1]) - 1
+        ]
+        for key in stale:
+            del self._counters[key]
+
+class SQLiteRateLimitStore:
+    """Counters in a SQLite file shared by the workers on one host"""
+
+    shared = True
+
+    def __init__(self, path: str):
+        self._db = ThreadLocalSQLite(
+            path,
+            "CREATE TABLE IF NOT EXISTS rate_limits "
+            "(key TEXT PRIMARY KEY, window_index INTEGER NOT NULL, previous REAL NOT NULL, current REAL NOT NULL)"
+        )
+
+    def acquire(self, key: str, cost: int, limit: int, window: int, now: float) -> Tuple[bool, float, float]:
+        index, elapsed = divmod(now, window)
+        index = int(index)
+        connection = self._db.connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT window_index, previous, current FROM rate_limits WHERE key = ?", (key,)
+            ).fetchone()
+            previous, current = 0, 0
+            if row and row[0] == index:
+                previous, current = row[1], row[2]
+            elif row and row[0] == index - 1:
+                previous = row[2]
+            allowed, used, wait = sliding_window(previous, current, elapsed, window, cost, limit)
+            connection.execute(
+                "INSERT OR REPLACE INTO rate_limits (key, window_index, previous, current) VALUES (?, ?, ?, ?)",
+                (key, index, previous, current + (cost if allowed else 0))
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return allowed, used, wait
+
+    def release(self, key: str, cost: int, window: int, now: float):
+        self._db.connection().execute(
+            "UPDATE rate_limits SET current = MAX(current - ?, 0) WHERE key = ? AND window_index = ?",
+            (cost, key, int(now // window))
+        )
+
+# Atomic sliding-window check-and-increment over per-window counter keys
+REDIS_ACQUIRE_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local cost, limit, weight, ttl = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local used = previous * weight + current
+if used + cost > limit then
+    return {0, tostring(previous), tostring(current)}
+end
+redis.call('INCRBY', KEYS[1], cost)
+redis.call('EXPIRE', KEYS[1], ttl)
+return {1, tostring(previous), tostring(current)}
+"""
+
+# Give back units of the current window's counter, if it still exists
+REDIS_RELEASE_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+if current > 0 then
+    redis.call('SET', KEYS[1], math.max(current - tonumber(ARGV[1]), 0), 'KEEPTTL')
+end
+return 0
+"""
+
+class RedisRateLimitStore:
+    """Counters in Redis, one key per identity, bucket and window"""
+
+    shared = True
+
+    def __init__(self, url: str):
+        self._client = redis_client(url)
+        self._acquire = self._client.register_script(REDIS_ACQUIRE_SCRIPT)
+        self._release = self._client.register_script(REDIS_RELEASE_SCRIPT)
+
+    def acquire(self, key: str, cost: int, limit: int, window: int, now: float) -> Tuple[bool, float, float]:
+        index, elapsed = divmod(now, window)
+        index = int(index)
+        _, previous, current = self._acquire(
+            keys=[f"{key}:{index}", f"{key}:{index - 1}"],
+            args=[cost, limit, 1 - elapsed / window, window * 2]
+        )
+        # Recompute the decision locally for the used/wait figures
+        return sliding_window(float(previous), float(current), elapsed, window, cost, limit)
+
+    def release(self, key: str, cost: int, window: int, now: float):
+        self._release(keys=[f"{key}:{int(now // window)}"], args=[cost])
+
+def store_from_url(url: str):
+    """Create a rate limit store from a RATE_LIMIT_STORAGE_URL value"""
+    if url.startswith("sqlite:///"):
+        return SQLiteRateLimitStore(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisRateLimitStore(url)
+    if url in ("", "memory://"):
+        return MemoryRateLimitStore()
+    raise ValueError(f"Unsupported RATE_LIMIT_STORAGE_URL: {url}")
+
+class RateLimiter:
+    """Charges each request's cost to every bucket it uses for the caller's identity"""
+
+    def __init__(
+        self,
+        buckets: Sequence[Bucket] = DEFAULT_BUCKETS,
+        rules: Sequence[CostRule] = DEFAULT_RULES,
+        store=None,
+        storage_url: str = RATE_LIMIT_STORAGE_URL
+    ):
+        self.buckets = {bucket.name: bucket for bucket in buckets}
+        self.rules = list(rules)
+        self._store = store
+        self._storage_url = storage_url
+        self._store_lock = threading.Lock()
+
+    @property
+    def store(self):
+        # Created on first use so importing never connects to a shared store
+        if self._store is None:
+            with self._store_lock:
+                if self._store is None:
+                    self._store = store_from_url(self._storage_url)
+        return self._store
+
+    def costs(self, method: str, path: str) -> Dict[str, int]:
+        for rule in self.rules:
+            if rule.method == method and path.startswith(rule.path_prefix):
+                return rule.costs
+        return DEFAULT_COSTS
+
+    def check(self, identity: str, method: str, path: str, now: Optional[float] = None) -> List[BucketResult]:
+        """
+        Charge a request; stops at the first bucket that rejects it, and
+        then gives back what the earlier buckets were charged
+        """
+        now = time.time() if now is None else now
+        results = []
+        charged = []
+        for name, cost in self.costs(method, path).items():
+            bucket = self.buckets.get(name)
+            if bucket is None or cost <= 0:
+                continue
+            key = f"ratelimit:{identity}:{bucket.name}:{bucket.window_seconds}"
+            allowed, used, wait = self.store.acquire(key, cost, bucket.limit, bucket.window_seconds, now)
+            results.append(BucketResult(
+                bucket=bucket,
+                allowed=allowed,
+                remaining=max(0, int(bucket.limit - used)),
+                reset_seconds=math.ceil(bucket.window_seconds - now % bucket.window_seconds),
+                retry_after=math.ceil(wait)
+            ))
+            if not allowed:
+                for index, (charged_key, charged_cost) in enumerate(charged):
+                    self.store.release(charged_key, charged_cost, results[index].bucket.window_seconds, now)
+                    results[index] = results[index]._replace(
+                        remaining=min(results[index].bucket.limit, results[index].remaining + charged_cost)
+                    )
+                break
+            charged.append((key, cost))
+        return results
+
+rate_limiter = RateLimiter(rules=parse_cost_rules(RATE_LIMIT_COSTS) + list(DEFAULT_RULES))
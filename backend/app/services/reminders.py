@@ -0,0 +1,399 @@
+"""
+Due-date reminders for todos (due_date) and goals (target_date)
+
+A reminder fires REMINDER_LEAD_MINUTES before the deadline. Each worker
+keeps only the next REMINDER_HORIZON_MINUTES of reminders in memory, in a
+min-heap keyed on the time they fire, and sleeps until the earliest one:
+- Every REMINDER_REFRESH_SECONDS it reloads the horizon with a range scan
+  over the partial indexes on open todos' due_date and open goals'
+  target_date, so the cost is the reminders in the window however many
+  deadlines lie beyond it. This picks up other processes' writes and imports.
+- The worker that creates, reschedules, completes or deletes a todo or goal
+  updates its heap at once. Superseded heap entries are skipped when they
+  come up (lazy deletion), and at dispatch the due batch is re-read in one
+  IN query, so a deadline changed elsewhere never fires a stale reminder.
+- Due reminders are claimed in batches of REMINDER_BATCH_SIZE with one
+  INSERT ... ON CONFLICT DO NOTHING into reminders (unique on kind, target
+  and deadline): however many workers hold the same entry, only one inserts
+  it, and only inserted rows go to the sink.
+- The sink (REMINDER_SINK) is "outbox", which leaves them in the reminders
+  table for GET /api/reminders, or "webhook", which POSTs each batch to
+  REMINDER_WEBHOOK_URL; batches it fails to take are retried every refresh.
+Set REMINDERS_ENABLED=false to run the scheduler in its own process
+instead (python -m app.cli.send_reminders). Deadlines are naive UTC.
+"""
+import asyncio
+import heapq
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db.database import SessionLocal
+from app.models.goal import Goal
+from app.models.reminder import Reminder
+from app.models.todo import Todo
+from app.utils.circuit_breaker import CircuitBreaker, is_upstream_failure
+from app.utils.metrics import REMINDERS_DISPATCHED, REMINDERS_SCHEDULED
+
+logger = logging.getLogger(__name__)
+
+REMINDERS_ENABLED = os.getenv("REMINDERS_ENABLED", "true").lower() in ("1", "true", "yes")
+REMINDER_LEAD_MINUTES = int(os.getenv("REMINDER_LEAD_MINUTES", "60"))
+REMINDER_HORIZON_MINUTES = int(os.getenv("REMINDER_HORIZON_MINUTES", "15"))
+REMINDER_REFRESH_SECONDS = float(os.getenv("REMINDER_REFRESH_SECONDS", "60"))
+# Reminders missed while no scheduler was running still go out this late
+REMINDER_GRACE_MINUTES = int(os.getenv("REMINDER_GRACE_MINUTES", "60"))
+REMINDER_BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", "500"))
+REMINDER_SINK = os.getenv("REMINDER_SINK", "outbox")
+REMINDER_WEBHOOK_URL = os.getenv("REMINDER_WEBHOOK_URL", "")
+REMINDER_WEBHOOK_TIMEOUT = float(os.getenv("REMINDER_WEBHOOK_TIMEOUT", "10"))
+
+# kind -> (model, deadline column, "still open" clause, which the partial
+# indexes ix_todos_open_due_date and ix_goals_open_target_date match)
+TARGETS = {
+    "todo": (Todo, Todo.due_date, Todo.is_completed == False),  # noqa: E712
+    "goal": (Goal, Goal.target_date, Goal.is_achieved == False),  # noqa: E712
+}
+LOAD_CHUNK_SIZE = 10000
+
+Key = Tuple[str, int]
+
+class OutboxSink:
+    """Leave reminders in the reminders table, where clients read them"""
+
+    name = "outbox"
+
+    def deliver(self, reminders: List[Dict]) -> bool:
+        return True
+
+class WebhookSink:
+    """POST each batch as JSON to a URL, through a circuit breaker"""
+
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = REMINDER_WEBHOOK_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+        self.breaker = CircuitBreaker("reminder_webhook")
+        self._session = None
+
+    def deliver(self, reminders: List[Dict]) -> bool:
+        if not self.breaker.allow_request():
+            return False
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        payload = [
+            {**reminder, **{field: reminder[field].isoformat() for field in ("due_at", "remind_at")}}
+            for reminder in reminders
+        ]
+        try:
+            response = self._session.post(self.url, json={"reminders": payload}, timeout=self.timeout)
+            delivered = response.status_code < 300
+            failed = is_upstream_failure(status_code=response.status_code)
+        except Exception as e:
+            logger.warning("Reminder webhook failed: %s", e)
+            delivered = False
+            failed = is_upstream_failure(e)
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return delivered
+
+def get_reminder_sink(name: str = REMINDER_SINK):
+    if name == "outbox":
+        return OutboxSink()
+    if name == "webhook":
+        if not REMINDER_WEBHOOK_URL:
+            raise ValueError("REMINDER_SINK=webhook needs REMINDER_WEBHOOK_URL")
+        return WebhookSink(REMINDER_WEBHOOK_URL)
+    raise ValueError(f"Unknown reminder sink: {name}")
+
+def _dialect_insert(db: Session):
+    return postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+
+class ReminderScheduler:
+    """Min-heap of the reminders firing within the horizon, dispatched in batches"""
+
+    def __init__(
+        self,
+        sink=None,
+        lead_minutes: int = REMINDER_LEAD_MINUTES,
+        horizon_minutes: int = REMINDER_HORIZON_MINUTES,
+        refresh_seconds: float = REMINDER_REFRESH_SECONDS,
+        grace_minutes: int = REMINDER_GRACE_MINUTES,
+        batch_size: int = REMINDER_BATCH_SIZE,
+    ):
+        self._sink = sink
+        self.lead = timedelta(minutes=lead_minutes)
+        self.horizon = timedelta(minutes=horizon_minutes)
+        self.refresh_seconds = refresh_seconds
+        self.grace = timedelta(minutes=grace_minutes)
+        self.batch_size = batch_size
+        self._heap: List[Tuple[datetime, str, int]] = []
+        # The live remind_at of every scheduled target; heap entries that
+        # disagree with it were superseded
+        self.pending: Dict[Key, datetime] = {}
+        # Claimed (by any worker) since the last refresh began, so the
+        # next range scan does not queue them again
+        self._fired: Dict[Key, datetime] = {}
+        self.loaded_until: Optional[datetime] = None  # None until the first load
+        self._scanned_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def sink(self):
+        if self._sink is None:
+            self._sink = get_reminder_sink()
+        return self._sink
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def _push(self, key: Key, remind_at: datetime) -> bool:
+        """Queue key at remind_at (caller holds the lock); False if already queued or fired"""
+        if self.pending.get(key) == remind_at or self._fired.get(key) == remind_at:
+            return False
+        self.pending[key] = remind_at
+        heapq.heappush(self._heap, (remind_at, key[0], key[1]))
+        return True
+
+    def schedule(self, kind: str, target_id: int, deadline: Optional[datetime]):
+        """
+        (Re)schedule a todo's or goal's reminder after its deadline or status
+        changed; deadline None (no date, completed, deleted) cancels it
+
+        Reminders beyond the loaded horizon are left to the range scan that
+        reaches them.
+        """
+        key = (kind, target_id)
+        with self._lock:
+            if self.loaded_until is None:
+                return
+            remind_at = deadline - self.lead if deadline is not None else None
+            if remind_at is None or remind_at >= self.loaded_until or remind_at < self._scanned_at - self.grace:
+                self.pending.pop(key, None)
+                REMINDERS_SCHEDULED.set(len(self.pending))
+                return
+            first = not self._heap or remind_at < self._heap[0][0]
+            self._push(key, remind_at)
+            REMINDERS_SCHEDULED.set(len(self.pending))
+        if first:
+            self._wake()
+
+    def unschedule(self, kind: str, target_id: int):
+        self.schedule(kind, target_id, None)
+
+    def _wake(self):
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def load(self, db: Session, now: Optional[datetime] = None) -> int:
+        """
+        Range-scan the deadlines firing between the previous scan (or the
+        grace period, on the first) and now + horizon into the heap;
+        returns how many were queued
+        """
+        now = now or datetime.utcnow()
+        start = self._scanned_at if self._scanned_at is not None else now - self.grace
+        end = now + self.horizon
+        queued = 0
+        for kind, (model, deadline, is_open) in TARGETS.items():
+            rows = db.query(model.id, deadline).filter(
+                is_open,
+                deadline >= start + self.lead,
+                deadline < end + self.lead
+            ).execution_options(yield_per=LOAD_CHUNK_SIZE)
+            for target_id, due in rows:
+                with self._lock:
+                    queued += self._push((kind, target_id), due - self.lead)
+        with self._lock:
+            self._fired = {key: remind_at for key, remind_at in self._fired.items() if remind_at >= start}
+            self._scanned_at = now
+            self.loaded_until = end
+            REMINDERS_SCHEDULED.set(len(self.pending))
+        return queued
+
+    def next_due(self) -> Optional[datetime]:
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def _pop_due(self, now: datetime) -> List[Tuple[datetime, str, int]]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and len(due) < self.batch_size:
+                remind_at, kind, target_id = heapq.heappop(self._heap)
+                key = (kind, target_id)
+                if self.pending.get(key) != remind_at:
+                    continue
+                del self.pending[key]
+                self._fired[key] = remind_at
+                due.append((remind_at, kind, target_id))
+            REMINDERS_SCHEDULED.set(len(self.pending))
+        return due
+
+    def _requeue(self, due: List[Tuple[datetime, str, int]]):
+        """Put a batch whose claim failed back on the heap, unless rescheduled meanwhile"""
+        with self._lock:
+            for remind_at, kind, target_id in due:
+                key = (kind, target_id)
+                if self._fired.get(key) == remind_at:
+                    del self._fired[key]
+                if key not in self.pending:
+                    self._push(key, remind_at)
+            REMINDERS_SCHEDULED.set(len(self.pending))
+
+    def dispatch_due(self, db: Session, now: Optional[datetime] = None) -> int:
+        """
+        Claim and deliver up to one batch of due reminders; returns how many
+        were popped from the heap (a full batch means more may be due)
+        """
+        due = self._pop_due(now or datetime.utcnow())
+        if not due:
+            return 0
+        try:
+            claimed = self._claim(db, due)
+        except Exception:
+            # Nothing was claimed: the batch stays due for the next dispatch
+            db.rollback()
+            self._requeue(due)
+            raise
+        self._deliver(db, claimed)
+        return len(due)
+
+    def _claim(self, db: Session, due: List[Tuple[datetime, str, int]]) -> List[Dict]:
+        """Insert the batch's reminders that are still due; returns the rows this worker claimed"""
+        # Re-read the batch: skip targets since completed, deleted or
+        # rescheduled by another process
+        rows = []
+        for kind, (model, deadline, is_open) in TARGETS.items():
+            expected = {target_id: remind_at + self.lead for remind_at, k, target_id in due if k == kind}
+            if not expected:
+                continue
+            for target_id, user_id, title, deadline_value in db.query(model.id, model.user_id, model.title, deadline).filter(
+                model.id.in_(expected), is_open
+            ):
+                if deadline_value == expected[target_id]:
+                    rows.append({
+                        "user_id": user_id,
+                        "kind": kind,
+                        "target_id": target_id,
+                        "title": title,
+                        "due_at": deadline_value,
+                        "remind_at": deadline_value - self.lead,
+                        "created_at": datetime.utcnow(),
+                    })
+        if not rows:
+            return []
+        # Executemany, which SQLAlchemy sends as one multi-row INSERT from a cached statement
+        statement = _dialect_insert(db)(Reminder).on_conflict_do_nothing(
+            index_elements=[Reminder.kind, Reminder.target_id, Reminder.due_at]
+        ).returning(
+            Reminder.id, Reminder.user_id, Reminder.kind, Reminder.target_id,
+            Reminder.title, Reminder.due_at, Reminder.remind_at
+        )
+        claimed = [dict(row._mapping) for row in db.execute(statement, rows)]
+        db.commit()
+        return claimed
+
+    def _deliver(self, db: Session, reminders: List[Dict]) -> bool:
+        if not reminders:
+            return True
+        if not self.sink.deliver(reminders):
+            return False
+        db.execute(update(Reminder).where(Reminder.id.in_([reminder["id"] for reminder in reminders])).values(
+            delivered_at=datetime.utcnow()
+        ))
+        db.commit()
+        REMINDERS_DISPATCHED.inc(self.sink.name, amount=len(reminders))
+        return True
+
+    def redeliver(self, db: Session, now: Optional[datetime] = None) -> int:
+        """Retry the batches the sink failed to take; returns how many went out"""
+        # Leave rows another worker claimed moments ago to that worker
+        cutoff = (now or datetime.utcnow()) - timedelta(seconds=self.refresh_seconds)
+        delivered = 0
+        while True:
+            reminders = [dict(row._mapping) for row in db.query(
+                Reminder.id, Reminder.user_id, Reminder.kind, Reminder.target_id,
+                Reminder.title, Reminder.due_at, Reminder.remind_at
+            ).filter(Reminder.delivered_at.is_(None), Reminder.created_at < cutoff).order_by(Reminder.id).limit(self.batch_size)]
+            if not reminders or not self._deliver(db, reminders):
+                return delivered
+            delivered += len(reminders)
+            if len(reminders) < self.batch_size:
+                return delivered
+
+    def refresh(self):
+        db = SessionLocal()
+        try:
+            self.load(db)
+            self.redeliver(db)
+        finally:
+            db.close()
+
+    def dispatch(self) -> int:
+        db = SessionLocal()
+        try:
+            return self.dispatch_due(db)
+        finally:
+            db.close()
+
+    async def run(self):
+        """Refresh and dispatch until cancelled; database work runs in the executor"""
+        loop = asyncio.get_running_loop()
+        self._loop, self._wakeup = loop, asyncio.Event()
+        next_refresh = 0.0
+        while True:
+            try:
+                if time.monotonic() >= next_refresh:
+                    await loop.run_in_executor(None, self.refresh)
+                    next_refresh = time.monotonic() + self.refresh_seconds
+                if await loop.run_in_executor(None, self.dispatch) >= self.batch_size:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Reminder dispatch failed")
+                next_refresh = time.monotonic() + self.refresh_seconds
+            delay = next_refresh - time.monotonic()
+            next_due = self.next_due()
+            if next_due is not None:
+                delay = min(delay, (next_due - datetime.utcnow()).total_seconds())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, delay))
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+reminder_scheduler = ReminderScheduler()
+
+def schedule_todo(todo: Todo):
+    reminder_scheduler.schedule("todo", todo.id, None if todo.is_completed else todo.due_date)
+
+def schedule_goal(goal: Goal):
+    reminder_scheduler.schedule("goal", goal.id, None if goal.is_achieved else goal.target_date)
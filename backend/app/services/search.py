@@ -0,0 +1,156 @@
+"""
+Ranked full-text search over a user's todos, goals and activities
+
+Uses the index from app.db.search_index: tsvector/GIN with ts_rank_cd and
+ts_headline on PostgreSQL, FTS5 with highlight() and a BM25-style score on
+SQLite.
+Every term must match (stemmed), and the last one also matches as a prefix
+so results follow the user's typing (on SQLite only while it is no longer
+than the longest indexed prefix, 6 characters). Highlights come back as HTML-escaped
+text with matches wrapped in <mark>.
+"""
+import html
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.search_index import (
+    SEARCH_KIND_COUNT,
+    SEARCH_PREFIX_LENGTHS,
+    SEARCH_TABLES,
+    SEARCH_USER_STRIDE,
+    TEXT_SEARCH_CONFIG,
+)
+
+SEARCH_MAX_TERMS = 8
+SNIPPET_WORDS = 16
+# Matches ranked per query: the newest ones, so a word that occurs in
+# thousands of a user's items costs no more than a rarer one
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "200"))
+
+# SQLite ranking: BM25 parameters and field weights
+BM25_K1, BM25_B = 1.2, 0.75
+TITLE_WEIGHT, DESCRIPTION_WEIGHT = 2.5, 1.0
+
+# Private-use characters mark matches inside the database's output; they
+# become <mark> tags after the text is escaped
+MATCH_START, MATCH_END = "\ue000", "\ue001"
+
+def search_terms(q: str) -> List[str]:
+    """Lowercased word tokens of a query, at most SEARCH_MAX_TERMS"""
+    return re.findall(r"\w+", q.lower())[:SEARCH_MAX_TERMS]
+
+def mark_matches(value: str) -> str:
+    return html.escape(value or "").replace(MATCH_START, "<mark>").replace(MATCH_END, "</mark>")
+
+def search(db: Session, user_id: int, q: str, kinds: Optional[Iterable[str]] = None, limit: int = 20) -> List[Dict]:
+    """Best matches for q among the user's items of the given kinds (default all), best first"""
+    terms = search_terms(q)
+    kinds = [kind for kind in SEARCH_TABLES if kinds is None or kind in kinds]
+    if not terms or not kinds:
+        return []
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        rows = _search_postgresql(db, user_id, terms, kinds, limit)
+    elif dialect == "sqlite":
+        rows = _search_sqlite(db, user_id, terms, kinds, limit)
+    else:
+        raise NotImplementedError(f"Full-text search is not available on {dialect}")
+    return [
+        {
+            "type": kind,
+            "id": item_id,
+            "title_highlight": mark_matches(title),
+            "snippet": mark_matches(snippet),
+            "rank": round(float(rank), 6),
+        }
+        for kind, item_id, title, snippet, rank in rows
+    ]
+
+def _search_postgresql(db: Session, user_id: int, terms: List[str], kinds: List[str], limit: int):
+    tsquery = " & ".join(terms[:-1] + [terms[-1] + ":*"])
+    candidates = " UNION ALL ".join(
+        f"(SELECT '{kind}' AS kind, id, title, description, search_vector FROM {SEARCH_TABLES[kind][0]}, q "
+        f"WHERE user_id = :user_id AND search_vector @@ query ORDER BY id DESC LIMIT :candidates)"
+        for kind in kinds
+    )
+    # Ranks only the newest candidates, and generates headlines only for the rows returned
+    statement = text(
+        f"WITH q AS (SELECT to_tsquery('{TEXT_SEARCH_CONFIG}', :tsquery) AS query), "
+        f"candidates AS ({candidates}), "
+        f"hits AS (SELECT kind, id, title, description, ts_rank_cd(search_vector, query, 32) AS rank "
+        f"FROM candidates, q ORDER BY rank DESC, id DESC LIMIT :limit) "
+        f"SELECT kind, id, "
+        f"ts_headline('{TEXT_SEARCH_CONFIG}', title, query, :title_options), "
+        f"ts_headline('{TEXT_SEARCH_CONFIG}', coalesce(description, ''), query, :snippet_options), "
+        f"rank FROM hits, q ORDER BY rank DESC, id DESC"
+    )
+    selectors = f'StartSel="{MATCH_START}", StopSel="{MATCH_END}"'
+    return db.execute(statement, {
+        "tsquery": tsquery,
+        "user_id": user_id,
+        "candidates": SEARCH_MAX_CANDIDATES,
+        "limit": limit,
+        "title_options": f"{selectors}, HighlightAll=true",
+        "snippet_options": f"{selectors}, MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}",
+    }).all()
+
+def _field_score(hits: int, relative_length: float) -> float:
+    """BM25 term-frequency saturation with length normalization"""
+    return hits * (BM25_K1 + 1) / (hits + BM25_K1 * (1 - BM25_B + BM25_B * relative_length))
+
+def _snippet(highlighted: str) -> str:
+    """About SNIPPET_WORDS words of highlighted text around its first match"""
+    words = highlighted.split()
+    first = next((i for i, word in enumerate(words) if MATCH_START in word), 0)
+    start = max(0, min(first - SNIPPET_WORDS // 4, len(words) - SNIPPET_WORDS))
+    end = start + SNIPPET_WORDS
+    return ("…" if start > 0 else "") + " ".join(words[start:end]) + ("…" if end < len(words) else "")
+
+def _search_sqlite(db: Session, user_id: int, terms: List[str], kinds: List[str], limit: int):
+    last = terms[-1]
+    if len(last) <= max(SEARCH_PREFIX_LENGTHS):
+        last = f'"{last}"*'
+    else:
+        # Long enough to be a whole word; a prefix longer than the prefix index
+        # merges the entries of every word it matches, for all users
+        last = f'"{last}"'
+    match = " AND ".join([f'"{term}"' for term in terms[:-1]] + [last])
+    codes = {SEARCH_TABLES[kind][1]: kind for kind in kinds}
+    kind_filter = ""
+    if len(codes) < len(SEARCH_TABLES):
+        kind_filter = f"AND rowid % {SEARCH_KIND_COUNT} IN ({', '.join(str(code) for code in codes)}) "
+    # FTS5's bm25() computes each term's IDF by reading its doclist for every
+    # user, so ranking is done here from the matches highlight() marks
+    rows = db.execute(text(
+        "SELECT rowid, highlight(search_index, 0, :start, :end), highlight(search_index, 1, :start, :end) "
+        "FROM search_index WHERE search_index MATCH :match AND rowid BETWEEN :first AND :last "
+        f"{kind_filter}ORDER BY rowid DESC LIMIT :candidates"
+    ), {
+        "start": MATCH_START,
+        "end": MATCH_END,
+        "match": match,
+        "first": user_id * SEARCH_USER_STRIDE,
+        "last": (user_id + 1) * SEARCH_USER_STRIDE - 1,
+        "candidates": SEARCH_MAX_CANDIDATES,
+    }).all()
+    if not rows:
+        return []
+    lengths = [(len(title.split()), len(description.split())) for _, title, description in rows]
+    average_title = max(1.0, sum(title for title, _ in lengths) / len(lengths))
+    average_description = max(1.0, sum(description for _, description in lengths) / len(lengths))
+    scored = sorted(
+        (
+            TITLE_WEIGHT * _field_score(title.count(MATCH_START), title_length / average_title)
+            + DESCRIPTION_WEIGHT * _field_score(description.count(MATCH_START), description_length / average_description),
+            rowid, title, description
+        )
+        for (rowid, title, description), (title_length, description_length) in zip(rows, lengths)
+    )
+    return [
+        (codes[rowid % SEARCH_KIND_COUNT], rowid % SEARCH_USER_STRIDE // SEARCH_KIND_COUNT, title, _snippet(description), score)
+        for score, rowid, title, description in reversed(scored[-limit:])
+    ]
@@ -0,0 +1,116 @@
+"""
+Login sessions: short-lived access tokens renewed with rotating refresh tokens
+
+A login verifies the password with bcrypt once and starts a session. The
+client then renews its access token with the refresh token, which costs one
+indexed lookup of the token's SHA-256 digest. Refresh tokens are 256 random
+bits, so a fast hash is as safe as bcrypt for them. Each renewal revokes
+the presented refresh token and issues a new one. Presenting an already
+rotated token means it leaked, so the whole session is revoked.
+"""
+import hashlib
+import os
+import secrets
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import RefreshToken, RevokedSession, User
+from app.utils.auth import ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token, revoked_sessions
+
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def issue_tokens(db: Session, user_id: int, email: str, session_id: Optional[str] = None) -> Dict:
+    """Create an access token and a refresh token for a new (or the given) session and commit"""
+    session_id = session_id or secrets.token_hex(16)
+    refresh_token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        user_id=user_id,
+        token_hash=hash_refresh_token(refresh_token),
+        session_id=session_id,
+        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+    db.commit()
+    access_token = create_access_token(
+        data={"sub": email, "sid": session_id},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+def start_session(db: Session, user: User) -> Dict:
+    """Tokens for a user who just logged in; also drops the user's expired refresh tokens"""
+    db.query(RefreshToken).filter(
+        RefreshToken.user_id == user.id,
+        RefreshToken.expires_at <= datetime.utcnow()
+    ).delete(synchronize_session=False)
+    return issue_tokens(db, user.id, user.email)
+
+def rotate_refresh_token(db: Session, refresh_token: str) -> Optional[Dict]:
+    """New tokens for a valid refresh token, which is revoked; None if it is invalid"""
+    row = db.query(
+        RefreshToken.id, RefreshToken.session_id, RefreshToken.expires_at, RefreshToken.revoked_at,
+        User.id, User.email, User.is_active
+    ).join(User, User.id == RefreshToken.user_id).filter(
+        RefreshToken.token_hash == hash_refresh_token(refresh_token)
+    ).first()
+    if row is None:
+        return None
+    token_id, session_id, expires_at, revoked_at, user_id, email, is_active = row
+    now = datetime.utcnow()
+    if revoked_at is not None:
+        revoke_session(db, session_id)
+        return None
+    if expires_at <= now or not is_active:
+        return None
+
+    # Conditional update so two concurrent renewals cannot both succeed
+    rotated = db.query(RefreshToken).filter(
+        RefreshToken.id == token_id,
+        RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: now}, synchronize_session=False)
+    if not rotated:
+        db.rollback()
+        revoke_session(db, session_id)
+        return None
+    return issue_tokens(db, user_id, email, session_id)
+
+def revoke_session(db: Session, session_id: str):
+    """Revoke every refresh token of a session and reject its unexpired access tokens"""
+    now = datetime.utcnow()
+    expires_at = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    db.query(RefreshToken).filter(
+        RefreshToken.session_id == session_id,
+        RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: now}, synchronize_session=False)
+    db.query(RevokedSession).filter(RevokedSession.expires_at <= now).delete(synchronize_session=False)
+    db.merge(RevokedSession(session_id=session_id, expires_at=expires_at))
+    db.commit()
+    revoked_sessions.add(session_id, expires_at)
+
+def revoke_user_sessions(db: Session, user_id: int):
+    """Revoke all of a user's sessions, e.g. after a password change"""
+    session_ids = [
+        session_id for (session_id,) in db.query(RefreshToken.session_id).filter(
+            RefreshToken.user_id == user_id,
+            RefreshToken.revoked_at.is_(None)
+        ).distinct()
+    ]
+    for session_id in session_ids:
+        revoke_session(db, session_id)
+
+def end_session(db: Session, refresh_token: str):
+    """Log out the session a refresh token belongs to; unknown tokens are ignored"""
+    session_id = db.query(RefreshToken.session_id).filter(
+        RefreshToken.token_hash == hash_refresh_token(refresh_token)
+    ).scalar()
+    if session_id is not None:
+        revoke_session(db, session_id)
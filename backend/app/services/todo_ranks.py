@@ -0,0 +1,112 @@
+"""
+Manual todo order, stored as fractional-index keys in Todo.rank
+
+Each user's todos are in one order, by (rank, id). Per-goal lists and the
+children of a subtask tree are slices of it. Dropping a todo between two
+others gives it a key between theirs (app.utils.fractional_index), so a
+move writes exactly one row. New todos get consecutive keys after the
+user's last. Repeated moves into the same gap lengthen keys.
+- A move that produces a key longer than RANK_MAX_LENGTH schedules
+  rebalance_ranks() in the background. It rewrites the user's keys to short,
+  evenly spaced ones, in the same order.
+- `python -m app.cli.rebalance_todo_ranks` does the same periodically.
+"""
+import os
+from itertools import islice
+from typing import List, Optional
+
+from sqlalchemy import func, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.db.database import SessionLocal
+from app.models.todo import Todo
+from app.utils.fractional_index import key_between, keys_after
+from app.utils.metrics import TODO_RANK_REBALANCES
+
+RANK_MAX_LENGTH = int(os.getenv("TODO_RANK_MAX_LENGTH", "16"))
+
+def next_ranks(db: Session, user_id: int, count: int = 1) -> List[str]:
+    """Ranks for count new todos, after all of the user's todos"""
+    last = db.query(func.max(Todo.rank)).filter(Todo.user_id == user_id).scalar()
+    return list(islice(keys_after(last), count))
+
+def _neighbour(db: Session, todo: Todo, anchor: Todo, after: bool) -> Optional[Todo]:
+    """The todo right after (or before) anchor in its user's order, skipping todo"""
+    position = tuple_(Todo.rank, Todo.id)
+    anchor_position = tuple_(anchor.rank, anchor.id)
+    return db.query(Todo).filter(
+        Todo.user_id == anchor.user_id,
+        Todo.id != todo.id,
+        position > anchor_position if after else position < anchor_position
+    ).order_by(*((Todo.rank, Todo.id) if after else (Todo.rank.desc(), Todo.id.desc()))).first()
+
+def place_todo(db: Session, todo: Todo, after: Optional[Todo], before: Optional[Todo]) -> bool:
+    """
+    Give todo a rank right after `after` and/or right before `before`
+
+    With one neighbour the other side is its current neighbour in the
+    user's order, so the todo lands next to it in any filtered list too.
+    Returns whether the new key is long enough to call for a rebalance.
+    Raises ValueError if after does not come before before; the caller
+    commits.
+    """
+    if after is not None and before is not None and (after.rank, after.id) >= (before.rank, before.id):
+        raise ValueError("after_id must come before before_id")
+    for attempt in range(2):
+        low = after if after is not None else before and _neighbour(db, todo, before, after=False)
+        high = before if before is not None else after and _neighbour(db, todo, after, after=True)
+        low_rank = low.rank if low is not None else None
+        high_rank = high.rank if high is not None else None
+        if low_rank is None or high_rank is None or low_rank < high_rank:
+            todo.rank = key_between(low_rank, high_rank)
+            return len(todo.rank) > RANK_MAX_LENGTH
+        # Neighbours sharing a key (e.g. rows inserted without one): spread
+        # the keys out, then place again
+        rebalance_ranks(db, todo.user_id)
+        for neighbour in (after, before):
+            if neighbour is not None:
+                db.refresh(neighbour, ["rank"])
+    raise ValueError("Could not find a rank between the neighbouring todos")
+
+def rebalance_ranks(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Rewrite a user's (or every user's) ranks as consecutive short keys in
+    the current order
+
+    Only rows whose key changes are written, keeping their updated_at.
+    Returns their number; the caller commits.
+    """
+    rows = db.query(Todo.user_id, Todo.id, Todo.rank, Todo.updated_at)
+    if user_id is not None:
+        rows = rows.filter(Todo.user_id == user_id)
+    fixes = []
+    users = set()
+    current_user, keys = None, None
+    for row_user_id, todo_id, rank, updated_at in rows.order_by(Todo.user_id, Todo.rank, Todo.id):
+        if row_user_id != current_user:
+            current_user, keys = row_user_id, keys_after(None)
+        key = next(keys)
+        if key != rank:
+            fixes.append({"id": todo_id, "rank": key, "updated_at": updated_at})
+            users.add(row_user_id)
+    if fixes:
+        db.execute(update(Todo), fixes)
+        TODO_RANK_REBALANCES.inc(amount=len(users))
+    return len(fixes)
+
+def rebalance_ranks_in_background(user_id: int):
+    """Background-task entry point: rebalance_ranks() for one user with its own session"""
+    db = SessionLocal()
+    try:
+        rebalance_ranks(db, user_id)
+        db.commit()
+    finally:
+        db.close()
+
+def users_with_long_ranks(db: Session, max_length: int = RANK_MAX_LENGTH) -> List[int]:
+    """Ids of the users with a rank key longer than max_length"""
+    return [
+        user_id for (user_id,) in db.query(Todo.user_id).filter(
+            func.length(Todo.rank) > max_length
+        ).distinct().order_by(Todo.user_id)
+    ]
@@ -0,0 +1,115 @@
+"""
+Subtask trees, stored as materialized paths
+
+A todo's path lists its ancestors' ids, so everything below a todo is the
+user's rows whose path starts with child_path(todo): one range scan of
+ix_todos_user_path at any depth, for reading a tree, counting its
+completion or moving it. Subtasks always belong to their root's goal, which
+keeps every todo of a tree in that goal's counters.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, literal
+from sqlalchemy.orm import Session
+
+from app.models.todo import Todo
+from app.services.goal_counters import record_subtree
+
+def child_path(todo: Todo) -> str:
+    """The path of a todo's children"""
+    return f"{todo.path}{todo.id}/"
+
+def descendants_clause(todo: Todo):
+    """Filter for every todo below this one, as an index range ("0" sorts right after "/")"""
+    prefix = child_path(todo)
+    return (Todo.user_id == todo.user_id) & (Todo.path >= prefix) & (Todo.path < prefix[:-1] + "0")
+
+def is_in_subtree(todo: Todo, other: Todo) -> bool:
+    """Whether other is todo itself or one of its subtasks"""
+    return other.id == todo.id or other.path.startswith(child_path(todo))
+
+def attach(todo: Todo, parent: Todo):
+    """Make a new todo a subtask of parent (and of parent's goal)"""
+    todo.parent_id = parent.id
+    todo.path = child_path(parent)
+    todo.goal_id = parent.goal_id
+
+def _descendant_counts(db: Session, todo: Todo) -> Tuple[int, int]:
+    total, completed = db.query(
+        func.count(Todo.id),
+        func.sum(case((Todo.is_completed == True, 1), else_=0))  # noqa: E712
+    ).filter(descendants_clause(todo)).one()
+    return total, int(completed or 0)
+
+def subtree_counts(db: Session, todo: Todo) -> Tuple[int, int]:
+    """(total, completed) over a todo and all of its subtasks, in one query"""
+    total, completed = _descendant_counts(db, todo)
+    return total + 1, completed + bool(todo.is_completed)
+
+def reassign_subtree_goal(db: Session, todo: Todo, old_goal_id: Optional[int]):
+    """
+    Move a todo's subtasks to its new goal, after its own goal_id changed
+
+    The todo itself is counted by record_todo_change(); the caller commits.
+    """
+    total, completed = _descendant_counts(db, todo)
+    if not total:
+        return
+    record_subtree(db, todo.user_id, old_goal_id, total, completed, sign=-1)
+    record_subtree(db, todo.user_id, todo.goal_id, total, completed)
+    db.query(Todo).filter(descendants_clause(todo)).update(
+        {Todo.goal_id: todo.goal_id, Todo.updated_at: Todo.updated_at}, synchronize_session=False
+    )
+
+def move_subtree(db: Session, todo: Todo, parent: Optional[Todo]):
+    """
+    Re-parent a todo and its subtasks under parent (None: top-level)
+
+    The subtasks' paths are rewritten by a single UPDATE over the subtree's
+    index range. Moving under another goal's tree moves the subtree's todos
+    to that goal. Raises ValueError when parent is inside the subtree; the
+    caller commits.
+    """
+    if parent is not None and is_in_subtree(todo, parent):
+        raise ValueError("A todo cannot be moved under itself or one of its subtasks")
+    path = child_path(parent) if parent is not None else "/"
+    goal_id = parent.goal_id if parent is not None else todo.goal_id
+
+    old_prefix = child_path(todo)
+    values = {
+        # Swap the old prefix for the new one; the rest of each path is unchanged
+        Todo.path: literal(f"{path}{todo.id}/").concat(func.substr(Todo.path, len(old_prefix) + 1)),
+        Todo.updated_at: Todo.updated_at,
+    }
+    if goal_id != todo.goal_id:
+        total, completed = subtree_counts(db, todo)
+        record_subtree(db, todo.user_id, todo.goal_id, total, completed, sign=-1)
+        record_subtree(db, todo.user_id, goal_id, total, completed)
+        values[Todo.goal_id] = goal_id
+    db.query(Todo).filter(descendants_clause(todo)).update(values, synchronize_session=False)
+
+    todo.parent_id = parent.id if parent is not None else None
+    todo.path = path
+    todo.goal_id = goal_id
+
+def build_tree(root: Dict, descendants: List[Dict]) -> Dict:
+    """
+    Nest a todo and its subtasks (dicts with path), adding each node's
+    children and the total/completed counts of its subtree
+    """
+    nodes = [root] + descendants
+    by_id = {node["id"]: node for node in nodes}
+    for node in nodes:
+        node["children"] = []
+        node["total_todos"] = 1
+        node["completed_todos"] = int(bool(node["is_completed"]))
+    for node in descendants:
+        by_id[node["parent_id"]]["children"].append(node)
+    # Deepest first, so each subtree is complete before it is added to its parent
+    for node in sorted(descendants, key=lambda node: node["path"].count("/"), reverse=True):
+        parent = by_id[node["parent_id"]]
+        parent["total_todos"] += node["total_todos"]
+        parent["completed_todos"] += node["completed_todos"]
+    for node in nodes:
+        del node["path"]
+    return root
@@ -1,12 +1,41 @@
 import os
-import requests
+import threading
+import time
 from typing import List, Dict, Optional
-from dotenv import load_dotenv
 
-load_dotenv()
+from app.utils.circuit_breaker import CircuitBreaker, is_upstream_failure
+from app.utils.metrics import record_upstream
 
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
-YOUTUBE_API_BASE_URL = "https://www.googleapis.com/youtube/v3"
+YOUTUBE_API_BASE_URL = os.getenv("YOUTUBE_API_BASE_URL", "https://www.googleapis.com/youtube/v3")
+
+# Keys of the video dicts returned by YouTubeService (detail lookups add the last four)
+VIDEO_FIELDS = (
+    "video_id", "title", "description", "channel_title", "published_at", "thumbnail_url", "url",
+    "duration_minutes", "view_count", "like_count", "tags"
+)
+
+# Consecutive failures before calls are short-circuited, and for how long
+YOUTUBE_BREAKER_FAILURES = int(os.getenv("YOUTUBE_BREAKER_FAILURES", "5"))
+YOUTUBE_BREAKER_RESET_SECONDS = float(os.getenv("YOUTUBE_BREAKER_RESET_SECONDS", "30"))
+
+class YouTubeAPIError(Exception):
+    """A YouTube API request failed (network error, timeout or error status)"""
+
+youtube_breaker = CircuitBreaker("youtube", YOUTUBE_BREAKER_FAILURES, YOUTUBE_BREAKER_RESET_SECONDS)
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session():
+    """Shared keep-alive HTTP session; requests is imported on the first YouTube call"""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                import requests
+                _http_session = requests.Session()
+    return _http_session
 
 class YouTubeService:
     """Service to interact with YouTube Data API v3"""
@@ -50,9 +79,7 @@ class YouTubeService:
         }
         
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get(url, params, endpoint="search")
             
             videos = []
             for item in data.get("items", []):
@@ -61,7 +88,7 @@ class YouTubeService:
             
             return videos
         
-        except requests.exceptions.RequestException as e:
+        except YouTubeAPIError as e:
             print(f"Error fetching videos from YouTube: {e}")
             return []
     
@@ -87,9 +114,7 @@ class YouTubeService:
         }
         
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get(url, params, endpoint="videos")
             
             videos = []
             for item in data.get("items", []):
@@ -98,10 +123,38 @@ class YouTubeService:
             
             return videos
         
-        except requests.exceptions.RequestException as e:
+        except YouTubeAPIError as e:
             print(f"Error fetching video details: {e}")
             return []
     
+    def _get(self, url: str, params: Dict, endpoint: str) -> Dict:
+        """GET a YouTube API endpoint through the circuit breaker, recording call count and latency"""
+        import requests
+
+        if not youtube_breaker.allow_request():
+            raise YouTubeAPIError("YouTube API temporarily unavailable (circuit open)")
+
+        start = time.perf_counter()
+        ok = False
+        # Only 5xx, timeouts and connection errors trip the breaker; a 4xx
+        # (bad key, quota, bad request) still shows YouTube is answering
+        failed = False
+        try:
+            response = get_http_session().get(url, params=params, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+            ok = True
+            return data
+        except requests.RequestException as e:
+            failed = is_upstream_failure(e)
+            raise YouTubeAPIError(str(e)) from e
+        finally:
+            record_upstream("youtube", endpoint, time.perf_counter() - start, ok)
+            if failed:
+                youtube_breaker.record_failure()
+            else:
+                youtube_breaker.record_success()
+    
     def search_videos_for_goal(
         self,
         goal_title: str,
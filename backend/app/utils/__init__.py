@@ -1,16 +1,34 @@
 from app.utils.auth import (
     verify_password,
     get_password_hash,
+    verify_and_update_password,
     create_access_token,
+    decode_access_token,
+    revoked_sessions,
     get_current_user,
     get_current_active_user,
 )
+from app.utils.serialization import (
+    response_columns,
+    rows_response,
+    parse_fields,
+    sparse_columns,
+    trim_fields,
+)
 
 __all__ = [
     "verify_password",
     "get_password_hash",
+    "verify_and_update_password",
     "create_access_token",
+    "decode_access_token",
+    "revoked_sessions",
     "get_current_user",
     "get_current_active_user",
+    "response_columns",
+    "rows_response",
+    "parse_fields",
+    "sparse_columns",
+    "trim_fields",
 ]
 
@@ -1,36 +1,84 @@
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from typing import Dict, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 import os
-from dotenv import load_dotenv
 
 from app.db.database import get_db
 from app.models.user import User
+from app.models.refresh_token import RevokedSession
 from app.schemas.user import TokenData
-
-load_dotenv()
+from app.utils.passwords import (  # noqa: F401  (re-exported)
+    get_pwd_context,
+    get_password_hash,
+    verify_password,
+    verify_and_update_password,
+)
 
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+# How stale each worker's copy of the revoked sessions may get
+REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", "5"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/users/login")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+# jose (which pulls in cryptography) is imported on first use to keep it
+# off the startup path
+
+class RevocationList:
+    """
+    In-memory copy of the revoked_sessions table
+
+    Access tokens carry their login session id in the "sid" claim, so
+    checking one is a dict lookup. Entries expire with the last access token
+    their session issued, which keeps the list small; it is reloaded from
+    the database at most every sync_seconds so revocations made by other
+    workers are picked up.
+    """
+
+    def __init__(self, sync_seconds: float = REVOCATION_SYNC_SECONDS):
+        self.sync_seconds = sync_seconds
+        self._expires: Dict[str, datetime] = {}
+        self._synced_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def __contains__(self, session_id: str) -> bool:
+        expires_at = self._expires.get(session_id)
+        return expires_at is not None and expires_at > datetime.utcnow()
 
-def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def add(self, session_id: str, expires_at: datetime):
+        with self._lock:
+            self._expires[session_id] = expires_at
+
+    def sync(self, db: Session):
+        """Reload from the database if the copy is older than sync_seconds"""
+        now = time.monotonic()
+        if self._synced_at is not None and now - self._synced_at < self.sync_seconds:
+            return
+        self._synced_at = now
+        utcnow = datetime.utcnow()
+        rows = db.query(RevokedSession.session_id, RevokedSession.expires_at).filter(
+            RevokedSession.expires_at > utcnow
+        ).all()
+        with self._lock:
+            # Keep local additions the query may have raced with
+            expires = {session_id: expires_at for session_id, expires_at in self._expires.items() if expires_at > utcnow}
+            expires.update(rows)
+            self._expires = expires
+
+revoked_sessions = RevocationList()
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -40,6 +88,20 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def decode_access_token(token: str) -> Optional[str]:
+    """Email (sub claim) of a valid, unexpired and unrevoked access token, or None"""
+    from jose import JWTError, jwt
+
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    session_id = payload.get("sid")
+    if session_id is not None and session_id in revoked_sessions:
+        return None
+    email = payload.get("sub")
+    return email if isinstance(email, str) else None
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     """Get the current authenticated user"""
     credentials_exception = HTTPException(
@@ -47,14 +109,11 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
-    except JWTError:
+    revoked_sessions.sync(db)
+    email = decode_access_token(token)
+    if email is None:
         raise credentials_exception
+    token_data = TokenData(email=email)
     
     user = db.query(User).filter(User.email == token_data.email).first()
     if user is None:
@@ -0,0 +1,87 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from app.utils.metrics import CIRCUIT_BREAKER_STATE
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+def is_upstream_failure(error: Optional[BaseException] = None, status_code: Optional[int] = None) -> bool:
+    """
+    Whether an upstream call's outcome counts against its breaker: 5xx
+    responses, timeouts and connection errors. A 4xx means the upstream is
+    up and rejected this particular request, so it never opens the breaker.
+    """
+    import requests
+
+    if status_code is not None:
+        return status_code >= 500
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500
+    return isinstance(error, (requests.Timeout, requests.ConnectionError))
+
+class CircuitBreaker:
+    """
+    Stop calling a failing upstream for a while
+
+    After failure_threshold consecutive failures (see is_upstream_failure)
+    the breaker opens and
+    allow_request() returns False for reset_timeout seconds; then a single
+    trial call is let through (half-open) and its outcome closes or re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+        CIRCUIT_BREAKER_STATE.set(0, name)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._set_state(HALF_OPEN)
+            if self._trial_in_progress:
+                return False
+            self._trial_in_progress = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._trial_in_progress = False
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_progress = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def snapshot(self) -> Dict:
+        state = self.state
+        with self._lock:
+            retry_in = self.reset_timeout - (time.monotonic() - self._opened_at) if state == OPEN else 0
+            return {"state": state, "consecutive_failures": self._failures, "retry_in_seconds": round(max(0, retry_in), 1)}
+
+    def _set_state(self, state: str):
+        self._state = state
+        CIRCUIT_BREAKER_STATE.set(STATE_VALUES[state], self.name)
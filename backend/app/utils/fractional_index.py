@@ -0,0 +1,128 @@
+"""
+Fractional indexing: string keys that can always be generated between two others
+
+Keys compare as plain byte strings (base-62 digits in ASCII order), so an
+item can be placed between any two neighbours by giving it one new key,
+without renumbering anything else. A key is a variable-length integer part
+followed by an optional fraction:
+
+- The first character gives the integer's length ("a" = 1 digit, "b" = 2,
+  ...; "Z", "Y", ... for the negative integers below them).
+- Appending at either end increments or decrements the integer, so keys
+  stay short.
+- Inserting between two keys repeatedly in the same spot grows the fraction
+  by about one character per six insertions, until the keys are rebalanced.
+"""
+from typing import Iterator, Optional
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+INTEGER_ZERO = "a0"
+SMALLEST_INTEGER = "A" + DIGITS[0] * 26
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid fractional index head: {head!r}")
+
+def _split(key: str):
+    length = _integer_length(key[0])
+    if len(key) < length or key.endswith(DIGITS[0]) and len(key) > length:
+        raise ValueError(f"Invalid fractional index key: {key!r}")
+    return key[:length], key[length:]
+
+def _increment(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for position in reversed(range(len(digits))):
+        value = DIGITS.index(digits[position]) + 1
+        if value < len(DIGITS):
+            digits[position] = DIGITS[value]
+            return head + "".join(digits)
+        digits[position] = DIGITS[0]
+    # Every digit carried over: move to the next integer length
+    if head == "Z":
+        return INTEGER_ZERO
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(DIGITS[0])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+def _decrement(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for position in reversed(range(len(digits))):
+        value = DIGITS.index(digits[position]) - 1
+        if value >= 0:
+            digits[position] = DIGITS[value]
+            return head + "".join(digits)
+        digits[position] = DIGITS[-1]
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+def _midpoint(low: str, high: Optional[str]) -> str:
+    """A fraction strictly between low and high (None: above every fraction)"""
+    if high is not None:
+        # Keep the common prefix, then split the first differing digit
+        common = 0
+        while (low[common] if common < len(low) else DIGITS[0]) == high[common]:
+            common += 1
+        if common:
+            return high[:common] + _midpoint(low[common:], high[common:])
+    low_digit = DIGITS.index(low[0]) if low else 0
+    high_digit = DIGITS.index(high[0]) if high is not None else len(DIGITS)
+    if high_digit - low_digit > 1:
+        return DIGITS[(low_digit + high_digit) // 2]
+    # Adjacent digits: go one level deeper
+    if high is not None and len(high) > 1:
+        return high[:1]
+    return DIGITS[low_digit] + _midpoint(low[1:], None)
+
+def key_between(low: Optional[str], high: Optional[str]) -> str:
+    """
+    A key sorting strictly between low and high; None means no bound on that
+    side. Raises ValueError unless low < high.
+    """
+    if low is not None and high is not None and low >= high:
+        raise ValueError(f"Fractional index keys out of order: {low!r} >= {high!r}")
+    if low is None and high is None:
+        return INTEGER_ZERO
+    if low is None:
+        integer, fraction = _split(high)
+        if integer == SMALLEST_INTEGER:
+            return integer + _midpoint("", fraction)
+        if integer < high:
+            return integer
+        lower = _decrement(integer)
+        if lower is None:
+            raise ValueError("Cannot generate a key below the smallest integer")
+        return lower
+    integer, fraction = _split(low)
+    if high is None:
+        higher = _increment(integer)
+        return integer + _midpoint(fraction, None) if higher is None else higher
+    high_integer, high_fraction = _split(high)
+    if integer == high_integer:
+        return integer + _midpoint(fraction, high_fraction)
+    higher = _increment(integer)
+    if higher is None:
+        raise ValueError("Cannot generate a key above the largest integer")
+    return higher if higher < high else integer + _midpoint(fraction, None)
+
+def keys_after(low: Optional[str]) -> Iterator[str]:
+    """Consecutive keys after low (or from the start), as short as possible"""
+    key = low
+    while True:
+        key = key_between(key, None)
+        yield key
@@ -0,0 +1,83 @@
+"""
+Dependency checks behind the liveness and readiness probes
+
+EventLoopMonitor measures how late the event loop wakes a sleeping task;
+sustained lag means requests are queued behind blocking work. pool_status()
+reports how much of the SQLAlchemy connection pool is checked out.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import text
+
+from app.utils.metrics import EVENT_LOOP_LAG
+
+logger = logging.getLogger(__name__)
+
+class EventLoopMonitor:
+    """Background task sampling event-loop scheduling delay"""
+
+    def __init__(self, interval: float = 0.25, window: int = 20):
+        self.interval = interval
+        self.window = window
+        self._samples = []
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def lag(self) -> float:
+        """Most recent lag in seconds"""
+        return self._samples[-1] if self._samples else 0.0
+
+    @property
+    def max_lag(self) -> float:
+        """Worst lag over the last `window` samples"""
+        return max(self._samples, default=0.0)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - start - self.interval)
+            self._samples = (self._samples + [lag])[-self.window:]
+            EVENT_LOOP_LAG.set(lag)
+
+event_loop_monitor = EventLoopMonitor()
+
+def pool_status(engine) -> Dict:
+    """Checked-out connections against pool capacity (size + max overflow)"""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {"class": type(pool).__name__}
+    size = pool.size()
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    capacity = size + max_overflow if max_overflow >= 0 else None
+    checked_out = pool.checkedout()
+    return {
+        "class": type(pool).__name__,
+        "size": size,
+        "checked_out": checked_out,
+        "capacity": capacity,
+        "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+    }
+
+def ping_database(engine) -> float:
+    """Round-trip a trivial query; returns its latency in seconds"""
+    start = time.perf_counter()
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    return time.perf_counter() - start
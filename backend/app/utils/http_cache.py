@@ -0,0 +1,30 @@
+import hashlib
+from typing import Any, Optional
+
+import orjson
+from fastapi import Request, Response
+
+class PrecomputedJSON:
+    """
+    A JSON response body serialized once, with a strong ETag
+
+    For static data: handlers return .response(request) and never
+    re-serialize; clients revalidating with If-None-Match get a bodiless 304.
+    """
+
+    def __init__(self, content: Any):
+        self.body = orjson.dumps(content)
+        self.etag = '"' + hashlib.blake2b(self.body, digest_size=12).hexdigest() + '"'
+
+    def response(self, request: Request, cache_control: str, vary: Optional[str] = None) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": cache_control}
+        if vary:
+            headers["Vary"] = vary
+        if_none_match = request.headers.get("if-none-match", "")
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        if if_none_match == "*" or self.etag in tags:
+            return Response(status_code=304, headers=headers)
+        if "W/" + self.etag in tags:
+            # Revalidating a compressed response (weak comparison): echo the weak ETag it carried
+            return Response(status_code=304, headers={**headers, "ETag": "W/" + self.etag})
+        return Response(content=self.body, media_type="application/json", headers=headers)
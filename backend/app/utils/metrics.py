@@ -0,0 +1,302 @@
+"""
+In-process performance metrics with Prometheus text exposition
+
+Metrics live in a module-level registry; MetricsMiddleware records request
+latency, instrument_engine() hooks SQLAlchemy query timing into the current
+request, and services call the helpers below for upstream and cache stats.
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+HASH_BUCKETS = (0.025, 0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.4, 0.5, 0.75, 1.0, 2.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in items
+        ]
+
+class Gauge:
+    """Point-in-time value with labels, set directly or read from a callback when rendered"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._values[labels] = value
+
+    def set_function(self, function: Callable[[], float], *labels: str):
+        with self._lock:
+            self._functions[labels] = function
+
+    def value(self, *labels: str) -> float:
+        function = self._functions.get(labels)
+        return function() if function else self._values.get(labels, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = dict(self._values)
+            functions = dict(self._functions)
+        for labels, function in functions.items():
+            try:
+                items[labels] = function()
+            except Exception:
+                continue
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(items.items())
+        ]
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._values.get(labels)
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._values.items())
+        lines = []
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+class Registry:
+    """Ordered collection of metrics rendered together on /metrics"""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+))
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+))
+DB_QUERIES = REGISTRY.register(Counter(
+    "db_queries_total", "SQL statements executed", ()
+))
+DB_QUERY_DURATION = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "SQL statement execution time", (), QUERY_BUCKETS
+))
+DB_QUERIES_PER_REQUEST = REGISTRY.register(Histogram(
+    "db_queries_per_request", "SQL statements issued per HTTP request", ("method", "route"), COUNT_BUCKETS
+))
+DB_TIME_PER_REQUEST = REGISTRY.register(Histogram(
+    "db_time_per_request_seconds", "Time spent in SQL per HTTP request", ("method", "route")
+))
+UPSTREAM_REQUESTS = REGISTRY.register(Counter(
+    "upstream_requests_total", "Calls to upstream APIs", ("service", "endpoint", "outcome")
+))
+UPSTREAM_DURATION = REGISTRY.register(Histogram(
+    "upstream_request_duration_seconds", "Upstream API call latency", ("service", "endpoint")
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "cache_requests_total", "Cache lookups by cache and result", ("cache", "result")
+))
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ()
+))
+HTTP_REQUESTS_SHED = REGISTRY.register(Counter(
+    "http_requests_shed_total", "HTTP requests rejected with 503 by the concurrency limiter", ()
+))
+RATE_LIMITED_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_rate_limited_total", "HTTP requests rejected with 429 by rate limit bucket", ("bucket",)
+))
+CONCURRENCY_LIMIT = REGISTRY.register(Gauge(
+    "http_concurrency_limit", "Current adaptive concurrency limit", ()
+))
+EVENT_LOOP_LAG = REGISTRY.register(Gauge(
+    "event_loop_lag_seconds", "Most recent event loop scheduling delay", ()
+))
+DB_POOL_CHECKED_OUT = REGISTRY.register(Gauge(
+    "db_pool_connections_checked_out", "Database connections currently in use", ()
+))
+CIRCUIT_BREAKER_STATE = REGISTRY.register(Gauge(
+    "circuit_breaker_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ("name",)
+))
+PASSWORD_HASH_DURATION = REGISTRY.register(Histogram(
+    "password_hash_duration_seconds", "bcrypt time per password hash or verification", ("operation",), HASH_BUCKETS
+))
+PASSWORD_HASH_ROUNDS = REGISTRY.register(Gauge(
+    "password_hash_rounds", "bcrypt cost used for new password hashes", ()
+))
+PASSWORD_REHASHES = REGISTRY.register(Counter(
+    "password_rehashes_total", "Stored password hashes upgraded to the current cost at login", ()
+))
+ACCOUNT_PURGE_ROWS = REGISTRY.register(Counter(
+    "account_purge_rows_total", "Rows deleted by background account purges", ("table",)
+))
+GOAL_COUNTER_REPAIRS = REGISTRY.register(Counter(
+    "goal_counter_repairs_total", "Goals whose denormalized counters were found out of date and corrected", ()
+))
+TODO_RANK_REBALANCES = REGISTRY.register(Counter(
+    "todo_rank_rebalances_total", "Users whose todo rank keys were rewritten to short evenly spaced keys", ()
+))
+REMINDERS_DISPATCHED = REGISTRY.register(Counter(
+    "reminders_dispatched_total", "Due-date reminders handed to the reminder sink", ("sink",)
+))
+REMINDERS_SCHEDULED = REGISTRY.register(Gauge(
+    "reminders_scheduled", "Due-date reminders queued in this worker's scheduler heap", ()
+))
+
+class RequestStats:
+    """Per-request accumulator for SQL statements, shared with threadpool workers via contextvars"""
+
+    MAX_STATEMENTS = 50
+
+    def __init__(self):
+        self.query_count = 0
+        self.query_time = 0.0
+        self.statements: List[Tuple[float, str]] = []
+
+    def record_query(self, statement: str, duration: float):
+        self.query_count += 1
+        self.query_time += duration
+        if len(self.statements) < self.MAX_STATEMENTS:
+            self.statements.append((duration, statement))
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def start_request_stats() -> Tuple[RequestStats, object]:
+    stats = RequestStats()
+    return stats, _request_stats.set(stats)
+
+def end_request_stats(token):
+    _request_stats.reset(token)
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+def record_upstream(service: str, endpoint: str, duration: float, ok: bool):
+    """Record an upstream API call, e.g. record_upstream("youtube", "search", 0.21, True)"""
+    UPSTREAM_REQUESTS.inc(service, endpoint, "ok" if ok else "error")
+    UPSTREAM_DURATION.observe(duration, service, endpoint)
+
+def record_cache(cache: str, hit: bool):
+    """Record a cache lookup for hit-rate reporting"""
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+def instrument_engine(engine):
+    """Time every SQL statement on engine and attribute it to the current request"""
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_start_time"].pop()
+        DB_QUERIES.inc()
+        DB_QUERY_DURATION.observe(duration)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.record_query(statement, duration)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start_time"):
+            conn.info["query_start_time"].pop()
+
+    if hasattr(engine.pool, "checkedout"):
+        DB_POOL_CHECKED_OUT.set_function(engine.pool.checkedout)
+
+def render_metrics() -> str:
+    return REGISTRY.render()
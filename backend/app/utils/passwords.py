@@ -0,0 +1,107 @@
+"""
+Password hashing with a bcrypt cost fitted to the host
+
+Unless BCRYPT_ROUNDS pins it, the cost is calibrated on first use: the
+highest cost in [BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS] whose hash takes at
+most BCRYPT_TARGET_MS here (each extra round doubles the time). Stored
+hashes below a fixed floor (BCRYPT_ROUNDS when pinned, BCRYPT_MIN_ROUNDS
+otherwise) are rehashed the next time their owner logs in; the calibrated
+cost only applies to new hashes, so hosts that calibrate differently do not
+keep rehashing each other's hashes. Multi-host deployments that want one
+cost everywhere should pin BCRYPT_ROUNDS.
+passlib/bcrypt are imported on first use to keep them off the startup path.
+"""
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from app.utils.metrics import PASSWORD_HASH_DURATION, PASSWORD_HASH_ROUNDS, PASSWORD_REHASHES
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "0"))  # 0 calibrates on this host
+BCRYPT_TARGET_MS = float(os.getenv("BCRYPT_TARGET_MS", "250"))
+BCRYPT_MIN_ROUNDS = int(os.getenv("BCRYPT_MIN_ROUNDS", "10"))
+BCRYPT_MAX_ROUNDS = int(os.getenv("BCRYPT_MAX_ROUNDS", "14"))
+
+def calibrate_bcrypt_rounds(
+    target_ms: float = BCRYPT_TARGET_MS,
+    min_rounds: int = BCRYPT_MIN_ROUNDS,
+    max_rounds: int = BCRYPT_MAX_ROUNDS,
+    samples: int = 3
+) -> int:
+    """Highest bcrypt cost whose hash time on this host stays within target_ms"""
+    from passlib.hash import bcrypt
+
+    handler = bcrypt.using(rounds=min_rounds)
+    elapsed = float("inf")
+    for _ in range(samples):
+        # Fastest sample: the least disturbed by other load on the host
+        start = time.perf_counter()
+        handler.hash("calibration")
+        elapsed = min(elapsed, time.perf_counter() - start)
+    rounds = min_rounds
+    while rounds < max_rounds and elapsed * 2 * 1000 <= target_ms:
+        rounds += 1
+        elapsed *= 2
+    return rounds
+
+_rounds: Optional[int] = None
+_rounds_lock = threading.Lock()
+
+def bcrypt_rounds() -> int:
+    """The bcrypt cost for new hashes: BCRYPT_ROUNDS, or calibrated once per process"""
+    global _rounds
+    if _rounds is None:
+        with _rounds_lock:
+            if _rounds is None:
+                _rounds = BCRYPT_ROUNDS or calibrate_bcrypt_rounds()
+                PASSWORD_HASH_ROUNDS.set(_rounds)
+    return _rounds
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """The bcrypt password context, created on first use"""
+    from passlib.context import CryptContext
+
+    rounds = bcrypt_rounds()
+    # Only a cost below the floor needs an update, never one from another host's calibration
+    floor = BCRYPT_ROUNDS or min(BCRYPT_MIN_ROUNDS, rounds)
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=floor
+    )
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash"""
+    start = time.perf_counter()
+    try:
+        return get_pwd_context().verify(plain_password, hashed_password)
+    finally:
+        PASSWORD_HASH_DURATION.observe(time.perf_counter() - start, "verify")
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password; when it matches a hash with an outdated cost, also
+    return a replacement hash at the current cost (otherwise None)
+    """
+    context = get_pwd_context()
+    start = time.perf_counter()
+    try:
+        valid = context.verify(plain_password, hashed_password)
+    finally:
+        PASSWORD_HASH_DURATION.observe(time.perf_counter() - start, "verify")
+    if not valid or not context.needs_update(hashed_password):
+        return valid, None
+    PASSWORD_REHASHES.inc()
+    return True, get_password_hash(plain_password)
+
+def get_password_hash(password: str) -> str:
+    """Hash a password"""
+    start = time.perf_counter()
+    try:
+        return get_pwd_context().hash(password)
+    finally:
+        PASSWORD_HASH_DURATION.observe(time.perf_counter() - start, "hash")
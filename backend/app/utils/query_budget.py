@@ -0,0 +1,56 @@
+"""
+N+1 detection: count the SQL statements a block of code issues
+
+    with assert_max_queries(5):
+        client.get("/api/goals/?include=todos,stats", headers=headers)
+
+Listeners are attached to the engine itself rather than to the current
+request context, so statements issued from TestClient's worker thread or
+FastAPI's threadpool are counted too.
+"""
+from contextlib import contextmanager
+from typing import List
+
+from sqlalchemy import event
+
+from app.db.database import get_engine
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block issues more SQL statements than its budget"""
+
+class QueryLog:
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __len__(self):
+        return self.count
+
+@contextmanager
+def count_queries(engine=None):
+    """Collect every statement executed on engine while the block runs"""
+    engine = engine or get_engine()
+    log = QueryLog()
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        log.statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield log
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+@contextmanager
+def assert_max_queries(limit: int, engine=None):
+    """Fail with QueryBudgetExceeded if the block issues more than limit statements"""
+    with count_queries(engine) as log:
+        yield log
+    if log.count > limit:
+        statements = "\n".join(f"  {i}. {statement}" for i, statement in enumerate(log.statements, 1))
+        raise QueryBudgetExceeded(
+            f"Expected at most {limit} queries, {log.count} were issued:\n{statements}"
+        )
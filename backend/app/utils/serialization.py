@@ -0,0 +1,63 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, status
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+def response_columns(model, schema: Type[BaseModel]) -> Tuple[List[str], list]:
+    """
+    Map a response schema's fields to the model columns that back them
+
+    Computed once per schema at import time so list endpoints can select
+    plain column tuples instead of hydrating ORM entities.
+    """
+    fields = list(schema.model_fields)
+    return fields, [getattr(model, field) for field in fields]
+
+def rows_response(fields: Sequence[str], rows: Iterable[tuple], status_code: int = 200) -> ORJSONResponse:
+    """
+    Serialize column tuples straight to JSON
+
+    Returning a Response bypasses FastAPI's response_model validation; the
+    columns come from response_columns() so the payload shape matches the
+    declared schema (which still documents the endpoint in OpenAPI).
+    """
+    return ORJSONResponse(
+        content=[dict(zip(fields, row)) for row in rows],
+        status_code=status_code
+    )
+
+def parse_fields(
+    fields: Optional[str],
+    available: Sequence[str],
+    always: Sequence[str] = ("id",),
+    param: str = "field"
+) -> List[str]:
+    """
+    Parse a comma-separated fields= query parameter (sparse fieldset)
+
+    Returns the requested subset of available in declaration order, plus the
+    identifying fields in always. No parameter means every field.
+    """
+    if not fields:
+        return list(available)
+
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(available)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown {param}(s): {', '.join(sorted(unknown))}. Available: {', '.join(available)}"
+        )
+    requested.update(always)
+    return [field for field in available if field in requested]
+
+def sparse_columns(fields: Optional[str], all_fields: Sequence[str], all_columns: Sequence) -> Tuple[List[str], list]:
+    """Narrow response_columns() output to a fields= selection, so SQL only selects what is returned"""
+    selected = parse_fields(fields, all_fields)
+    columns_by_field = dict(zip(all_fields, all_columns))
+    return selected, [columns_by_field[field] for field in selected]
+
+def trim_fields(items: Iterable[Dict], selected: Sequence[str]) -> List[Dict]:
+    """Apply a parsed fields= selection to already-built dicts"""
+    return [{field: item[field] for field in selected if field in item} for item in items]
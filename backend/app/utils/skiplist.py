@@ -0,0 +1,137 @@
+"""
+Indexable skip list: a sorted set with O(log n) insert, remove, rank and
+lookup by position
+
+Every link records how many items it skips (its width), so walking down
+from the top level counts positions on the way: the position of a key,
+and the key at a position, take the same O(log n) expected steps as a
+search. Keys must be unique and mutually comparable (e.g. tuples).
+"""
+import random
+from typing import Any, Iterable, Iterator, List, Optional
+
+MAX_LEVEL = 32  # Ample for 2**32 keys
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: Any, level: int):
+        self.key = key
+        self.next: List[Optional["_Node"]] = [None] * level
+        # Items the link at each level skips, counting the node it lands on;
+        # links off the end count the remaining items plus one
+        self.width: List[int] = [1] * level
+
+class IndexableSkipList:
+    def __init__(self, seed: Optional[int] = None):
+        self._head = _Node(None, MAX_LEVEL)
+        self._size = 0
+        self._random = random.Random(seed)
+
+    @classmethod
+    def from_sorted(cls, keys: Iterable[Any], seed: Optional[int] = None) -> "IndexableSkipList":
+        """Build from strictly increasing keys in O(n), linking each level left to right"""
+        skiplist = cls(seed)
+        last = [skiplist._head] * MAX_LEVEL
+        last_positions = [0] * MAX_LEVEL
+        position = 0
+        for key in keys:
+            position += 1
+            node = _Node(key, skiplist._level())
+            for level in range(len(node.next)):
+                last[level].next[level] = node
+                last[level].width[level] = position - last_positions[level]
+                last[level] = node
+                last_positions[level] = position
+        for level in range(MAX_LEVEL):
+            last[level].width[level] = position + 1 - last_positions[level]
+        skiplist._size = position
+        return skiplist
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Any]:
+        return self.iterate(0)
+
+    def _level(self) -> int:
+        # Each further level with probability 1/2: one plus the number of
+        # trailing zero bits of a random word
+        bits = self._random.getrandbits(MAX_LEVEL - 1)
+        return (bits & -bits).bit_length() or MAX_LEVEL
+
+    def _predecessors(self, key: Any):
+        """The last node before key at every level, and their positions"""
+        chain: List[_Node] = [self._head] * MAX_LEVEL
+        positions = [0] * MAX_LEVEL
+        node, position = self._head, 0
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+            positions[level] = position
+        return chain, positions
+
+    def add(self, key: Any) -> bool:
+        """Insert key; returns False (and changes nothing) if it is already present"""
+        chain, positions = self._predecessors(key)
+        following = chain[0].next[0]
+        if following is not None and following.key == key:
+            return False
+        node = _Node(key, self._level())
+        # The new node's position, counting the head as 0
+        position = positions[0] + 1
+        for level in range(len(node.next)):
+            previous = chain[level]
+            node.next[level] = previous.next[level]
+            previous.next[level] = node
+            node.width[level] = previous.width[level] - (position - positions[level]) + 1
+            previous.width[level] = position - positions[level]
+        for level in range(len(node.next), MAX_LEVEL):
+            chain[level].width[level] += 1
+        self._size += 1
+        return True
+
+    def remove(self, key: Any) -> bool:
+        """Delete key; returns False if it was not present"""
+        chain, _ = self._predecessors(key)
+        node = chain[0].next[0]
+        if node is None or node.key != key:
+            return False
+        for level in range(len(node.next)):
+            previous = chain[level]
+            previous.width[level] += node.width[level] - 1
+            previous.next[level] = node.next[level]
+        for level in range(len(node.next), MAX_LEVEL):
+            chain[level].width[level] -= 1
+        self._size -= 1
+        return True
+
+    def bisect_left(self, key: Any) -> int:
+        """Number of keys smaller than key (its position, if present)"""
+        return self._predecessors(key)[1][0]
+
+    def _node_at(self, index: int) -> _Node:
+        if not 0 <= index < self._size:
+            raise IndexError("skip list index out of range")
+        node, remaining = self._head, index + 1
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += self._size
+        return self._node_at(index).key
+
+    def iterate(self, start: int = 0) -> Iterator[Any]:
+        """Keys in order from position start"""
+        if start >= self._size:
+            return
+        node = self._node_at(max(0, start))
+        while node is not None:
+            yield node.key
+            node = node.next[0]
@@ -0,0 +1 @@
+# Focus App - performance benchmarks (run from backend/, e.g. python -m benchmarks.serialization)
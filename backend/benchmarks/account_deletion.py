@@ -0,0 +1,107 @@
+"""
+Deleting a large account: immediate (database cascades) vs background purge
+
+Seeds two identical accounts with --goals goals of --todos-per-goal todos
+and --activities focus sessions, then deletes one as DELETE /api/users/me
+does and queues the other as ?background=true does. Reports the time and
+SQL statements before the response, and for the purge its duration and
+longest batch transaction. Fails (exit 1) if either account has rows left.
+
+    python -m benchmarks.account_deletion [--goals 100] [--todos-per-goal 200] [--activities 20000]
+"""
+import argparse
+import json
+import sys
+import time
+
+from benchmarks.common import seed
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, func  # noqa: E402
+
+from app.db.database import SessionLocal, get_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Activity, Goal, Todo, User  # noqa: E402
+from app.services.account_deletion import PURGE_BATCH_SIZE, purge_account, queue_account_deletion  # noqa: E402
+from app.utils.query_budget import count_queries  # noqa: E402
+
+def remaining_rows(db, user_id):
+    return sum(
+        db.query(func.count()).select_from(model).filter(model.user_id == user_id).scalar()
+        for model in (Todo, Goal, Activity)
+    ) + db.query(func.count(User.id)).filter(User.id == user_id).scalar()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--goals", type=int, default=100)
+    parser.add_argument("--todos-per-goal", type=int, default=200)
+    parser.add_argument("--activities", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=PURGE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    accounts = seed(
+        users=2, goals_per_user=args.goals, todos_per_goal=args.todos_per_goal, activities_per_user=args.activities
+    )
+    client = TestClient(app)
+    db = SessionLocal()
+    user_ids = [client.get("/api/users/me", headers=headers).json()["id"] for headers in accounts]
+    rows = remaining_rows(db, user_ids[0])
+
+    # Immediate: the request deletes the user row and the database cascades
+    start = time.perf_counter()
+    with count_queries() as log:
+        response = client.delete("/api/users/me", headers=accounts[0])
+    assert response.status_code == 204, response.text
+    results = {"immediate": {
+        "response_ms": round((time.perf_counter() - start) * 1000, 1),
+        "statements": log.count,
+    }}
+
+    # Background: what the request does before responding, then the purge
+    # (TestClient would run the background task inside the request)
+    user = db.get(User, user_ids[1])
+    start = time.perf_counter()
+    with count_queries() as log:
+        queue_account_deletion(db, user)
+    queued_ms = (time.perf_counter() - start) * 1000
+    queued_statements = log.count
+
+    # Each batch is one transaction: time from one commit to the next
+    batch_seconds = []
+    last_commit = [0.0]
+
+    def on_commit(connection):
+        now = time.perf_counter()
+        batch_seconds.append(now - last_commit[0])
+        last_commit[0] = now
+
+    db.commit()
+    event.listen(get_engine(), "commit", on_commit)
+    start = last_commit[0] = time.perf_counter()
+    purged = purge_account(db, user_ids[1], args.batch_size)
+    purge_seconds = time.perf_counter() - start
+    event.remove(get_engine(), "commit", on_commit)
+    results["background"] = {
+        "response_ms": round(queued_ms, 1),
+        "statements": queued_statements,
+        "purge_seconds": round(purge_seconds, 2),
+        "purge_rows": purged,
+        "purge_batches": len(batch_seconds),
+        "longest_batch_ms": round(max(batch_seconds) * 1000, 1),
+    }
+
+    left = {user_id: remaining_rows(db, user_id) for user_id in user_ids}
+    db.close()
+    ok = not any(left.values())
+    print(json.dumps({
+        "benchmark": "account_deletion",
+        "rows_per_account": rows,
+        "batch_size": args.batch_size,
+        "ok": ok,
+        "rows_left": left,
+        "results": results,
+    }, indent=2))
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Filtering focus history on extra_data: server-side filters vs fetching everything
+
+Seeds one user with --activities focus sessions (extra_data with goal_id,
+tags and mood), then times GET /api/activities/ with goal_id=, tag= and
+extra=mood:... against listing every activity and filtering on the client
+(what the API required before). Fails (exit 1) if a filter returns
+different rows than the client-side filter, or the goal_id query does not
+use the promoted column's index.
+
+    python -m benchmarks.activity_filters [--activities 100000]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from benchmarks.common import seed
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.db.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Activity, Goal  # noqa: E402
+
+def timed(iterations, call):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = call()
+        samples.append(time.perf_counter() - start)
+    return result, round(statistics.median(samples) * 1000, 2)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--activities", type=int, default=100000)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    headers = seed(goals_per_user=20, todos_per_goal=1, activities_per_user=args.activities)[0]
+    client = TestClient(app)
+    db = SessionLocal()
+    user_id = client.get("/api/users/me", headers=headers).json()["id"]
+    goal_id = db.query(Goal.id).filter(Goal.user_id == user_id).order_by(Goal.id).limit(1).scalar()
+
+    def list_activities(**params):
+        response = client.get("/api/activities/", params={"limit": args.activities, **params}, headers=headers)
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    everything, fetch_all_ms = timed(args.iterations, list_activities)
+    cases = [
+        ("goal_id", {"goal_id": goal_id}, lambda extra: extra.get("goal_id") == goal_id),
+        ("tag", {"tag": "reading"}, lambda extra: "reading" in extra.get("tags", [])),
+        ("tags_and_mood", {"tag": ["deep", "study"], "extra": "mood:tired"},
+         lambda extra: {"deep", "study"} <= set(extra.get("tags", [])) and extra.get("mood") == "tired"),
+    ]
+    results = []
+    for name, params, matches in cases:
+        rows, median_ms = timed(args.iterations, lambda: list_activities(**params))
+        expected = sorted(row["id"] for row in everything if matches(row["extra_data"] or {}))
+        results.append({
+            "filter": name,
+            "rows": len(rows),
+            "median_ms": median_ms,
+            "fetch_all_then_filter_ms": fetch_all_ms,
+            "ok": sorted(row["id"] for row in rows) == expected,
+        })
+
+    query = db.query(Activity.id).filter(Activity.user_id == user_id, Activity.goal_id == goal_id)
+    compiled = query.statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    if db.get_bind().dialect.name == "sqlite":
+        plan = " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+    else:
+        plan = " ".join(row[0] for row in db.execute(text(f"EXPLAIN {compiled}")))
+    db.close()
+
+    ok = all(result["ok"] for result in results) and "ix_activities_user_goal_created" in plan
+    print(json.dumps({
+        "benchmark": "activity_filters",
+        "activities": len(everything),
+        "ok": ok,
+        "goal_id_plan": plan,
+        "results": results,
+    }, indent=2))
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
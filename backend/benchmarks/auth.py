@@ -0,0 +1,63 @@
+"""
+CPU cost of renewing an access token: password login vs refresh token
+
+Compares per-call CPU time of POST /api/users/login (bcrypt verification)
+with POST /api/users/token/refresh (one digest lookup and rotation), and
+the bare password check with the bare refresh token hash.
+
+    python -m benchmarks.auth [--iterations 50]
+"""
+import argparse
+import json
+
+from benchmarks.common import BENCH_PASSWORD, seed_accounts, cpu_time_per_call
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.db.database import SessionLocal  # noqa: E402
+from app.models import User  # noqa: E402
+from app.services.sessions import hash_refresh_token  # noqa: E402
+from app.utils.auth import verify_password  # noqa: E402
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    email, _ = seed_accounts(goals_per_user=0, todos_per_goal=0, activities_per_user=0)[0]
+    client = TestClient(app)
+    db = SessionLocal()
+    password_hash = db.query(User.hashed_password).filter(User.email == email).scalar()
+    db.close()
+
+    def login():
+        response = client.post("/api/users/login", data={"username": email, "password": BENCH_PASSWORD})
+        assert response.status_code == 200, response.text
+        return response.json()["refresh_token"]
+
+    refresh_token = login()
+
+    def refresh():
+        nonlocal refresh_token
+        response = client.post("/api/users/token/refresh", json={"refresh_token": refresh_token})
+        assert response.status_code == 200, response.text
+        refresh_token = response.json()["refresh_token"]
+
+    login_cpu = cpu_time_per_call(login, args.iterations)
+    refresh_cpu = cpu_time_per_call(refresh, args.iterations)
+    results = {
+        "login_request_cpu_ms": round(login_cpu * 1000, 2),
+        "refresh_request_cpu_ms": round(refresh_cpu * 1000, 2),
+        "renewal_cpu_ratio": round(login_cpu / refresh_cpu, 1),
+        "verify_password_cpu_ms": round(
+            cpu_time_per_call(lambda: verify_password(BENCH_PASSWORD, password_hash), args.iterations) * 1000, 2
+        ),
+        "hash_refresh_token_cpu_us": round(
+            cpu_time_per_call(lambda: hash_refresh_token(refresh_token), args.iterations * 100) * 1e6, 2
+        ),
+    }
+    print(json.dumps({"benchmark": "auth", "iterations": args.iterations, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Shared setup for benchmark scripts
+
+Importing this module points DATABASE_URL at a throwaway SQLite database
+(unless one is already set) before the app is imported, so benchmarks never
+touch a real database, and turns off rate limiting.
+"""
+import itertools
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_bench_dir = tempfile.mkdtemp(prefix="focus-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_bench_dir}/bench.db")
+# Benchmarks drive many requests from one user and address
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.db.database import SessionLocal, create_schema  # noqa: E402
+from app.models import User, Goal, Todo, Activity  # noqa: E402
+from app.services.goal_counters import repair_goal_counters  # noqa: E402
+from app.services.leaderboards import rebuild_focus_days  # noqa: E402
+from app.services.todo_ranks import next_ranks  # noqa: E402
+from app.utils.auth import create_access_token, get_password_hash  # noqa: E402
+
+CATEGORIES = ["career", "health", "learning", "personal", "productivity", "finance"]
+PRIORITIES = ["low", "medium", "high"]
+_user_numbers = itertools.count()
+
+LOREM = (
+    "Break the work into small steps, keep notes on what blocked progress "
+    "and review the plan at the end of every focus session. "
+)
+
+BENCH_PASSWORD = "benchmark"
+
+def seed(users=1, goals_per_user=10, todos_per_goal=10, activities_per_user=500, seed_value=42):
+    """Create users with goals, todos and focus history; returns auth headers per user"""
+    accounts = seed_accounts(users, goals_per_user, todos_per_goal, activities_per_user, seed_value)
+    return [headers for _, headers in accounts]
+
+def seed_accounts(users=1, goals_per_user=10, todos_per_goal=10, activities_per_user=500, seed_value=42):
+    """Like seed(), but returns (email, auth headers) pairs; every password is BENCH_PASSWORD"""
+    rng = random.Random(seed_value)
+    create_schema()
+    db = SessionLocal()
+    now = datetime.utcnow()
+    password_hash = get_password_hash(BENCH_PASSWORD)
+    accounts = []
+    try:
+        for _ in range(users):
+            email = f"bench{next(_user_numbers)}@example.com"
+            user = User(email=email, username=email.split("@")[0], hashed_password=password_hash)
+            db.add(user)
+            db.flush()
+
+            goals = [
+                {
+                    "user_id": user.id,
+                    "title": f"Goal {g}",
+                    "description": LOREM * 2,
+                    "category": rng.choice(CATEGORIES),
+                    "target_date": now + timedelta(days=rng.randint(7, 180)),
+                }
+                for g in range(goals_per_user)
+            ]
+            goal_ids = db.scalars(
+                insert(Goal).returning(Goal.id, sort_by_parameter_order=True), goals
+            ).all() if goals else []
+
+            todos = []
+            for goal_id in goal_ids:
+                for t in range(todos_per_goal):
+                    done = rng.random() < 0.4
+                    todos.append({
+                        "user_id": user.id,
+                        "goal_id": goal_id,
+                        "title": f"Todo {t} for goal {goal_id}",
+                        "description": LOREM,
+                        "priority": rng.choice(PRIORITIES),
+                        "due_date": now + timedelta(days=rng.randint(-10, 60)),
+                        "is_completed": done,
+                        "completed_at": now - timedelta(days=rng.randint(0, 30)) if done else None,
+                    })
+            if todos:
+                for todo, rank in zip(todos, next_ranks(db, user.id, len(todos))):
+                    todo["rank"] = rank
+                db.execute(insert(Todo), todos)
+
+            activities = [
+                {
+                    "user_id": user.id,
+                    "activity_type": "focus_session",
+                    "title": "Focus session",
+                    "description": LOREM,
+                    "duration_minutes": rng.choice([15, 25, 25, 50]),
+                    "extra_data": {
+                        "goal_id": rng.choice(goal_ids) if goal_ids else None,
+                        "tags": rng.sample(["deep", "study", "admin", "reading"], 2),
+                        "mood": rng.choice(["great", "ok", "tired"]),
+                    },
+                    "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 90)),
+                }
+                for _ in range(activities_per_user)
+            ]
+            if activities:
+                db.execute(insert(Activity), activities)
+            repair_goal_counters(db, user.id)
+            rebuild_focus_days(db, user.id)
+
+            db.commit()
+            token = create_access_token(data={"sub": email}, expires_delta=timedelta(days=1))
+            accounts.append((email, {"Authorization": f"Bearer {token}"}))
+    finally:
+        db.close()
+    return accounts
+
+def cpu_time_per_call(fn, iterations):
+    """Average process CPU seconds per call of fn"""
+    fn()  # warm up caches and lazy imports
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations
+
+class FakeYouTubeService:
+    """Stand-in for YouTubeService returning realistic, deterministic video payloads"""
+
+    DESCRIPTION = (
+        "In this video we walk through a complete routine for building lasting focus habits. "
+        "Chapters, links to the worksheet, the books mentioned and our sponsor are below. "
+    ) * 12
+
+    def _videos(self, seed_text, max_results):
+        rng = random.Random(seed_text)
+        videos = []
+        for i in range(max_results):
+            video_id = "".join(rng.choice("abcdefghijklmnopqrstuvwxyzABCDEFGHIJ0123456789_-") for _ in range(11))
+            videos.append({
+                "video_id": video_id,
+                "title": f"{seed_text.title()} - part {i + 1}",
+                "description": self.DESCRIPTION,
+                "channel_title": "Focus Channel",
+                "published_at": "2024-05-01T12:00:00Z",
+                "thumbnail_url": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+                "url": f"https://www.youtube.com/watch?v={video_id}",
+            })
+        return videos
+
+    def search_videos(self, query, max_results=10, order="relevance", video_duration="medium"):
+        return self._videos(query, max_results)
+
+    def search_videos_for_goal(self, goal_title, goal_category, max_results=5):
+        return self._videos(f"{goal_title} {goal_category}", max_results)
+
+    def get_trending_motivational_videos(self, max_results=10):
+        return self._videos("trending", max_results)
+
+    def get_video_details(self, video_ids):
+        return [
+            {**video, "video_id": video_id, "duration_minutes": 12, "view_count": 1000, "like_count": 50, "tags": []}
+            for video_id, video in zip(video_ids, self._videos("details", len(video_ids)))
+        ]
@@ -0,0 +1,110 @@
+"""
+Fake YouTube Data API v3 server for benchmarks
+
+Serves /youtube/v3/search and /youtube/v3/videos with deterministic,
+realistically sized payloads and an optional artificial latency. Point the
+app at it with YOUTUBE_API_BASE_URL=http://127.0.0.1:<port>/youtube/v3.
+
+    python -m benchmarks.fake_youtube --port 9100 --latency-ms 80
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DESCRIPTION = (
+    "In this video we walk through a complete routine for building lasting focus habits. "
+    "Chapters, links to the worksheet, the books mentioned and our sponsor are below. "
+) * 12
+
+def _video_id(seed: str) -> str:
+    return hashlib.sha1(seed.encode()).hexdigest()[:11]
+
+def _snippet(video_id: str, title: str) -> dict:
+    return {
+        "publishedAt": "2024-05-01T12:00:00Z",
+        "channelId": "UC" + video_id * 2,
+        "title": title,
+        "description": DESCRIPTION,
+        "thumbnails": {
+            size: {"url": f"https://i.ytimg.com/vi/{video_id}/{size}default.jpg"}
+            for size in ("default", "medium", "high")
+        },
+        "channelTitle": "Focus Channel",
+        "tags": ["focus", "productivity", "study"],
+    }
+
+def search_response(query: str, max_results: int) -> dict:
+    items = []
+    for i in range(max_results):
+        video_id = _video_id(f"{query}:{i}")
+        items.append({
+            "kind": "youtube#searchResult",
+            "id": {"kind": "youtube#video", "videoId": video_id},
+            "snippet": _snippet(video_id, f"{query.title()} - part {i + 1}"),
+        })
+    return {"kind": "youtube#searchListResponse", "items": items}
+
+def videos_response(video_ids) -> dict:
+    return {
+        "kind": "youtube#videoListResponse",
+        "items": [
+            {
+                "id": video_id,
+                "snippet": _snippet(video_id, f"Video {video_id}"),
+                "contentDetails": {"duration": "PT12M30S"},
+                "statistics": {"viewCount": "123456", "likeCount": "4321"},
+            }
+            for video_id in video_ids
+        ],
+    }
+
+class _Handler(BaseHTTPRequestHandler):
+    latency = 0.0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if self.latency:
+            time.sleep(self.latency)
+
+        if url.path.endswith("/search"):
+            body = search_response(params.get("q", ""), min(int(params.get("maxResults", 5)), 50))
+        elif url.path.endswith("/videos"):
+            body = videos_response([v for v in params.get("id", "").split(",") if v])
+        else:
+            self.send_error(404)
+            return
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_fake_youtube(port: int = 0, latency_ms: float = 0.0):
+    """Start the server on a background thread; returns (server, base_url)"""
+    handler = type("FakeYouTubeHandler", (_Handler,), {"latency": latency_ms / 1000})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/youtube/v3"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake YouTube Data API v3 server")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    server, base_url = start_fake_youtube(args.port, args.latency_ms)
+    print(f"Serving fake YouTube API at {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,158 @@
+"""
+Goal forecasts: one vectorized NumPy pass over all goals vs a per-goal Python loop
+
+Seeds one user with --goals goals of --todos todos each and --activities
+focus sessions, then times forecasting every goal three ways: per goal
+(two queries and a Python loop over its rows each), build_forecasts (three
+aggregate queries and one NumPy pass), and GET /api/goals/{id}/forecast
+cold and cached. Fails (exit 1) if any forecast differs from the per-goal
+reference, or the endpoint runs more than COLD_BUDGET statements uncached
+or CACHED_BUDGET cached.
+
+    python -m benchmarks.goal_forecast [--goals 200] [--todos 25] [--activities 20000]
+"""
+import argparse
+import json
+import math
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import seed
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.db.database import SessionLocal, get_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Activity, Goal, Todo  # noqa: E402
+from app.services.focus_profile import FOCUS_ACTIVITY_TYPE  # noqa: E402
+from app.services.goal_forecast import (  # noqa: E402
+    FORECAST_RECENT_DAYS, FORECAST_WINDOW_DAYS, build_forecasts, invalidate_forecasts
+)
+
+# The auth user lookup, plus the three aggregate queries when not cached
+COLD_BUDGET = 4
+CACHED_BUDGET = 1
+
+def timed(iterations, call):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = call()
+        samples.append(time.perf_counter() - start)
+    return result, round(statistics.median(samples) * 1000, 2)
+
+def reference_forecast(db, goal, today):
+    """One goal's forecast from its raw rows, day by day in plain Python"""
+    window, recent = FORECAST_WINDOW_DAYS, FORECAST_RECENT_DAYS
+    first_day = today - timedelta(days=window - 1)
+    since = datetime.combine(first_day, datetime.min.time())
+    done, focus = [0.0] * window, [0.0] * window
+    for (completed_at,) in db.query(Todo.completed_at).filter(
+        Todo.goal_id == goal.id, Todo.is_completed == True, Todo.completed_at >= since  # noqa: E712
+    ):
+        done[(completed_at.date() - first_day).days] += 1
+    for created_at, minutes in db.query(Activity.created_at, Activity.duration_minutes).filter(
+        Activity.user_id == goal.user_id, Activity.goal_id == goal.id,
+        Activity.activity_type == FOCUS_ACTIVITY_TYPE, Activity.created_at >= since
+    ):
+        focus[(created_at.date() - first_day).days] += minutes or 0
+
+    created = min(max((today - goal.created_at.date()).days + 1, 1), window)
+    first_data = next((day for day in range(window) if done[day] or focus[day]), window - 1)
+    start = min(window - created, first_data)
+    days = list(range(start, window))
+    active_days = len(days)
+    average = sum(done[day] for day in days) / active_days
+    recent_days = min(active_days, recent)
+    pace = sum(done[window - recent:]) / recent_days
+    x_mean = sum(days) / active_days
+    variance = sum((day - x_mean) ** 2 for day in days)
+    trend = sum((day - x_mean) * (done[day] - average) for day in days) / variance if variance else 0.0
+    remaining = max(goal.total_todos - goal.completed_todos, 0)
+    projection_pace = pace if pace > 0 else average
+    if goal.is_achieved or not goal.total_todos:
+        projected = None
+    elif not remaining:
+        projected = today
+    else:
+        projected = today + timedelta(days=math.ceil(remaining / projection_pace)) if projection_pace > 0 else None
+    return {
+        "remaining_todos": remaining,
+        "pace_per_day": round(pace, 3),
+        "average_pace_per_day": round(average, 3),
+        "trend_per_day": round(trend, 3),
+        "focus_minutes_per_day": round(sum(focus[window - recent:]) / recent_days, 3),
+        "projected_completion_date": projected,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--goals", type=int, default=200)
+    parser.add_argument("--todos", type=int, default=25)
+    parser.add_argument("--activities", type=int, default=20000)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    headers = seed(goals_per_user=args.goals, todos_per_goal=args.todos, activities_per_user=args.activities)[0]
+    client = TestClient(app)
+    db = SessionLocal()
+    user_id = client.get("/api/users/me", headers=headers).json()["id"]
+    goals = db.query(Goal).filter(Goal.user_id == user_id).order_by(Goal.id).all()
+    today = datetime.utcnow().date()
+
+    forecasts, vectorized_ms = timed(args.iterations, lambda: build_forecasts(db, user_id, today))
+    reference, per_goal_ms = timed(args.iterations, lambda: {goal.id: reference_forecast(db, goal, today) for goal in goals})
+
+    def same(actual, expected):
+        # Both sides round to 3 places; summation order may move the last one
+        if isinstance(expected, float):
+            return abs(actual - expected) <= 0.0011
+        return actual == expected
+    mismatches = [
+        goal_id for goal_id, expected in reference.items()
+        if not all(same(forecasts[goal_id][key], value) for key, value in expected.items())
+    ]
+
+    goal_id = goals[0].id
+    path = f"/api/goals/{goal_id}/forecast"
+
+    def forecast_request(cold):
+        if cold:
+            invalidate_forecasts(user_id)
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200, response.text
+        return response
+
+    def statements(cold):
+        count = [0]
+
+        def counter(*_):
+            count[0] += 1
+        event.listen(get_engine(), "after_cursor_execute", counter)
+        forecast_request(cold)
+        event.remove(get_engine(), "after_cursor_execute", counter)
+        return count[0]
+
+    cold_statements, cached_statements = statements(True), statements(False)
+    _, cold_ms = timed(args.iterations, lambda: forecast_request(True))
+    _, cached_ms = timed(args.iterations, lambda: forecast_request(False))
+    db.close()
+
+    ok = not mismatches and cold_statements <= COLD_BUDGET and cached_statements <= CACHED_BUDGET
+    print(json.dumps({
+        "benchmark": "goal_forecast",
+        "goals": len(goals),
+        "ok": ok,
+        "forecasts_match_reference": not mismatches,
+        "mismatched_goal_ids": mismatches[:10],
+        "all_goals_ms": {"per_goal_python": per_goal_ms, "vectorized": vectorized_ms},
+        "endpoint_ms": {"cold": cold_ms, "cached": cached_ms},
+        "endpoint_statements": {"cold": cold_statements, "cached": cached_statements},
+    }, indent=2))
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
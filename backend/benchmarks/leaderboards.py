@@ -0,0 +1,159 @@
+"""
+Focus-time leaderboards: in-memory rankings vs ORDER BY SUM over activities
+
+Seeds --users opted-in users with --sessions focus sessions each, then times
+the weekly top 10 plus the caller's rank three ways: aggregating activities
+per request, the in-memory rankings directly, and GET
+/api/leaderboards/weekly end to end. It also times applying one logged
+session to the rankings, and loading them from focus_days vs from a
+snapshot. Fails (exit 1) if the rankings disagree with the SQL aggregate,
+or the endpoint runs more than STATEMENT_BUDGET statements.
+
+    python -m benchmarks.leaderboards [--users 20000] [--sessions 20]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Syncs are periodic, not per request: keep them out of the timed requests
+os.environ.setdefault("LEADERBOARD_SYNC_SECONDS", "3600")
+os.environ.setdefault("REVOCATION_SYNC_SECONDS", "3600")
+
+from benchmarks.common import seed  # noqa: E402
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, func, insert, update  # noqa: E402
+
+from app.db.database import SessionLocal, get_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Activity, FocusDay, User  # noqa: E402
+from app.services.leaderboards import FocusLeaderboards, focus_leaderboards, rebuild_focus_days, week_start  # noqa: E402
+
+# The auth user lookup and one username lookup for the page
+STATEMENT_BUDGET = 2
+
+def median_ms(iterations, call):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return round(statistics.median(samples) * 1000, 3)
+
+def seed_users(db, users, sessions, rng):
+    """Bulk-insert opted-in users with focus sessions over the last 30 days, logged before the snapshot"""
+    now = datetime.utcnow()
+    user_ids = db.scalars(insert(User).returning(User.id, sort_by_parameter_order=True), [
+        {"email": f"ranked{n}@example.com", "username": f"ranked{n}", "hashed_password": "-", "leaderboard_opt_in": True}
+        for n in range(users)
+    ]).all()
+    for start in range(0, len(user_ids), 1000):
+        db.execute(insert(Activity), [
+            {
+                "user_id": user_id,
+                "activity_type": "focus_session",
+                "title": "Focus session",
+                "duration_minutes": rng.choice([15, 25, 25, 50]),
+                "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 30)),
+            }
+            for user_id in user_ids[start:start + 1000]
+            for _ in range(sessions)
+        ])
+    rebuild_focus_days(db)
+    db.execute(update(FocusDay).values(updated_at=now - timedelta(hours=1)))
+    db.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    headers = seed(goals_per_user=1, todos_per_goal=1, activities_per_user=args.sessions)[0]
+    client = TestClient(app)
+    db = SessionLocal()
+    me = db.query(User).filter(User.email == client.get("/api/users/me", headers=headers).json()["email"]).one()
+    db.execute(update(User).where(User.id == me.id).values(leaderboard_opt_in=True))
+    db.commit()
+
+    def statements_per_request():
+        count = [0]
+
+        def counter(*_):
+            count[0] += 1
+        event.listen(get_engine(), "after_cursor_execute", counter)
+        response = client.get("/api/leaderboards/weekly", headers=headers)
+        event.remove(get_engine(), "after_cursor_execute", counter)
+        assert response.status_code == 200, response.text
+        return count[0]
+
+    statements_per_request()  # Loads the rankings
+    small = statements_per_request()
+    seed_users(db, args.users, args.sessions, random.Random(7))
+    # Rank the new users (a restart would load them the same way)
+    start = time.perf_counter()
+    cold = FocusLeaderboards(sync_seconds=3600).current(db)
+    cold_load_ms = round((time.perf_counter() - start) * 1000, 1)
+    focus_leaderboards.rankings, focus_leaderboards.members = cold.rankings, cold.members
+    large = statements_per_request()
+
+    # The query this replaces: sum every user's sessions this week, per request
+    minutes = func.sum(Activity.duration_minutes)
+    weekly = db.query(Activity.user_id, minutes.label("minutes")).filter(
+        Activity.activity_type == "focus_session",
+        Activity.created_at >= datetime.combine(week_start(datetime.utcnow().date()), datetime.min.time())
+    ).group_by(Activity.user_id)
+
+    def sql_leaderboard():
+        top = weekly.order_by(minutes.desc(), Activity.user_id).limit(10).all()
+        mine = dict(weekly.filter(Activity.user_id == me.id).all()).get(me.id, 0)
+        ahead = db.query(func.count()).select_from(weekly.having(minutes > mine).subquery()).scalar()
+        return top, ahead + 1 if mine else None
+
+    def memory_leaderboard():
+        return focus_leaderboards.top("weekly", 10), focus_leaderboards.standing("weekly", me.id)
+
+    sql_top, sql_rank = sql_leaderboard()
+    (_, memory_top), (memory_rank, _) = memory_leaderboard()
+    matches = [(user_id, int(total)) for user_id, total in sql_top] == [
+        (user_id, total) for _, user_id, total in memory_top
+    ] and sql_rank == memory_rank
+
+    now = datetime.utcnow()
+    record_ms = median_ms(1000, lambda: focus_leaderboards.record(me.id, now, 25))
+
+    path = os.path.join(tempfile.mkdtemp(prefix="focus-leaderboard-"), "snapshot.json")
+    cold.save_snapshot(path)
+    start = time.perf_counter()
+    FocusLeaderboards(sync_seconds=3600, snapshot_path=path).current(db)
+    snapshot_load_ms = round((time.perf_counter() - start) * 1000, 1)
+    db.close()
+
+    ok = matches and max(small, large) <= STATEMENT_BUDGET
+    print(json.dumps({
+        "benchmark": "leaderboards",
+        "ranked_users": len(cold.members),
+        "sessions": args.sessions * (args.users + 1),
+        "ok": ok,
+        "rankings_match_sql": matches,
+        "weekly_top10_and_rank_ms": {
+            "sql_aggregate": median_ms(args.iterations, sql_leaderboard),
+            "in_memory": median_ms(args.iterations, memory_leaderboard),
+            "endpoint": median_ms(args.iterations, lambda: client.get("/api/leaderboards/weekly", headers=headers)),
+        },
+        "endpoint_statements": {"one_user": small, "all_users": large},
+        "record_session_ms": record_ms,
+        "load_ms": {"from_focus_days": cold_load_ms, "from_snapshot": snapshot_load_ms},
+        "snapshot_bytes": os.path.getsize(path),
+    }, indent=2))
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Requests/sec for the music catalog
+
+Boots the app twice (authenticated and MUSIC_CATALOG_PUBLIC=true) and
+hammers /api/music/playlists at the given concurrency, with and without
+If-None-Match revalidation.
+
+    python -m benchmarks.music [--concurrency 20] [--duration 10]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.load import free_port, start_server
+
+PATH = "/api/music/playlists"
+
+async def measure(base_url, headers, concurrency, duration):
+    deadline = time.monotonic() + duration
+    counts = {"requests": 0, "errors": 0}
+
+    async def worker():
+        async with httpx.AsyncClient(base_url=base_url, headers=headers, timeout=30) as client:
+            while time.monotonic() < deadline:
+                response = await client.get(PATH)
+                counts["requests"] += 1
+                if response.status_code not in (200, 304):
+                    counts["errors"] += 1
+
+    start = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.monotonic() - start
+    return {**counts, "requests_per_sec": round(counts["requests"] / elapsed, 1)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Requests/sec for the music catalog")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    database_url = f"sqlite:///{tempfile.mkdtemp(prefix='focus-music-')}/music.db"
+    os.environ["DATABASE_URL"] = database_url
+    from benchmarks.common import seed
+
+    auth_headers = seed(goals_per_user=0, todos_per_goal=0, activities_per_user=0)[0]
+    results = []
+
+    for public in (False, True):
+        env = {**os.environ, "DATABASE_URL": database_url, "MUSIC_CATALOG_PUBLIC": str(public).lower()}
+        server, base_url = start_server(env, free_port(), workers=1)
+        try:
+            headers = {} if public else dict(auth_headers)
+            etag = httpx.get(base_url + PATH, headers=headers).headers["etag"]
+            for revalidate in (False, True):
+                request_headers = {**headers, "If-None-Match": etag} if revalidate else headers
+                results.append({
+                    "mode": "public" if public else "authenticated",
+                    "if_none_match": revalidate,
+                    **asyncio.run(measure(base_url, request_headers, args.concurrency, args.duration)),
+                })
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    print(json.dumps({"benchmark": "music", "endpoint": PATH, "concurrency": args.concurrency, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Bytes-on-wire and server CPU for a typical dashboard load
+
+Replays the requests the dashboard and Boost pages make (as separate list
+calls with and without fields= trimming, and via /api/dashboard) under
+identity, gzip and brotli encodings. The dashboard cache is disabled.
+
+    python -m benchmarks.payload [--iterations 50]
+"""
+import argparse
+import json
+import os
+
+os.environ.setdefault("DASHBOARD_CACHE_TTL_SECONDS", "0")
+
+from benchmarks.common import seed, cpu_time_per_call, FakeYouTubeService  # noqa: E402
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.routers.boost import get_youtube_service  # noqa: E402
+
+DASHBOARD_LOAD = [
+    ("/api/goals/", {}),
+    ("/api/todos/", {}),
+    ("/api/activities/", {"days": 7}),
+    ("/api/activities/stats/summary", {}),
+    ("/api/boost/recommendations", {"max_results": 6}),
+]
+
+# The same data from the single dashboard endpoint
+DASHBOARD_ENDPOINT = [
+    ("/api/dashboard", {}),
+    ("/api/boost/recommendations", {"max_results": 6}),
+]
+
+# What the dashboard cards actually render
+TRIMMED_FIELDS = {
+    "/api/goals/": "title,category,progress_percentage,is_achieved",
+    "/api/todos/": "title,is_completed,priority,due_date,goal_id",
+    "/api/activities/": "activity_type,duration_minutes,created_at",
+    "/api/boost/recommendations": "title,thumbnail_url,url",
+}
+
+ENCODINGS = ["identity", "gzip", "br"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    headers = seed(goals_per_user=20, todos_per_goal=5, activities_per_user=300)[0]
+    app.dependency_overrides[get_youtube_service] = FakeYouTubeService
+    client = TestClient(app)
+    results = []
+
+    scenarios = [
+        ("separate_requests", DASHBOARD_LOAD, False),
+        ("separate_requests_trimmed", DASHBOARD_LOAD, True),
+        ("dashboard_endpoint", DASHBOARD_ENDPOINT, False),
+    ]
+    for scenario, requests, trimmed in scenarios:
+        requests = [
+            (path, {**params, "fields": TRIMMED_FIELDS[path]} if trimmed and path in TRIMMED_FIELDS else params)
+            for path, params in requests
+        ]
+        for encoding in ENCODINGS:
+            wire_bytes = 0
+            for path, params in requests:
+                response = client.get(path, params=params, headers={**headers, "Accept-Encoding": encoding})
+                assert response.status_code == 200, response.text
+                wire_bytes += int(response.headers.get("content-length", len(response.content)))
+
+            def page_load():
+                for path, params in requests:
+                    client.get(path, params=params, headers={**headers, "Accept-Encoding": encoding})
+
+            results.append({
+                "scenario": scenario,
+                "requests_per_load": len(requests),
+                "encoding": encoding,
+                "bytes_on_wire": wire_bytes,
+                "cpu_ms_per_load": round(cpu_time_per_call(page_load, args.iterations) * 1e3, 2),
+            })
+
+    app.dependency_overrides.clear()
+    print(json.dumps({"benchmark": "payload", "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
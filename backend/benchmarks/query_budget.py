@@ -0,0 +1,73 @@
+"""
+N+1 check: SQL statements per request must not grow with data volume
+
+Runs each endpoint for a small and a large account and fails (exit 1) if
+the statement count differs between them or exceeds the endpoint's budget.
+
+    python -m benchmarks.query_budget
+"""
+import json
+import os
+import sys
+
+os.environ.setdefault("DASHBOARD_CACHE_TTL_SECONDS", "0")
+# The revoked-sessions reload is periodic, not per request: load it once up front
+os.environ.setdefault("REVOCATION_SYNC_SECONDS", "3600")
+# Likewise the leaderboards' sync
+os.environ.setdefault("LEADERBOARD_SYNC_SECONDS", "3600")
+
+from benchmarks.common import seed  # noqa: E402
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.utils.query_budget import count_queries  # noqa: E402
+
+# (path, params, max statements including the auth user lookup)
+BUDGETS = [
+    ("/api/goals/", {}, 2),
+    ("/api/goals/", {"include": "todos"}, 3),
+    ("/api/goals/", {"include": "stats"}, 2),
+    ("/api/goals/", {"include": "todos,stats"}, 3),
+    ("/api/goals/", {"include": "forecast"}, 5),
+    ("/api/todos/", {}, 2),
+    ("/api/activities/", {}, 2),
+    ("/api/activities/stats/summary", {}, 2),
+    ("/api/dashboard", {}, 5),
+    ("/api/leaderboards/weekly", {}, 2),
+    ("/api/leaderboards/weekly/friends", {}, 2),
+    ("/api/reminders/", {}, 2),
+]
+
+def main() -> int:
+    small = seed(goals_per_user=2, todos_per_goal=2, activities_per_user=10)[0]
+    large = seed(goals_per_user=60, todos_per_goal=10, activities_per_user=1000)[0]
+    client = TestClient(app)
+    client.get("/api/users/me", headers=small)
+    client.get("/api/leaderboards/weekly", headers=small)
+    results = []
+    failed = False
+
+    for path, params, budget in BUDGETS:
+        counts = []
+        for headers in (small, large):
+            with count_queries() as log:
+                response = client.get(path, params=params, headers=headers)
+            assert response.status_code == 200, response.text
+            counts.append(log.count)
+        ok = counts[0] == counts[1] and counts[1] <= budget
+        failed = failed or not ok
+        results.append({
+            "endpoint": path,
+            "params": params,
+            "budget": budget,
+            "queries_small_account": counts[0],
+            "queries_large_account": counts[1],
+            "ok": ok,
+        })
+
+    print(json.dumps({"benchmark": "query_budget", "results": results}, indent=2))
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
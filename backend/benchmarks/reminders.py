@@ -0,0 +1,176 @@
+"""
+Due-date reminders: horizon range scans and batched dispatch over millions of deadlines
+
+Seeds --todos open todos with due dates spread over the next year (a tenth
+of them completed) plus --due todos whose reminders are due now, then times
+loading the reminder horizon into the scheduler's heap against reading every
+open deadline, and dispatching the due reminders in batches. A second
+scheduler (another worker) then loads and dispatches the same window. Fails
+(exit 1) if the horizon scan does not use the partial index, the reminders
+sent differ from the due todos, the second scheduler sends any again, or a
+batch runs more than STATEMENT_BUDGET statements.
+
+    python -m benchmarks.reminders [--todos 1000000] [--due 20000]
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import seed
+
+from sqlalchemy import event, insert, text  # noqa: E402
+
+from app.db.database import SessionLocal, get_engine  # noqa: E402
+from app.models import Reminder, Todo, User  # noqa: E402
+from app.services.reminders import ReminderScheduler  # noqa: E402
+
+# Re-reading the batch's todos, the claiming insert and marking it delivered
+STATEMENT_BUDGET = 3
+
+class RecordingSink:
+    name = "recording"
+
+    def __init__(self):
+        self.batches = []
+
+    def deliver(self, reminders):
+        self.batches.append([reminder["target_id"] for reminder in reminders])
+        return True
+
+def seed_todos(db, user_id, todos, due, lead, grace, rng):
+    """Bulk-insert todos due over the next year, and due ones whose reminder time has passed"""
+    now = datetime.utcnow()
+    year = 365 * 24 * 3600
+    rows = [
+        {
+            "user_id": user_id,
+            "title": f"Deadline {n}",
+            "due_date": now + timedelta(seconds=rng.randint(0, year)),
+            "is_completed": rng.random() < 0.1,
+        }
+        for n in range(todos)
+    ] + [
+        {
+            "user_id": user_id,
+            "title": f"Due now {n}",
+            "due_date": now + lead - timedelta(seconds=rng.randint(1, int(grace.total_seconds()) - 60)),
+            "is_completed": False,
+        }
+        for n in range(due)
+    ]
+    for start in range(0, len(rows), 10000):
+        db.execute(insert(Todo), rows[start:start + 10000])
+    db.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--todos", type=int, default=1000000)
+    parser.add_argument("--due", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    seed(goals_per_user=1, todos_per_goal=1, activities_per_user=1)
+    db = SessionLocal()
+    user_id = db.query(User.id).order_by(User.id).limit(1).scalar()
+    sink = RecordingSink()
+    scheduler = ReminderScheduler(sink=sink, batch_size=args.batch_size)
+    seed_todos(db, user_id, args.todos, args.due, scheduler.lead, scheduler.grace, random.Random(7))
+
+    now = datetime.utcnow()
+    start = time.perf_counter()
+    queued = scheduler.load(db, now)
+    load_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    # What holding every deadline in memory would read instead
+    start = time.perf_counter()
+    all_open = db.query(Todo.id, Todo.due_date).filter(
+        Todo.is_completed == False, Todo.due_date.isnot(None)  # noqa: E712
+    ).all()
+    full_scan_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    window = db.query(Todo.id).filter(
+        Todo.is_completed == False,  # noqa: E712
+        Todo.due_date >= now + scheduler.lead - scheduler.grace,
+        Todo.due_date < now + scheduler.lead + scheduler.horizon
+    )
+    compiled = window.statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    if db.get_bind().dialect.name == "sqlite":
+        plan = " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+    else:
+        plan = " ".join(row[0] for row in db.execute(text(f"EXPLAIN {compiled}")))
+    expected = {target_id for target_id, due in db.query(Todo.id, Todo.due_date).filter(
+        Todo.is_completed == False,  # noqa: E712
+        Todo.due_date >= now + scheduler.lead - scheduler.grace,
+        Todo.due_date <= now + scheduler.lead
+    )}
+
+    statements = []
+    count = [0]
+
+    def counter(*_):
+        count[0] += 1
+    event.listen(get_engine(), "after_cursor_execute", counter)
+    batch_ms = []
+    while True:
+        count[0] = 0
+        start = time.perf_counter()
+        popped = scheduler.dispatch_due(db, now)
+        if not popped:
+            break
+        batch_ms.append(time.perf_counter() - start)
+        statements.append(count[0])
+    event.remove(get_engine(), "after_cursor_execute", counter)
+    sent = [target_id for batch in sink.batches for target_id in batch]
+
+    other_sink = RecordingSink()
+    other = ReminderScheduler(sink=other_sink, batch_size=args.batch_size)
+    other.load(db, now)
+    while other.dispatch_due(db, now):
+        pass
+    resent = sum(len(batch) for batch in other_sink.batches)
+
+    schedule_us = []
+    for n in range(1000):
+        start = time.perf_counter()
+        scheduler.schedule("todo", n + 1, now + scheduler.lead + timedelta(seconds=n))
+        schedule_us.append(time.perf_counter() - start)
+    reminder_rows = db.query(Reminder).count()
+    db.close()
+
+    ok = (
+        "ix_todos_open_due_date" in plan
+        and sorted(sent) == sorted(expected)
+        and resent == 0
+        and reminder_rows == len(expected)
+        and max(statements, default=0) <= STATEMENT_BUDGET
+    )
+    print(json.dumps({
+        "benchmark": "reminders",
+        "todos": args.todos + args.due,
+        "ok": ok,
+        "horizon_plan": plan,
+        "load": {
+            "horizon_rows_queued": queued,
+            "horizon_scan_ms": load_ms,
+            "all_open_deadlines": len(all_open),
+            "all_open_scan_ms": full_scan_ms,
+        },
+        "dispatch": {
+            "reminders_due": len(expected),
+            "reminders_sent": len(sent),
+            "batches": len(statements),
+            "statements_per_batch": max(statements, default=0),
+            "batch_median_ms": round(statistics.median(batch_ms) * 1000, 2) if batch_ms else None,
+            "reminders_per_second": round(len(sent) / sum(batch_ms)) if batch_ms else None,
+            "sent_again_by_second_scheduler": resent,
+        },
+        "schedule_median_us": round(statistics.median(schedule_us) * 1e6, 2),
+    }, indent=2))
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Full-text search latency on a large index
+
+Fills the todos, goals and activities tables with --rows rows of generated
+text spread over --users users, then times GET /api/search's query for
+common, rare, prefix and multi-word searches. Fails (exit 1) if the p95
+of any query exceeds --budget-ms. Uses SQLite FTS5 unless DATABASE_URL
+points at PostgreSQL.
+
+    python -m benchmarks.search [--rows 1000000] [--users 1000] [--budget-ms 10]
+"""
+import argparse
+import itertools
+import json
+import random
+import statistics
+import sys
+import time
+
+from benchmarks.common import seed_accounts
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.db.database import SessionLocal  # noqa: E402
+from app.db.search_index import optimize_search_index  # noqa: E402
+from app.models import Activity, Goal, Todo, User  # noqa: E402
+from app.services.search import search  # noqa: E402
+
+BATCH_SIZE = 10000
+# Share of rows per table
+TABLE_SHARES = ((Activity, 0.5), (Todo, 0.4), (Goal, 0.1))
+
+def vocabulary(rng, size=5000):
+    """Pseudo-words; drawn with a Zipf-like skew so some are common and most are rare"""
+    syllables = ["ka", "lo", "mi", "ra", "te", "sun", "vor", "pel", "dri", "an", "ex", "qu", "zo", "bel", "nir"]
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+def fill(db, user_ids, rows, rng, words):
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+
+    def sentence(length):
+        return " ".join(rng.choices(words, cum_weights=cum_weights, k=length))
+
+    for model, share in TABLE_SHARES:
+        remaining = int(rows * share)
+        while remaining > 0:
+            batch = []
+            for _ in range(min(BATCH_SIZE, remaining)):
+                row = {"user_id": rng.choice(user_ids), "title": sentence(5), "description": sentence(25)}
+                if model is Activity:
+                    row["activity_type"] = "focus_session"
+                batch.append(row)
+            db.execute(insert(model), batch)
+            db.commit()
+            remaining -= len(batch)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--budget-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    words = vocabulary(rng)
+    accounts = seed_accounts(users=args.users, goals_per_user=0, todos_per_goal=0, activities_per_user=0)
+    db = SessionLocal()
+    user_ids = [user_id for (user_id,) in db.query(User.id).filter(User.email.in_([email for email, _ in accounts]))]
+
+    start = time.perf_counter()
+    fill(db, user_ids, args.rows, rng, words)
+    fill_seconds = time.perf_counter() - start
+    # As after a bulk import: merge the segments the batches left behind
+    optimize_search_index(db.get_bind())
+
+    queries = {
+        "common_word": words[0],
+        "rare_word": words[-1],
+        "prefix": words[10][:3],
+        "two_words": f"{words[3]} {words[40]}",
+        "three_words_prefix": f"{words[1]} {words[20]} {words[200][:4]}",
+    }
+    results = []
+    for name, q in queries.items():
+        samples = []
+        hits = 0
+        for i in range(args.iterations):
+            user_id = user_ids[i % len(user_ids)]
+            query_start = time.perf_counter()
+            hits += len(search(db, user_id, q, limit=20))
+            samples.append(time.perf_counter() - query_start)
+        samples.sort()
+        results.append({
+            "query": name,
+            "q": q,
+            "avg_results": round(hits / args.iterations, 1),
+            "p50_ms": round(statistics.median(samples) * 1000, 2),
+            "p95_ms": round(samples[int(len(samples) * 0.95) - 1] * 1000, 2),
+            "max_ms": round(samples[-1] * 1000, 2),
+        })
+    db.close()
+
+    ok = all(result["p95_ms"] <= args.budget_ms for result in results)
+    print(json.dumps({
+        "benchmark": "search",
+        "database": db.get_bind().dialect.name,
+        "rows": args.rows,
+        "users": args.users,
+        "fill_seconds": round(fill_seconds, 1),
+        "budget_ms": args.budget_ms,
+        "ok": ok,
+        "results": results,
+    }, indent=2))
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
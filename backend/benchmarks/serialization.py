@@ -0,0 +1,71 @@
+"""
+Micro-benchmark for the list endpoints' serialization path
+
+Compares per-request CPU time of the three list endpoints against the
+previous ORM + response_model approach (hydrate entities, validate each with
+from_attributes, jsonable_encoder, JSON dump) over the same rows.
+
+    python -m benchmarks.serialization [--iterations 200] [--limit 100]
+"""
+import argparse
+import json
+from typing import List
+
+from benchmarks.common import seed, cpu_time_per_call
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.db.database import SessionLocal  # noqa: E402
+from app.models import Todo, Goal, Activity  # noqa: E402
+from app.schemas import TodoResponse, GoalResponse, ActivityResponse  # noqa: E402
+from app.utils.serialization import response_columns, rows_response  # noqa: E402
+
+ENDPOINTS = [
+    ("/api/todos/", Todo, TodoResponse),
+    ("/api/goals/", Goal, GoalResponse),
+    ("/api/activities/", Activity, ActivityResponse),
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    headers = seed(goals_per_user=args.limit, todos_per_goal=2, activities_per_user=args.limit * 2)[0]
+    client = TestClient(app)
+    db = SessionLocal()
+    results = []
+
+    for path, model, schema in ENDPOINTS:
+        adapter = TypeAdapter(List[schema])
+        fields, columns = response_columns(model, schema)
+
+        def orm_validated():
+            rows = db.query(model).limit(args.limit).all()
+            json.dumps(jsonable_encoder(adapter.validate_python(rows, from_attributes=True)))
+            db.expire_all()
+
+        def column_tuples():
+            rows_response(fields, db.query(*columns).limit(args.limit).all())
+
+        def endpoint():
+            response = client.get(path, params={"limit": args.limit}, headers=headers)
+            assert response.status_code == 200, response.text
+
+        results.append({
+            "endpoint": path,
+            "rows": args.limit,
+            "serialize_orm_validated_us": round(cpu_time_per_call(orm_validated, args.iterations) * 1e6, 1),
+            "serialize_column_tuples_us": round(cpu_time_per_call(column_tuples, args.iterations) * 1e6, 1),
+            "request_cpu_us": round(cpu_time_per_call(endpoint, args.iterations) * 1e6, 1),
+        })
+
+    db.close()
+    print(json.dumps({"benchmark": "serialization", "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Cold-start time: app import and time to first healthy response
+
+Measures, in fresh processes, how long `import app.main` takes and how long
+uvicorn takes from launch to the first 200 from /health, with
+AUTO_CREATE_SCHEMA on and off. Point --database-url at a remote database to
+see what schema checks at startup cost over the network.
+
+    python -m benchmarks.startup [--runs 5] [--database-url postgresql://...]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.load import BACKEND_DIR, free_port, git_revision
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - start)"
+)
+
+def import_seconds(env) -> float:
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, env=env)
+    return float(output.decode().strip().splitlines()[-1])
+
+def time_to_healthy(env) -> float:
+    """Seconds from launching uvicorn until /health first answers 200"""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    try:
+        while time.perf_counter() - start < 60:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            try:
+                if httpx.get(url, timeout=1).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError("Server did not become healthy within 60s")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+def summarize(samples):
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "min_ms": round(min(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start time of the API")
+    parser.add_argument("--database-url", help="Database to start against (default: temporary SQLite)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp(prefix='focus-startup-')}/startup.db"
+    env = {**os.environ, "DATABASE_URL": database_url, "PYTHONDONTWRITEBYTECODE": "1"}
+
+    # Warm the filesystem cache and create the schema once
+    subprocess.check_call([sys.executable, "-m", "app.cli.migrate"], cwd=BACKEND_DIR, env=env,
+                          stdout=subprocess.DEVNULL)
+    import_seconds(env)
+
+    results = {"import": summarize([import_seconds(env) for _ in range(args.runs)])}
+    for auto_create in ("true", "false"):
+        run_env = {**env, "AUTO_CREATE_SCHEMA": auto_create}
+        samples = [time_to_healthy(run_env) for _ in range(args.runs)]
+        results[f"time_to_healthy_auto_create_schema_{auto_create}"] = summarize(samples)
+
+    report = {
+        "benchmark": "startup",
+        "revision": git_revision(),
+        "database": database_url.split(":", 1)[0],
+        "runs": args.runs,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+"What next" todo listing on a large account
+
+Seeds one user with --todos todos, then times GET /api/todos/'s query for
+the top 20 open todos by sort=priority,due_date and sort=due_date (also
+with a due_before window). Fails (exit 1) if the p95 of any query exceeds
+--budget-ms or its plan sorts rows instead of reading them in index order.
+
+    python -m benchmarks.todo_ordering [--todos 100000] [--budget-ms 2]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import seed
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.db.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Todo  # noqa: E402
+from app.routers.todos import TODO_COLUMNS, todo_order_by  # noqa: E402
+
+TODOS_PER_GOAL = 1000
+
+def listing_query(db, sort, user_id, due_before):
+    """The query GET /api/todos/?completed=false&sort=...&limit=20 runs"""
+    query = db.query(*TODO_COLUMNS).filter(Todo.user_id == user_id, Todo.is_completed == False)  # noqa: E712
+    if due_before:
+        query = query.filter(Todo.due_date < due_before)
+    return query.order_by(*todo_order_by(sort)).limit(20)
+
+def sorts_rows(db, query):
+    """Whether the database plans an explicit sort for the query, and the plan"""
+    compiled = query.statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        plan = " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+        return "TEMP B-TREE" in plan, plan
+    plan = " ".join(row[0] for row in db.execute(text(f"EXPLAIN {compiled}")))
+    return "Sort" in plan, plan
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--todos", type=int, default=100000)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--budget-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    goals = max(1, args.todos // TODOS_PER_GOAL)
+    headers = seed(goals_per_user=goals, todos_per_goal=min(args.todos, TODOS_PER_GOAL), activities_per_user=0)[0]
+    client = TestClient(app)
+    db = SessionLocal()
+    user_id = client.get("/api/users/me", headers=headers).json()["id"]
+    due_before = datetime.utcnow() + timedelta(days=7)
+
+    cases = [
+        ("priority,due_date", None),
+        ("due_date", None),
+        ("priority,due_date", due_before),
+    ]
+    results = []
+    for sort, before in cases:
+        params = {"completed": "false", "sort": sort, "limit": 20}
+        if before:
+            params["due_before"] = before.isoformat()
+        response = client.get("/api/todos/", params=params, headers=headers)
+        assert response.status_code == 200, response.text
+
+        query = listing_query(db, sort, user_id, before)
+        samples = []
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            rows = query.all()
+            samples.append(time.perf_counter() - start)
+        assert [row.id for row in rows] == [todo["id"] for todo in response.json()]
+        samples.sort()
+        sorted_in_query, plan = sorts_rows(db, query)
+        p95_ms = samples[int(len(samples) * 0.95) - 1] * 1000
+        results.append({
+            "sort": sort,
+            "due_before": bool(before),
+            "p50_ms": round(statistics.median(samples) * 1000, 2),
+            "p95_ms": round(p95_ms, 2),
+            "index_ordered": not sorted_in_query,
+            "plan": plan,
+            "ok": p95_ms <= args.budget_ms and not sorted_in_query,
+        })
+    db.close()
+
+    ok = all(result["ok"] for result in results)
+    print(json.dumps({
+        "benchmark": "todo_ordering",
+        "todos": goals * min(args.todos, TODOS_PER_GOAL),
+        "budget_ms": args.budget_ms,
+        "ok": ok,
+        "results": results,
+    }, indent=2))
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
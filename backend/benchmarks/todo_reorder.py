@@ -0,0 +1,127 @@
+"""
+Drag-and-drop todo reordering on a large account
+
+Seeds one user with --todos todos, then makes --moves random
+PATCH /api/todos/{id}/move calls (dropping a todo between two neighbours)
+and reports their latency, the todo rows each one wrote (against the rows
+an integer position column would renumber), how long the rank keys get and
+how often that triggered a background rebalance. It also times
+rebalance_ranks() over the whole account. Fails (exit 1) if a
+move writes more than one row, or if the sort=rank listing (per user or per
+goal) sorts rows instead of reading them in index order.
+
+    python -m benchmarks.todo_reorder [--todos 100000] [--moves 200]
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+from benchmarks.common import seed
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.db.database import SessionLocal, get_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Todo  # noqa: E402
+from app.services.todo_ranks import rebalance_ranks  # noqa: E402
+from benchmarks.todo_ordering import sorts_rows  # noqa: E402
+
+TODOS_PER_GOAL = 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--todos", type=int, default=100000)
+    parser.add_argument("--moves", type=int, default=200)
+    args = parser.parse_args()
+
+    goals = max(1, args.todos // TODOS_PER_GOAL)
+    headers = seed(goals_per_user=goals, todos_per_goal=min(args.todos, TODOS_PER_GOAL), activities_per_user=0)[0]
+    client = TestClient(app)
+    db = SessionLocal()
+    user_id = client.get("/api/users/me", headers=headers).json()["id"]
+    order = [todo_id for (todo_id,) in db.query(Todo.id).filter(Todo.user_id == user_id).order_by(Todo.rank, Todo.id)]
+
+    rows_written, rebalances = [], []
+
+    def count_todo_writes(conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith("UPDATE todos"):
+            return
+        if executemany:
+            # A background rebalance (TestClient runs it before returning)
+            rebalances.append(cursor.rowcount)
+        else:
+            rows_written[-1] += cursor.rowcount
+
+    rng = random.Random(7)
+    samples, renumbered = [], []
+    event.listen(get_engine(), "after_cursor_execute", count_todo_writes)
+    for _ in range(args.moves):
+        old_slot = rng.randrange(len(order))
+        todo_id = order.pop(old_slot)
+        # Half the drops land in the same spot, which lengthens keys fastest
+        slot = rng.randrange(1, len(order)) if rng.random() < 0.5 else 1
+        rows_written.append(0)
+        start = time.perf_counter()
+        response = client.patch(
+            f"/api/todos/{todo_id}/move",
+            json={"after_id": order[slot - 1], "before_id": order[slot]},
+            headers=headers
+        )
+        samples.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+        order.insert(slot, todo_id)
+        renumbered.append(abs(old_slot - slot) + 1)
+    event.remove(get_engine(), "after_cursor_execute", count_todo_writes)
+
+    ranks = [rank for (rank,) in db.query(Todo.rank).filter(Todo.user_id == user_id)]
+    in_order = [todo_id for (todo_id,) in db.query(Todo.id).filter(Todo.user_id == user_id).order_by(Todo.rank, Todo.id)]
+    longest_before = max(map(len, ranks))
+    start = time.perf_counter()
+    rewritten = rebalance_ranks(db, user_id)
+    db.commit()
+    rebalance_seconds = time.perf_counter() - start
+    longest_after = max(len(rank) for (rank,) in db.query(Todo.rank).filter(Todo.user_id == user_id))
+
+    goal_id = db.query(Todo.goal_id).filter(Todo.user_id == user_id).limit(1).scalar()
+    plans = {}
+    for name, query in (
+        ("user", db.query(Todo.id).filter(Todo.user_id == user_id)),
+        ("goal", db.query(Todo.id).filter(Todo.user_id == user_id, Todo.goal_id == goal_id)),
+    ):
+        sorted_in_query, plan = sorts_rows(db, query.order_by(Todo.rank, Todo.id).limit(50))
+        plans[name] = {"index_ordered": not sorted_in_query, "plan": plan}
+    db.close()
+
+    samples.sort()
+    ok = (
+        max(rows_written) <= 1
+        and in_order == order
+        and all(plan["index_ordered"] for plan in plans.values())
+    )
+    print(json.dumps({
+        "benchmark": "todo_reorder",
+        "todos": len(order),
+        "moves": args.moves,
+        "ok": ok,
+        "move_p50_ms": round(statistics.median(samples) * 1000, 2),
+        "move_p95_ms": round(samples[int(len(samples) * 0.95) - 1] * 1000, 2),
+        "todo_rows_written_per_move": max(rows_written),
+        "position_column_rows_per_move": round(statistics.mean(renumbered)),
+        "background_rebalances": len(rebalances),
+        "background_rebalance_rows": sum(rebalances),
+        "longest_rank_before_rebalance": longest_before,
+        "rebalance": {
+            "seconds": round(rebalance_seconds, 2),
+            "keys_rewritten": rewritten,
+            "longest_rank_after": longest_after,
+        },
+        "listing_plans": plans,
+    }, indent=2))
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Subtask trees: materialized-path queries vs walking parent_id level by level
+
+Seeds one user with --todos todos plus a subtask tree --branching wide and
+--depth deep under one goal, then times GET /api/todos/{id}/tree,
+/progress and PATCH /move on it, next to fetching the same tree one
+parent_id query per level. Fails (exit 1) if an endpoint issues more SQL
+statements than its depth-independent budget, the tree comes back
+incomplete, the subtree query does not use ix_todos_user_path, or the goal
+counters drift.
+
+    python -m benchmarks.todo_tree [--todos 50000] [--branching 4] [--depth 7]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from benchmarks.common import seed
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import func, insert, text  # noqa: E402
+
+from app.db.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Goal, Todo  # noqa: E402
+from app.services.goal_counters import repair_goal_counters  # noqa: E402
+from app.services.todo_tree import descendants_clause  # noqa: E402
+from app.utils.query_budget import count_queries  # noqa: E402
+
+# Statements per request, whatever the tree's depth: the auth lookup, the
+# root, one query over its subtree; a move also loads the new parent, moves
+# the goal counters, updates the subtree and the root and reloads both
+STATEMENT_BUDGETS = {"tree": 3, "progress": 3, "move": 10}
+
+def seed_tree(db, user_id, goal_id, branching, depth):
+    """Insert a complete tree, one multi-row INSERT per level; returns the root id and tree size"""
+    def insert_level(rows):
+        ids = db.scalars(insert(Todo).returning(Todo.id, sort_by_parameter_order=True), rows).all()
+        return [dict(row, id=todo_id) for row, todo_id in zip(rows, ids)]
+
+    def todo(title, parent, number):
+        return {
+            "user_id": user_id, "goal_id": goal_id, "title": title, "is_completed": number % 3 == 0,
+            "parent_id": parent["id"] if parent else None,
+            "path": f"{parent['path']}{parent['id']}/" if parent else "/",
+        }
+
+    level = insert_level([todo("Tree root", None, 1)])
+    root_id, size = level[0]["id"], 1
+    for _ in range(depth):
+        level = insert_level([
+            todo(f"Subtask {size + n}", parent, size + n)
+            for n, parent in enumerate(parent for parent in level for _ in range(branching))
+        ])
+        size += len(level)
+    repair_goal_counters(db, user_id)
+    db.commit()
+    return root_id, size
+
+def fetch_by_levels(db, user_id, root_id):
+    """The recursive alternative: one round trip per level of the tree"""
+    found, level = 1, [root_id]
+    while level:
+        level = [todo_id for (todo_id,) in db.query(Todo.id).filter(
+            Todo.user_id == user_id, Todo.parent_id.in_(level)
+        )]
+        found += len(level)
+    return found
+
+def timed(iterations, call):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = call()
+        samples.append(time.perf_counter() - start)
+    return result, round(statistics.median(samples) * 1000, 2)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--todos", type=int, default=50000)
+    parser.add_argument("--branching", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=7)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    goals = max(2, args.todos // 1000)
+    headers = seed(goals_per_user=goals, todos_per_goal=args.todos // goals, activities_per_user=0)[0]
+    client = TestClient(app)
+    db = SessionLocal()
+    user_id = client.get("/api/users/me", headers=headers).json()["id"]
+    goals = [goal_id for (goal_id,) in db.query(Goal.id).filter(Goal.user_id == user_id).order_by(Goal.id).limit(2)]
+    root_id, tree_size = seed_tree(db, user_id, goals[0], args.branching, args.depth)
+
+    results = {}
+    for name, method, path in (
+        ("tree", "get", f"/api/todos/{root_id}/tree"),
+        ("progress", "get", f"/api/todos/{root_id}/progress"),
+    ):
+        with count_queries() as log:
+            response = getattr(client, method)(path, headers=headers)
+        assert response.status_code == 200, response.text
+        _, median_ms = timed(args.iterations, lambda: client.get(path, headers=headers))
+        results[name] = {"median_ms": median_ms, "statements": log.count, "total_todos": response.json()["total_todos"]}
+
+    # The subtree fetch on its own, against walking parent_id one level per round trip
+    root = db.get(Todo, root_id)
+    query = db.query(Todo.id).filter(descendants_clause(root))
+    rows, median_ms = timed(args.iterations, query.all)
+    results["path_range_query"] = {"median_ms": median_ms, "statements": 1, "total_todos": len(rows) + 1}
+    by_levels, median_ms = timed(args.iterations, lambda: fetch_by_levels(db, user_id, root_id))
+    results["parent_id_levels"] = {"median_ms": median_ms, "statements": args.depth + 1, "total_todos": by_levels}
+
+    # Move the first child's subtree (a quarter of the tree) under another goal's todo and back
+    child_id = client.get(f"/api/todos/{root_id}/tree", headers=headers).json()["children"][0]["id"]
+    target = client.post("/api/todos/", json={"title": "Move target", "goal_id": goals[1]}, headers=headers).json()["id"]
+    with count_queries() as log:
+        start = time.perf_counter()
+        response = client.patch(f"/api/todos/{child_id}/move", json={"parent_id": target}, headers=headers)
+        move_ms = (time.perf_counter() - start) * 1000
+    assert response.status_code == 200, response.text
+    moved = client.get(f"/api/todos/{target}/progress", headers=headers).json()["total_todos"] - 1
+    client.patch(f"/api/todos/{child_id}/move", json={"parent_id": root_id}, headers=headers)
+    results["move"] = {"ms": round(move_ms, 1), "statements": log.count, "moved_todos": moved}
+
+    compiled = query.statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    if db.get_bind().dialect.name == "sqlite":
+        plan = " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+    else:
+        plan = " ".join(row[0] for row in db.execute(text(f"EXPLAIN {compiled}")))
+    drifted = repair_goal_counters(db, user_id)
+    db.rollback()
+    db.close()
+
+    ok = (
+        all(result["total_todos"] == tree_size for result in results.values() if "total_todos" in result)
+        and all(results[name]["statements"] <= budget for name, budget in STATEMENT_BUDGETS.items())
+        and "ix_todos_user_path" in plan
+        and drifted == 0
+    )
+    print(json.dumps({
+        "benchmark": "todo_tree",
+        "tree_todos": tree_size,
+        "depth": args.depth,
+        "ok": ok,
+        "subtree_plan": plan,
+        "goal_counters_drifted": drifted,
+        "results": results,
+    }, indent=2))
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
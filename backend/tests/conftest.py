@@ -0,0 +1,38 @@
+"""
+Shared fixtures: the app on a throwaway SQLite database, with accounts
+seeded through benchmarks.common
+
+Environment overrides are set before the app is imported: per-request
+caches are off so every request reaches the database, and periodic syncs
+are pushed out so they never land inside a counted request.
+"""
+import os
+
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("DASHBOARD_CACHE_TTL_SECONDS", "0")
+os.environ.setdefault("REVOCATION_SYNC_SECONDS", "3600")
+os.environ.setdefault("LEADERBOARD_SYNC_SECONDS", "3600")
+os.environ.setdefault("REMINDERS_ENABLED", "false")
+
+import pytest  # noqa: E402
+
+from benchmarks.common import seed  # noqa: E402
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture(scope="session")
+def small_account(client):
+    """Auth headers of an account with 2 goals of 2 todos and 10 focus sessions"""
+    return seed(goals_per_user=2, todos_per_goal=2, activities_per_user=10)[0]
+
+@pytest.fixture(scope="session")
+def large_account(client):
+    """Auth headers of an account with 30 goals of 10 todos and 500 focus sessions"""
+    return seed(goals_per_user=30, todos_per_goal=10, activities_per_user=500)[0]
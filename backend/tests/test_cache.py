@@ -0,0 +1,36 @@
+"""
+Derived-data caches never keep a value computed before an invalidation
+"""
+from app.db.database import SessionLocal
+from app.services import goal_forecast
+from app.services.cache import MemoryBackend, TTLCache
+from app.services.dashboard import invalidate_dashboard
+
+def test_set_after_invalidation_is_skipped():
+    cache = TTLCache("test", 60, backend=MemoryBackend())
+    generation = cache.generation(1)
+    cache.invalidate(1)
+    cache.set_unless_invalidated(1, b"stale", generation)
+    assert cache.get(1) is None
+
+    generation = cache.generation(1)
+    cache.set_unless_invalidated(1, b"fresh", generation)
+    assert cache.get(1) == b"fresh"
+
+def test_forecasts_built_during_a_write_are_not_cached(client, monkeypatch):
+    user_id = 1
+    build = goal_forecast.build_forecasts
+
+    def build_racing_a_write(db, user_id, today=None):
+        forecasts = build(db, user_id, today)
+        # A todo write commits and invalidates while this read is still building
+        invalidate_dashboard(user_id)
+        return forecasts
+    monkeypatch.setattr(goal_forecast, "build_forecasts", build_racing_a_write)
+    goal_forecast.invalidate_forecasts(user_id)
+    db = SessionLocal()
+    try:
+        goal_forecast.get_forecasts(db, user_id)
+    finally:
+        db.close()
+    assert goal_forecast.forecast_cache.get(user_id) is None
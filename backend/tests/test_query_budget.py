@@ -0,0 +1,41 @@
+"""
+N+1 regressions: statements per request stay within budget and do not grow with rows
+
+Each endpoint is requested for a small and a large account under
+assert_max_queries(budget). The large account has 30 goals and 300 todos,
+so one extra query per goal or todo overshoots the budget, and the counts
+of the two accounts must also match.
+"""
+import pytest
+
+from app.utils.query_budget import assert_max_queries
+
+# (path, params, max statements including the auth user lookup)
+BUDGETS = [
+    ("/api/goals/", {"include": "todos,stats"}, 3),
+    ("/api/dashboard", {}, 5),
+    ("/api/todos/", {}, 2),
+    ("/api/todos/", {"limit": 300}, 2),
+]
+
+@pytest.fixture(scope="module", autouse=True)
+def warm_up(client, small_account):
+    # Load the once-per-worker state (revoked sessions, leaderboards) outside the counted requests
+    client.get("/api/users/me", headers=small_account)
+    client.get("/api/dashboard", headers=small_account)
+
+@pytest.mark.parametrize("path,params,budget", BUDGETS)
+def test_queries_within_budget(client, small_account, large_account, path, params, budget):
+    counts = []
+    for headers in (small_account, large_account):
+        with assert_max_queries(budget) as log:
+            response = client.get(path, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        counts.append(log.count)
+    assert counts[0] == counts[1], f"{path} issued {counts[0]} queries for the small account, {counts[1]} for the large one"
+
+def test_large_account_returns_every_row(client, large_account):
+    # The budgets above only mean something if the rows were actually loaded
+    goals = client.get("/api/goals/", params={"include": "todos,stats"}, headers=large_account).json()
+    assert len(goals) == 30
+    assert all(len(goal["todos"]) == 10 for goal in goals)
@@ -0,0 +1,63 @@
+"""
+Reminder dispatch: a batch whose claim fails is retried, never dropped
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.db.database import SessionLocal
+from app.models import Reminder, Todo, User
+from app.services import reminders
+from app.services.reminders import ReminderScheduler
+
+class RecordingSink:
+    name = "recording"
+
+    def __init__(self):
+        self.sent = []
+
+    def deliver(self, batch):
+        self.sent.extend(reminder["target_id"] for reminder in batch)
+        return True
+
+@pytest.fixture
+def db(client):
+    session = SessionLocal()
+    yield session
+    session.close()
+
+@pytest.fixture
+def due_todo(db):
+    user = User(email="reminders@example.com", username="reminders", hashed_password="x")
+    db.add(user)
+    db.flush()
+    scheduler = ReminderScheduler(sink=RecordingSink())
+    todo = Todo(user_id=user.id, title="Due soon", due_date=datetime.utcnow() + scheduler.lead - timedelta(minutes=1))
+    db.add(todo)
+    db.commit()
+    yield todo
+    db.delete(user)
+    db.commit()
+
+def test_failed_claim_is_retried(db, due_todo, monkeypatch):
+    sink = RecordingSink()
+    scheduler = ReminderScheduler(sink=sink)
+    now = datetime.utcnow()
+    assert scheduler.load(db, now) == 1
+
+    def unavailable(db):
+        raise OperationalError("INSERT INTO reminders", {}, Exception("database is unavailable"))
+    with monkeypatch.context() as patch:
+        patch.setattr(reminders, "_dialect_insert", unavailable)
+        with pytest.raises(OperationalError):
+            scheduler.dispatch_due(db, now)
+    assert len(scheduler) == 1
+    assert db.query(Reminder).filter(Reminder.target_id == due_todo.id).count() == 0
+
+    # A refresh in between must not lose or duplicate it either
+    scheduler.load(db, now)
+    assert len(scheduler) == 1
+    assert scheduler.dispatch_due(db, now) == 1
+    assert sink.sent == [due_todo.id]
+    assert db.query(Reminder).filter(Reminder.target_id == due_todo.id).count() == 1
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { getMusicPlaylists, getPlaylist } from '../services/api';
 
-export default function MusicPlayer({ isTimerRunning }) {
+export default function MusicPlayer({ isTimerRunning, onPlaylistChange }) {
   const [playlists, setPlaylists] = useState([]);
   const [selectedPlaylist, setSelectedPlaylist] = useState(null);
   const [currentTrack, setCurrentTrack] = useState(null);
@@ -33,6 +33,8 @@ export default function MusicPlayer({ isTimerRunning }) {
   };
 
   const handlePlaylistSelect = async (playlistId) => {
+    // Logged with focus sessions for listening stats and recommendations
+    onPlaylistChange?.(playlistId);
     try {
       const { data } = await getPlaylist(playlistId);
       setSelectedPlaylist({ ...data, id: playlistId });
@@ -128,6 +130,7 @@ export default function MusicPlayer({ isTimerRunning }) {
                 setSelectedPlaylist(null);
                 setCurrentTrack(null);
                 setIsPlaying(false);
+                onPlaylistChange?.(null);
               }}
               className="btn btn-secondary"
               style={{ fontSize: '14px', padding: '8px 16px' }}
@@ -1,5 +1,5 @@
 import { createContext, useState, useContext, useEffect } from 'react';
-import { login as loginApi, register as registerApi, getCurrentUser } from '../services/api';
+import { login as loginApi, logout as logoutApi, register as registerApi, getCurrentUser } from '../services/api';
 
 const AuthContext = createContext();
 
@@ -23,6 +23,7 @@ export const AuthProvider = ({ children }) => {
         .then(({ data }) => setUser(data))
         .catch(() => {
           localStorage.removeItem('token');
+          localStorage.removeItem('refreshToken');
         })
         .finally(() => setLoading(false));
     } else {
@@ -34,6 +35,7 @@ export const AuthProvider = ({ children }) => {
     try {
       const { data } = await loginApi({ email, password });
       localStorage.setItem('token', data.access_token);
+      localStorage.setItem('refreshToken', data.refresh_token);
       const { data: userData } = await getCurrentUser();
       setUser(userData);
       return { success: true };
@@ -58,7 +60,12 @@ export const AuthProvider = ({ children }) => {
   };
 
   const logout = () => {
+    const refreshToken = localStorage.getItem('refreshToken');
+    if (refreshToken) {
+      logoutApi(refreshToken).catch(() => {});
+    }
     localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
     setUser(null);
   };
 
@@ -13,6 +13,7 @@ export default function Focus() {
   const [visual, setVisual] = useState('coffee'); // 'coffee' or 'hourglass'
   const [showTodoSelector, setShowTodoSelector] = useState(false);
   const [selectedTodo, setSelectedTodo] = useState(null);
+  const [playlistId, setPlaylistId] = useState(null); // Focus music playing during the session
   const [todos, setTodos] = useState([]);
   const [goals, setGoals] = useState([]);
   const intervalRef = useRef(null);
@@ -111,6 +112,7 @@ export default function Focus() {
           session_type: session,
           todo_id: selectedTodo?.id || null,
           goal_id: selectedTodo?.goal_id || null,
+          playlist_id: playlistId,
           completed_at: new Date().toISOString()
         }
       };
@@ -781,7 +783,7 @@ export default function Focus() {
           )}
 
           {/* Music Player */}
-          <MusicPlayer isTimerRunning={isRunning} />
+          <MusicPlayer isTimerRunning={isRunning} onPlaylistChange={setPlaylistId} />
         </div>
       </div>
 
@@ -282,6 +282,8 @@ function GoalCard({ goal, onDelete, onMarkAchieved, onViewVideos }) {
           )}
           <div style={{ display: 'flex', gap: '16px', fontSize: '14px', color: '#71717a' }}>
             <span>Progress: {goal.progress_percentage}%</span>
+            {goal.total_todos > 0 && <span>{goal.completed_todos}/{goal.total_todos} todos</span>}
+            {goal.focus_minutes > 0 && <span>{goal.focus_minutes}m focused</span>}
             {goal.target_date && <span>Target: {format(new Date(goal.target_date), 'MMM dd, yyyy')}</span>}
           </div>
         </div>
@@ -1,11 +1,10 @@
 import { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
-import { getGoals, getTodos, getActivities, getActivityStats } from '../services/api';
+import { getDashboard } from '../services/api';
 
 export default function PremiumDashboard() {
   const [goals, setGoals] = useState([]);
-  const [todos, setTodos] = useState([]);
-  const [activities, setActivities] = useState([]);
+  const [todoCounts, setTodoCounts] = useState({ total: 0, completed: 0, active: 0 });
   const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
 
@@ -15,17 +14,12 @@ export default function PremiumDashboard() {
 
   const fetchAllData = async () => {
     try {
-      const [goalsRes, todosRes, activitiesRes, statsRes] = await Promise.all([
-        getGoals(),
-        getTodos(),
-        getActivities({ days: 30 }),
-        getActivityStats(7)
-      ]);
+      // One request: the backend computes per-goal stats and the weekly summary
+      const { data } = await getDashboard();
 
-      setGoals(goalsRes.data);
-      setTodos(todosRes.data);
-      setActivities(activitiesRes.data);
-      setStats(statsRes.data);
+      setGoals(data.goals);
+      setTodoCounts(data.todo_counts);
+      setStats(data.weekly_summary);
     } catch (error) {
       console.error('Error fetching data:', error);
     } finally {
@@ -33,25 +27,16 @@ export default function PremiumDashboard() {
     }
   };
 
-  // Calculate focus time per goal
+  // Focus time and todo progress per goal, as computed by the dashboard endpoint
   const getGoalStats = (goalId) => {
-    const goalTodos = todos.filter(t => t.goal_id === goalId);
-    const todoIds = goalTodos.map(t => t.id);
-    
-    const focusSessions = activities.filter(a => 
-      a.activity_type === 'focus_session' && 
-      a.extra_data?.goal_id === goalId
-    );
-    
-    const totalFocusTime = focusSessions.reduce((sum, a) => sum + (a.duration_minutes || 0), 0);
-    const completedTodos = goalTodos.filter(t => t.is_completed).length;
+    const goalStats = goals.find(g => g.id === goalId)?.stats;
 
     return {
-      totalTodos: goalTodos.length,
-      completedTodos,
-      activeTodos: goalTodos.length - completedTodos,
-      totalFocusTime,
-      sessions: focusSessions.length
+      totalTodos: goalStats?.total_todos || 0,
+      completedTodos: goalStats?.completed_todos || 0,
+      activeTodos: (goalStats?.total_todos || 0) - (goalStats?.completed_todos || 0),
+      totalFocusTime: goalStats?.focus_minutes || 0,
+      sessions: goalStats?.focus_sessions || 0
     };
   };
 
@@ -101,8 +86,8 @@ export default function PremiumDashboard() {
         <QuickStat
           icon="✅"
           label="Active Todos"
-          value={todos.filter(t => !t.is_completed).length}
-          subtitle={`${todos.filter(t => t.is_completed).length} completed`}
+          value={todoCounts.active}
+          subtitle={`${todoCounts.completed} completed`}
           color="#10b981"
         />
         <QuickStat
@@ -23,7 +23,7 @@ export default function Todos() {
   const fetchData = async () => {
     try {
       const [todosRes, goalsRes] = await Promise.all([
-        getTodos(),
+        getTodos({ sort: 'priority,due_date' }),
         getGoals()
       ]);
       setTodos(todosRes.data);
@@ -18,6 +18,53 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// On a 401, renew the access token with the refresh token once and retry.
+// Concurrent failures share one renewal, since each refresh token is single-use.
+let refreshing = null;
+
+const renewTokens = () => {
+  if (!refreshing) {
+    const refreshToken = localStorage.getItem('refreshToken');
+    refreshing = (refreshToken
+      ? axios.post(`${API_URL}/api/users/token/refresh`, { refresh_token: refreshToken })
+      : Promise.reject(new Error('No refresh token'))
+    )
+      .then(({ data }) => {
+        localStorage.setItem('token', data.access_token);
+        localStorage.setItem('refreshToken', data.refresh_token);
+        return data.access_token;
+      })
+      .catch((error) => {
+        localStorage.removeItem('token');
+        localStorage.removeItem('refreshToken');
+        throw error;
+      })
+      .finally(() => {
+        refreshing = null;
+      });
+  }
+  return refreshing;
+};
+
+api.interceptors.response.use(
+  (response) => response,
+  async (error) => {
+    const { config, response } = error;
+    if (response?.status !== 401 || !config || config._retried || config.url.startsWith('/api/users/login')) {
+      throw error;
+    }
+    let token;
+    try {
+      token = await renewTokens();
+    } catch {
+      throw error;
+    }
+    config._retried = true;
+    config.headers.Authorization = `Bearer ${token}`;
+    return api(config);
+  }
+);
+
 // Auth
 export const register = (data) => api.post('/api/users/register', data);
 export const login = (data) => {
@@ -29,9 +76,18 @@ export const login = (data) => {
   });
 };
 export const getCurrentUser = () => api.get('/api/users/me');
+export const logout = (refreshToken) => api.post('/api/users/logout', { refresh_token: refreshToken });
+
+// Dashboard (goals with stats, todo counts, today's todos, weekly summary)
+export const getDashboard = () => api.get('/api/dashboard');
+
+// Search (todos, goals and activities; results carry <mark>-highlighted, HTML-escaped text)
+export const search = (q, { types, limit = 20 } = {}) =>
+  api.get('/api/search', { params: { q, types, limit } });
 
 // Goals
 export const getGoals = (params) => api.get('/api/goals/', { params });
+export const getGoalForecast = (id) => api.get(`/api/goals/${id}/forecast`);
 export const createGoal = (data) => api.post('/api/goals/', data);
 export const updateGoal = (id, data) => api.put(`/api/goals/${id}`, data);
 export const deleteGoal = (id) => api.delete(`/api/goals/${id}`);
@@ -41,6 +97,9 @@ export const getTodos = (params) => api.get('/api/todos/', { params });
 export const createTodo = (data) => api.post('/api/todos/', data);
 export const updateTodo = (id, data) => api.put(`/api/todos/${id}`, data);
 export const deleteTodo = (id) => api.delete(`/api/todos/${id}`);
+export const getTodoTree = (id) => api.get(`/api/todos/${id}/tree`);
+export const getTodoProgress = (id) => api.get(`/api/todos/${id}/progress`);
+export const moveTodo = (id, data) => api.patch(`/api/todos/${id}/move`, data);
 
 // Activities
 export const getActivities = (params) => api.get('/api/activities/', { params });
@@ -48,6 +107,20 @@ export const createActivity = (data) => api.post('/api/activities/', data);
 export const getActivityStats = (days = 7) => 
   api.get('/api/activities/stats/summary', { params: { days } });
 
+// Leaderboards (period: 'daily', 'weekly' or 'all_time'; opt in with updateCurrentUser({ leaderboard_opt_in: true }))
+export const updateCurrentUser = (data) => api.put('/api/users/me', data);
+export const getLeaderboard = (period, { limit = 10, offset = 0 } = {}) =>
+  api.get(`/api/leaderboards/${period}`, { params: { limit, offset } });
+export const getFriendsLeaderboard = (period) => api.get(`/api/leaderboards/${period}/friends`);
+export const getFriends = () => api.get('/api/users/me/friends');
+export const addFriend = (username) => api.post('/api/users/me/friends', { username });
+export const removeFriend = (userId) => api.delete(`/api/users/me/friends/${userId}`);
+
+// Reminders (sent REMINDER_LEAD_MINUTES before todo due dates and goal target dates)
+export const getReminders = ({ beforeId, limit = 50, dismissed = false } = {}) =>
+  api.get('/api/reminders/', { params: { before_id: beforeId, limit, dismissed } });
+export const dismissReminder = (id) => api.post(`/api/reminders/${id}/dismiss`);
+
 // Boost (Videos)
 export const getRecommendations = (maxResults = 5) => 
   api.get('/api/boost/recommendations', { params: { max_results: maxResults } });
@@ -59,7 +132,10 @@ export const searchVideos = (query, maxResults = 10) =>
 // Music (Focus Music)
 export const getMusicPlaylists = () => api.get('/api/music/playlists');
 export const getPlaylist = (playlistId) => api.get(`/api/music/playlists/${playlistId}`);
-export const getRecommendedMusic = () => api.get('/api/music/recommended');
+export const getRecommendedMusic = () =>
+  api.get('/api/music/recommended', { params: { hour: new Date().getHours() } });
+export const searchTracks = (q, limit = 20) => api.get('/api/music/tracks/search', { params: { q, limit } });
+export const getListeningStats = () => api.get('/api/music/stats');
 
 export default api;
 